@@ -4,8 +4,17 @@ from datetime import datetime
 from itertools import product
 from typing import Any, Dict, List, Optional, Tuple
 
+import instances
+import jobs
 import k_means
-from solve import solve_model
+import ledger
+import numpy as np
+import portfolio as portfolio_module
+import presolve as presolve_module
+import results_store
+import runtime_predictor
+import supervisor
+import symmetry
 
 
 def generate_batch(
@@ -17,9 +26,11 @@ def generate_batch(
     mode: str = "approximation",
     solver: str = "gams",
     subsolver: Optional[str] = "gurobi",
+    seed: Optional[int] = None,
+    n_workers: int = 1,
 ) -> str:
     """
-    Generate k-means models and save their names in a batch file.
+    Generate k-means instance manifests and save their names in a batch file.
 
     Parameters
     ----------
@@ -39,6 +50,12 @@ def generate_batch(
         Solver to use, by default "gams"
     subsolver : Optional[str]
         Subsolver to use (if using GAMS), by default "gurobi"
+    seed : Optional[int]
+        Base seed for the batch, by default None (fresh entropy). Every instance gets its
+        own seed spawned from it, which is stored in its manifest.
+    n_workers : int
+        Number of processes generating the instances, by default 1. The instances do
+        not depend on it
 
     Returns
     -------
@@ -67,65 +84,60 @@ def generate_batch(
     )
 
     # Sort combinations by difficulty (sum of parameters)
-    # Models with larger parameter values (more difficult) will be at the end
+    # Models with larger parameter values (more difficult) will be at the end. run_batch
+    # can order the jobs by predicted runtime instead (see runtime_predictor.py)
     param_combinations.sort(key=lambda x: sum(x))
 
+    # One independent seed per instance, derived deterministically from the base seed
+    instance_seeds = [
+        int(child.generate_state(1, dtype=np.uint64)[0])
+        for child in np.random.SeedSequence(seed).spawn(len(param_combinations))
+    ]
+
     print(f"Creating batch with {len(param_combinations)} models...")
 
-    # Path for the batch file
-    batch_file_path = os.path.join(batches_dir, f"{batch_name}.txt")
+    # List the models directory once; names taken in this batch are added as they go
+    models_dir = os.path.join(data_dir, "models")
+    existing = set(os.listdir(models_dir)) if os.path.isdir(models_dir) else set()
 
-    # Process each model
-    with open(batch_file_path, "w") as f:
-        for i, (n_dim, n_clusters, n_points) in enumerate(param_combinations):
-            # Create parameters dict
-            parameters = {
+    tasks = []
+    for i, (n_dim, n_clusters, n_points) in enumerate(param_combinations):
+        # Create a unique filename for this model
+        solver_str = f"{solver}_{subsolver if subsolver else 'direct'}"
+        base_filename = (
+            f"model_{solver_str}_{mode}_{timestamp}_dim{n_dim}_clusters{n_clusters}_"
+            f"points{n_points}"
+        )
+
+        # Always add a counter to the filename
+        counter = 1
+        while f"{base_filename}_{counter}{instances.MANIFEST_EXTENSION}" in existing:
+            counter += 1
+        model_filename = f"{base_filename}_{counter}{instances.MANIFEST_EXTENSION}"
+        existing.add(model_filename)
+
+        # The coordinates are drawn from the seed; the model is rebuilt from them when solving
+        tasks.append(
+            {
+                "filename": model_filename,
                 "n_dimensions": n_dim,
                 "n_clusters": n_clusters,
                 "n_points": n_points,
                 "coord_range": coord_range,
+                "seed": instance_seeds[i],
             }
+        )
 
-            print(f"Building and saving model {i+1}/{len(param_combinations)}")
-
-            # Build the model
-            model = k_means.build_model(**parameters)
-
-            # Create a unique filename for this model
-            solver_str = f"{solver}_{subsolver if subsolver else 'direct'}"
-            base_filename = (
-                f"model_{solver_str}_{mode}_{timestamp}_dim{n_dim}_clusters{n_clusters}_"
-                f"points{n_points}"
-            )
+    # Save the instance manifests
+    instances.generate_instances(tasks, models_dir, n_workers=n_workers)
 
-            # Always add a counter to the filename
-            counter = 1
-            models_dir = os.path.join(data_dir, "models")
-
-            # Find a unique filename with counter
-            while True:
-                model_filename = f"{base_filename}_{counter}.pkl"
-                if not os.path.exists(os.path.join(models_dir, model_filename)):
-                    break
-                counter += 1
-
-            # Save model using solve_model and get the filename
-            saved_filename = solve_model(
-                model=model,
-                reformulation_strategies=[],  # Empty to skip solving, just save model
-                mode=mode,
-                time_limit=0,  # No solving needed
-                save_only=True,  # Just save the model
-                custom_filename=model_filename,  # Use our custom filename
-                solver=solver,
-                subsolver=subsolver,
-            )
+    # Path for the batch file
+    batch_file_path = os.path.join(batches_dir, f"{batch_name}.txt")
 
-            # Write model filename to batch file
-            if saved_filename:
-                f.write(f"{saved_filename}\n")
-            else:
-                print(f"Warning: No filename returned for model {i+1}")
+    # Write model filenames to batch file
+    with open(batch_file_path, "w") as f:
+        for task in tasks:
+            f.write(f"{task['filename']}\n")
 
     print(f"Batch file created: {batch_file_path}")
     print(f"Model names saved to batch file (total: {len(param_combinations)})")
@@ -142,6 +154,26 @@ def run_batch(
     solver_configs: Optional[List[Dict[str, Any]]] = None,
     calculate_relaxation_gap: bool = False,
     relaxation_only: bool = False,
+    use_transform_cache: bool = True,
+    n_cores: int = 1,
+    resume: bool = True,
+    retry_failed: bool = True,
+    max_attempts: int = 3,
+    export_excel: bool = True,
+    compress_logs: bool = False,
+    warm_start: bool = False,
+    cutoff_sources: Optional[List[str]] = None,
+    bounds: str = "box",
+    symmetry_scheme: Optional[str] = None,
+    presolve: bool = False,
+    use_template: bool = False,
+    replay_gams: bool = False,
+    portfolio: bool = False,
+    isolate: bool = False,
+    memory_limit: Optional[float] = None,
+    predict_order: bool = False,
+    predicted_timeouts: str = "run",
+    skip_satisfied: bool = False,
 ) -> None:
     """
     Run k-means models from a batch file using specified reformulation strategies with
@@ -166,6 +198,64 @@ def run_batch(
         Whether to calculate relaxation gap for each model
     relaxation_only : bool
         Whether to solve only the LP relaxation (skip solving the original MIP)
+    use_transform_cache : bool
+        Whether to cache transformed models in data/cache/transformed so that each
+        (model, strategy) pair is transformed once across all solver configurations
+    n_cores : int
+        Core budget of the batch. Solves are single-threaded, so up to n_cores jobs run
+        concurrently in separate processes; 1 runs them serially
+    resume : bool
+        Whether to consult the batch's job ledger (data/ledgers/<batch>.jsonl) and skip
+        jobs it records as done. The ledger is written either way
+    retry_failed : bool
+        Whether to rerun jobs the ledger records as failed
+    max_attempts : int
+        Maximum number of times a failed or interrupted job is started
+    export_excel : bool
+        Whether to export the results store to data/results.xlsx when the batch ends
+    compress_logs : bool
+        Whether to gzip the streamed solver output logs of every run
+    warm_start : bool
+        Whether to start every original problem from a k-means++/Lloyd clustering
+    cutoff_sources : Optional[List[str]]
+        Upper bounds to pass to the solvers as objective cutoff: "heuristic" and/or
+        "recorded" (see solve.solve_model); None solves without cutoff
+    bounds : str
+        Variable bounds to solve with, one of k_means.BOUND_MODES
+    symmetry_scheme : Optional[str]
+        Symmetry-breaking scheme to solve with, one of symmetry.SCHEMES; None keeps the
+        scheme of each model
+    presolve : bool
+        Whether to fix the assignments determined by bound arguments before the
+        reformulation (see presolve.presolve). Apart from linking duplicate points it
+        only has an effect with bounds "data_clusters" and cutoff_sources
+    use_template : bool
+        Whether to solve the direct.* strategies on one reformulated template per model
+        shape and process, swapping in the coordinates of each model (see template.py)
+    replay_gams : bool
+        Whether to write the GAMS file of each (model, strategy) once into
+        data/cache/gams and run every GAMS subsolver on it (see gams_replay.py)
+    portfolio : bool
+        Whether to race the strategies of every model and solver configuration against
+        each other, cancelling the others once one proves optimality (see
+        portfolio.py)
+    isolate : bool
+        Whether to run every job in its own supervised process, stopped by a watchdog
+        when it overruns its time limits (see supervisor.run_supervised)
+    memory_limit : Optional[float]
+        Address space limit per job in GB, set on the supervised or portfolio worker
+        processes; implies isolate outside portfolio mode. None for no limit
+    predict_order : bool
+        Whether to run the jobs longest-first by the runtime predicted from the results
+        store (see runtime_predictor.py); the batch order is kept while there are too
+        few results to fit the predictor
+    predicted_timeouts : str
+        With predict_order, what to do with jobs predicted to time out: "run", "skip"
+        or "shorten" (see runtime_predictor.plan_jobs)
+    skip_satisfied : bool
+        Whether to drop jobs whose results are already in the results store for the same
+        instance data, strategy, solver, tolerances and time limit, under any model or
+        batch name (see jobs.drop_satisfied)
     """
     # Check if batch file exists
     if not os.path.exists(batch_path):
@@ -188,59 +278,106 @@ def run_batch(
               relaxation_only={relaxation_only}"
     )
 
+    transform_cache_dir = None
+    if use_transform_cache:
+        transform_cache_dir = os.path.join(
+            os.path.dirname(os.getcwd()), "data", "cache", "transformed"
+        )
+
+    gams_cache_dir = None
+    if replay_gams:
+        gams_cache_dir = os.path.join(os.path.dirname(os.getcwd()), "data", "cache", "gams")
+
+    if presolve and (bounds != presolve_module.EFFECTIVE_BOUNDS or not cutoff_sources):
+        print(
+            f"Warning: Presolve only links duplicate points unless bounds are "
+            f"{presolve_module.EFFECTIVE_BOUNDS} and a cutoff is given"
+        )
+
     # Default solver config if none provided
     if solver_configs is None:
         solver_configs = [{"solver": "gams", "subsolver": "gurobi"}]
 
     print(f"Will run with {len(solver_configs)} solver configurations:")
     for i, config in enumerate(solver_configs, 1):
-        solver = config.get("solver", "gams")
-        subsolver = config.get("subsolver")
-        solver_str = f"{solver}" + (f" with {subsolver}" if subsolver else " direct")
+        solver_str = jobs.solver_label(config.get("solver", "gams"), config.get("subsolver"))
         print(f"  {i}. {solver_str}")
 
-    # For each solver configuration
-    for config in solver_configs:
-        solver = config.get("solver", "gams")
-        subsolver = config.get("subsolver")
-        solver_str = f"{solver}" + (f" with {subsolver}" if subsolver else " direct")
-
-        print(f"\n{'='*80}")
-        print(f"Running with solver configuration: {solver_str}")
-        print(f"{'='*80}")
-
-        # Process each model with this solver configuration
-        for i, model_name in enumerate(model_names):
-            print(f"Processing model {i+1}/{len(model_names)}: {model_name} with {solver_str}")
-
-            # Process one reformulation strategy at a time
-            for strategy in reformulation_strategies:
-                print(f"  Applying strategy: {strategy}")
-                try:
-                    # Run the model with solve_model using only one strategy
-                    solve_model(
-                        model=None,  # No model since we're loading by name
-                        reformulation_strategies=[strategy],  # Only one strategy at a time
-                        mode=mode,
-                        time_limit=time_limit,
-                        existing_model_name=model_name,
-                        solver=solver,
-                        subsolver=subsolver,
-                        calculate_relaxation_gap=calculate_relaxation_gap,
-                        relaxation_only=relaxation_only,
-                    )
-                    print(f"  Successfully completed strategy: {strategy}")
-
-                except Exception as e:
-                    print(
-                        f"  Error running model {model_name} with {solver_str} and\
-                              strategy {strategy}: {str(e)}"
-                    )
-                    # Continue with next strategy instead of stopping
-                    continue
-
-        print(f"Completed batch run of {len(model_names)} models using {solver_str}")
+    # Expand the grid into independent jobs and run them within the core budget
+    batch_jobs = jobs.expand_jobs(
+        model_names=model_names,
+        reformulation_strategies=reformulation_strategies,
+        solver_configs=solver_configs,
+        mode=mode,
+        time_limit=time_limit,
+        calculate_relaxation_gap=calculate_relaxation_gap,
+        relaxation_only=relaxation_only,
+        transform_cache_dir=transform_cache_dir,
+        solve_options={
+            "compress_logs": compress_logs,
+            "warm_start": warm_start,
+            "cutoff_sources": cutoff_sources,
+            "bounds": bounds,
+            "symmetry_scheme": symmetry_scheme,
+            "presolve": presolve,
+            "use_template": use_template,
+            "gams_cache_dir": gams_cache_dir,
+        },
+    )
+
+    # Every job's state is tracked in the batch ledger so an interrupted batch can resume
+    ledger_path = os.path.join(
+        os.path.dirname(os.getcwd()), "data", "ledgers", f"{batch_name}.jsonl"
+    )
+    models_dir = os.path.join(os.path.dirname(os.getcwd()), "data", "models")
+
+    def select(batch_jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if skip_satisfied:
+            batch_jobs = jobs.drop_satisfied(batch_jobs, models_dir)
+        if resume:
+            batch_jobs = ledger.select_jobs(
+                batch_jobs,
+                ledger.load_ledger(ledger_path),
+                retry_failed=retry_failed,
+                max_attempts=max_attempts,
+            )
+        return batch_jobs
+
+    batch_jobs = select(batch_jobs)
+    if predict_order:
+        predictor = runtime_predictor.fit()
+        if predictor is not None:
+            batch_jobs = runtime_predictor.plan_jobs(
+                batch_jobs, predictor, models_dir, predicted_timeouts=predicted_timeouts
+            )
+            # Shortened jobs have ids of their own; those already run are dropped, so a
+            # resumed batch does not rerun them
+            if predicted_timeouts == "shorten":
+                batch_jobs = select(batch_jobs)
+    for job in batch_jobs:
+        ledger.record_job(ledger_path, jobs.job_id(job), ledger.PENDING)
+
+    if portfolio:
+        outcomes = portfolio_module.run_portfolio(
+            batch_jobs, n_cores=n_cores, ledger_path=ledger_path, memory_limit=memory_limit
+        )
+    elif isolate or memory_limit is not None:
+        outcomes = supervisor.run_supervised(
+            batch_jobs, n_cores=n_cores, ledger_path=ledger_path, memory_limit=memory_limit
+        )
+    else:
+        outcomes = jobs.run_jobs(batch_jobs, n_cores=n_cores, ledger_path=ledger_path)
+
+    n_failed = sum(1 for outcome in outcomes if outcome["status"] not in ("done", ledger.CANCELLED))
+    n_cancelled = sum(1 for outcome in outcomes if outcome["status"] == ledger.CANCELLED)
+    print(
+        f"Completed batch run of {len(batch_jobs)} jobs ({n_failed} failed, "
+        f"{n_cancelled} cancelled)"
+    )
 
+    # Refresh the spreadsheet view of the results store once per batch
+    if export_excel:
+        results_store.export_to_excel()
     print("\nAll solver configurations have been run.")
 
 
@@ -282,8 +419,115 @@ if __name__ == "__main__":
         "'none' to generate new batch). Default: none",
     )
 
+    parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="Rerun all jobs instead of skipping those the batch ledger records as done",
+    )
+    parser.add_argument(
+        "--cores",
+        type=int,
+        default=1,
+        help="Number of cores to use; each single-threaded solve or instance generation "
+        "takes one. Default: 1",
+    )
+    parser.add_argument(
+        "--compress-logs",
+        action="store_true",
+        help="Write solver output logs gzipped (output_log.txt.gz)",
+    )
+    parser.add_argument(
+        "--warm-start",
+        action="store_true",
+        help="Start the solvers from a k-means++/Lloyd clustering of each instance",
+    )
+    parser.add_argument(
+        "--cutoff-from",
+        type=str,
+        nargs="+",
+        choices=["heuristic", "recorded"],
+        default=None,
+        help="Pass the best upper bound from these sources to the solvers as cutoff",
+    )
+    parser.add_argument(
+        "--bounds",
+        type=str,
+        choices=k_means.BOUND_MODES,
+        default="box",
+        help="Variable bounds: coordinate box (default) or derived from the data",
+    )
+    parser.add_argument(
+        "--symmetry",
+        type=str,
+        choices=list(symmetry.SCHEMES),
+        default=None,
+        help="Symmetry-breaking scheme. Default: keep the scheme of each model",
+    )
+    parser.add_argument(
+        "--presolve",
+        action="store_true",
+        help="Fix assignments determined by bound arguments before the reformulation "
+        "(excludes disjuncts only with --bounds data_clusters and --cutoff-from)",
+    )
+    parser.add_argument(
+        "--template",
+        action="store_true",
+        help="Reuse one reformulated template per model shape for the direct.* strategies",
+    )
+    parser.add_argument(
+        "--replay-gams",
+        action="store_true",
+        help="Write each GAMS model once and run every GAMS subsolver on the same file",
+    )
+    parser.add_argument(
+        "--portfolio",
+        action="store_true",
+        help="Race all strategies of a model at once and stop when one proves optimality",
+    )
+    parser.add_argument(
+        "--isolate",
+        action="store_true",
+        help="Run every job in a supervised process stopped by a watchdog when it overruns",
+    )
+    parser.add_argument(
+        "--memory-limit",
+        type=float,
+        default=None,
+        help="Address space limit per job in GB (runs the jobs supervised). Default: none",
+    )
+    parser.add_argument(
+        "--predict-order",
+        action="store_true",
+        help="Run jobs longest-first by the runtime predicted from recorded results",
+    )
+    parser.add_argument(
+        "--predicted-timeouts",
+        type=str,
+        choices=["run", "skip", "shorten"],
+        default="run",
+        help="With --predict-order: run, skip or shorten jobs predicted to time out",
+    )
+    parser.add_argument(
+        "--skip-satisfied",
+        action="store_true",
+        help="Skip jobs whose results are already recorded for the same instance data",
+    )
+    parser.add_argument(
+        "--spec",
+        type=str,
+        default=None,
+        help="Run the experiment described in this TOML spec instead of the grid below",
+    )
+
     args = parser.parse_args()
 
+    if args.spec is not None:
+        # Imported here since experiment imports this module
+        import experiment
+
+        experiment.run_spec(args.spec)
+        raise SystemExit(0)
+
     # Convert "none" string to None
     batch_name: Optional[str] = None if args.batch.lower() == "none" else args.batch
 
@@ -301,6 +545,7 @@ if __name__ == "__main__":
         {"solver": "gams", "subsolver": "scip"},
         # {"solver": "gams", "subsolver": "scip_convex"},
         # {"solver": "scip", "subsolver": None},
+        # {"solver": "bnb", "subsolver": None},
     ]
 
     # Determine batch path based on argument
@@ -327,6 +572,7 @@ if __name__ == "__main__":
             mode=mode,
             solver="gams",  # For initial model generation only
             subsolver="gurobi",  # For initial model generation only
+            n_workers=args.cores,
         )
 
     if not only_generate:
@@ -357,4 +603,20 @@ if __name__ == "__main__":
             solver_configs=solver_configs,  # Run with all specified solver configurations
             calculate_relaxation_gap=False,  # Calculate relaxation gap for each model
             relaxation_only=False,  # Solve both original and relaxed problems
+            n_cores=args.cores,
+            compress_logs=args.compress_logs,
+            warm_start=args.warm_start,
+            cutoff_sources=args.cutoff_from,
+            bounds=args.bounds,
+            symmetry_scheme=args.symmetry,
+            presolve=args.presolve,
+            use_template=args.template,
+            replay_gams=args.replay_gams,
+            portfolio=args.portfolio,
+            isolate=args.isolate,
+            memory_limit=args.memory_limit,
+            predict_order=args.predict_order,
+            predicted_timeouts=args.predicted_timeouts,
+            skip_satisfied=args.skip_satisfied,
+            resume=not args.no_resume,
         )
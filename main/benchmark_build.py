@@ -0,0 +1,238 @@
+import argparse
+import time
+from typing import Dict, List
+
+import direct
+import k_means
+import numpy as np
+
+
+def time_build(
+    n_dimensions: int,
+    n_clusters: int,
+    n_points: int,
+    bulk: bool,
+    repeats: int = 3,
+) -> float:
+    """
+    Time k_means.build_model for one instance size.
+
+    Parameters
+    ----------
+    n_dimensions : int
+        Number of dimensions
+    n_clusters : int
+        Number of clusters
+    n_points : int
+        Number of points
+    bulk : bool
+        Whether to use the bulk construction path
+    repeats : int, optional
+        Number of builds to run, the fastest one is reported, by default 3
+
+    Returns
+    -------
+    float
+        Best build time in seconds
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        k_means.build_model(
+            n_dimensions=n_dimensions,
+            n_clusters=n_clusters,
+            n_points=n_points,
+            coord_range=(-1.0, 1.0),
+            bulk=bulk,
+        )
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(
+    n_points_range: List[int],
+    n_dimensions: int = 2,
+    n_clusters: int = 3,
+    repeats: int = 3,
+) -> Dict[str, List[float]]:
+    """
+    Benchmark build time over a range of point counts for both construction paths.
+
+    Prints the build time per point for every size and the slope of a log-log fit,
+    which should be close to 1 when construction scales linearly.
+
+    Parameters
+    ----------
+    n_points_range : List[int]
+        Point counts to benchmark
+    n_dimensions : int, optional
+        Number of dimensions, by default 2
+    n_clusters : int, optional
+        Number of clusters, by default 3
+    repeats : int, optional
+        Number of builds per size, by default 3
+
+    Returns
+    -------
+    Dict[str, List[float]]
+        Build times in seconds for the "bulk" and "rule" paths, aligned with n_points_range
+    """
+    timings: Dict[str, List[float]] = {"bulk": [], "rule": []}
+
+    print(f"dims={n_dimensions}, clusters={n_clusters}, repeats={repeats}")
+    print(f"{'n_points':>10} {'bulk (s)':>10} {'rule (s)':>10} {'bulk us/pt':>12} {'speedup':>8}")
+    for n_points in n_points_range:
+        bulk_time = time_build(n_dimensions, n_clusters, n_points, bulk=True, repeats=repeats)
+        rule_time = time_build(n_dimensions, n_clusters, n_points, bulk=False, repeats=repeats)
+        timings["bulk"].append(bulk_time)
+        timings["rule"].append(rule_time)
+        print(
+            f"{n_points:>10} {bulk_time:>10.3f} {rule_time:>10.3f} "
+            f"{bulk_time / n_points * 1e6:>12.1f} {rule_time / bulk_time:>8.2f}"
+        )
+
+    if len(n_points_range) > 1:
+        for path, times in timings.items():
+            slope = np.polyfit(np.log(n_points_range), np.log(times), 1)[0]
+            print(f"Log-log slope ({path}): {slope:.2f}")
+
+    return timings
+
+
+def time_reformulation(
+    n_dimensions: int,
+    n_clusters: int,
+    n_points: int,
+    strategy: str,
+    repeats: int = 3,
+) -> float:
+    """
+    Time the reformulation of one built instance with a GDP plugin or a direct emitter.
+
+    Parameters
+    ----------
+    n_dimensions : int
+        Number of dimensions
+    n_clusters : int
+        Number of clusters
+    n_points : int
+        Number of points
+    strategy : str
+        "gdp.bigm", "gdp.hull", "direct.bigm" or "direct.hull" (and their _eps variants)
+    repeats : int, optional
+        Number of reformulations to run, the fastest one is reported, by default 3
+
+    Returns
+    -------
+    float
+        Best reformulation time in seconds
+    """
+    model = k_means.build_model(
+        n_dimensions=n_dimensions,
+        n_clusters=n_clusters,
+        n_points=n_points,
+        coord_range=(-1.0, 1.0),
+        seed=0,
+    )
+    best = float("inf")
+    for _ in range(repeats):
+        instance = model.clone()
+        start = time.perf_counter()
+        if direct.is_direct(strategy):
+            direct.apply(instance, strategy)
+        else:
+            direct.apply_plugin(instance, strategy)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_reformulation_benchmark(
+    n_points_range: List[int],
+    n_dimensions: int = 2,
+    n_clusters: int = 3,
+    repeats: int = 3,
+    formulations: List[str] = ["bigm", "hull"],
+) -> Dict[str, List[float]]:
+    """
+    Benchmark the GDP plugins against the direct emitters over a range of point counts.
+
+    Each direct emitter is first validated against its plugin on a small instance
+    (see direct.validate).
+
+    Parameters
+    ----------
+    n_points_range : List[int]
+        Point counts to benchmark
+    n_dimensions : int, optional
+        Number of dimensions, by default 2
+    n_clusters : int, optional
+        Number of clusters, by default 3
+    repeats : int, optional
+        Number of reformulations per size, by default 3
+    formulations : List[str], optional
+        Formulations to compare, by default ["bigm", "hull"]
+
+    Returns
+    -------
+    Dict[str, List[float]]
+        Reformulation times in seconds per strategy, aligned with n_points_range
+    """
+    small = k_means.build_model(n_dimensions, n_clusters, 10, (-1.0, 1.0), seed=0)
+    for formulation in formulations:
+        direct.validate(small, f"direct.{formulation}")
+
+    timings: Dict[str, List[float]] = {}
+    print(f"dims={n_dimensions}, clusters={n_clusters}, repeats={repeats}")
+    print(f"{'n_points':>10} {'strategy':>12} {'gdp (s)':>10} {'direct (s)':>10} {'speedup':>8}")
+    for n_points in n_points_range:
+        for formulation in formulations:
+            plugin_time = time_reformulation(
+                n_dimensions, n_clusters, n_points, f"gdp.{formulation}", repeats
+            )
+            direct_time = time_reformulation(
+                n_dimensions, n_clusters, n_points, f"direct.{formulation}", repeats
+            )
+            timings.setdefault(f"gdp.{formulation}", []).append(plugin_time)
+            timings.setdefault(f"direct.{formulation}", []).append(direct_time)
+            print(
+                f"{n_points:>10} {formulation:>12} {plugin_time:>10.3f} {direct_time:>10.3f} "
+                f"{plugin_time / direct_time:>8.2f}"
+            )
+
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark k-means model build time")
+    parser.add_argument(
+        "--points",
+        type=int,
+        nargs="+",
+        default=[100, 500, 1000, 2500, 5000, 10000],
+        help="Point counts to benchmark. Default: 100 500 1000 2500 5000 10000",
+    )
+    parser.add_argument("--dims", type=int, default=2, help="Number of dimensions. Default: 2")
+    parser.add_argument("--clusters", type=int, default=3, help="Number of clusters. Default: 3")
+    parser.add_argument("--repeats", type=int, default=3, help="Builds per size. Default: 3")
+    parser.add_argument(
+        "--reformulation",
+        action="store_true",
+        help="Benchmark the GDP plugins against the direct emitters instead of the build",
+    )
+
+    args = parser.parse_args()
+
+    if args.reformulation:
+        run_reformulation_benchmark(
+            n_points_range=args.points,
+            n_dimensions=args.dims,
+            n_clusters=args.clusters,
+            repeats=args.repeats,
+        )
+    else:
+        run_benchmark(
+            n_points_range=args.points,
+            n_dimensions=args.dims,
+            n_clusters=args.clusters,
+            repeats=args.repeats,
+        )
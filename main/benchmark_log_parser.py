@@ -0,0 +1,166 @@
+import argparse
+import os
+import tempfile
+import time
+from typing import Dict, List
+
+import log_parser
+
+# Header, repeated progress line and footer of a synthetic log per solver
+LOG_TEMPLATES = {
+    "gurobi": (
+        "Gurobi Optimizer version 11.0.0 build v11.0.0rc2 (linux64)\n"
+        "Root relaxation: objective 1.234560e-01, 45 iterations, 0.00 seconds\n\n"
+        "    Nodes    |    Current Node    |     Objective Bounds      |     Work\n"
+        " Expl Unexpl |  Obj  Depth IntInf | Incumbent    BestBd   Gap | It/Node Time\n\n",
+        "{i:>6} {j:>5}    1.00000   14    8    3.20000    0.98000  69.4%  12.3 {t:>4}s\n",
+        "\nExplored 5678 nodes (123456 simplex iterations) in 10.02 seconds\n"
+        "Time limit reached\n"
+        "Best objective 3.200000000000e+00, best bound 9.800000000000e-01, gap 69.3750%\n",
+    ),
+    "scip": (
+        "LP0 (120r, 80c) : opt. [1.50000000000000e-01]\n"
+        " time | node  | left  |LP iter|LP it/n|mem/heur|mdpt |vars |cons |rows |cuts "
+        "|sepa|confs|strbr|  dualbound   | primalbound  |  gap   | compl.\n",
+        "{t:>4}s|{i:>6} |{j:>6} |  1000 |  10.0 |  2000k |  12 |  80 | 120 | 120 |   0 "
+        "|  0 |   0 |   0 | 1.500000e-01 | 3.000000e+00 |1900.00%| unknown\n",
+        "SCIP Status        : solving was interrupted [time limit reached]\n"
+        "Solving Nodes      : 4321\n"
+        "Primal Bound       : +3.00000000000000e+00 (3 solutions)\n"
+        "Dual Bound         : +1.20000000000000e+00\n",
+    ),
+    "baron": (
+        "  Iteration       Time (s)     Mem   Lower bound     Upper bound   Progress\n",
+        "{i:>10}             {t:>4}.60     6MB     1.00000         2.50000    50.00%\n",
+        " Total no. of BaR iterations:      42\n"
+        "                    *** Max. allowable time exceeded ***\n"
+        " Best solution  =              2.50000000000\n"
+        " Best possible  =              1.10000000000\n",
+    ),
+}
+
+
+def write_log(path: str, solver: str, size_mb: float) -> int:
+    """
+    Write a synthetic solver log of roughly the given size.
+
+    Parameters
+    ----------
+    path : str
+        Path of the log to write
+    solver : str
+        One of the solvers in LOG_TEMPLATES
+    size_mb : float
+        Target size in megabytes
+
+    Returns
+    -------
+    int
+        Number of lines written
+    """
+    header, row, footer = LOG_TEMPLATES[solver]
+    target = int(size_mb * 1024 * 1024)
+    n_lines = 0
+    with open(path, "w") as f:
+        f.write(header)
+        written = len(header)
+        while written < target:
+            line = row.format(i=n_lines, j=n_lines // 3, t=n_lines // 1000)
+            f.write(line)
+            written += len(line)
+            n_lines += 1
+        f.write(footer)
+    return n_lines
+
+
+def time_scan(path: str, repeats: int = 3) -> float:
+    """Time reading and decoding the log without parsing it (the I/O floor)."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        with open(path, "r", errors="replace") as f:
+            while f.read(log_parser.BLOCK_SIZE):
+                pass
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def time_parse(path: str, solver: str, repeats: int = 3) -> float:
+    """Time log_parser.parse_log on one log."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        log_parser.parse_log(path, solver)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(
+    solvers: List[str], sizes_mb: List[float], repeats: int = 3
+) -> Dict[str, List[float]]:
+    """
+    Benchmark parser throughput on synthetic logs of several sizes.
+
+    Prints the parse throughput in MB/s and the parse time relative to merely reading
+    the log, which shows how much the pattern matching adds on top of the I/O.
+
+    Parameters
+    ----------
+    solvers : List[str]
+        Solvers whose log format to benchmark
+    sizes_mb : List[float]
+        Log sizes in megabytes
+    repeats : int, optional
+        Number of parses per log, the fastest one is reported, by default 3
+
+    Returns
+    -------
+    Dict[str, List[float]]
+        Parse throughput in MB/s per solver, aligned with sizes_mb
+    """
+    throughput: Dict[str, List[float]] = {solver: [] for solver in solvers}
+
+    print(f"repeats={repeats}")
+    print(
+        f"{'solver':>8} {'size (MB)':>10} {'lines':>10} {'parse (s)':>10} "
+        f"{'MB/s':>8} {'vs read':>8}"
+    )
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for solver in solvers:
+            for size_mb in sizes_mb:
+                path = os.path.join(tmp_dir, f"{solver}_{size_mb}.log")
+                n_lines = write_log(path, solver, size_mb)
+                actual_mb = os.path.getsize(path) / (1024 * 1024)
+
+                parse_time = time_parse(path, solver, repeats)
+                scan_time = time_scan(path, repeats)
+                throughput[solver].append(actual_mb / parse_time)
+                print(
+                    f"{solver:>8} {actual_mb:>10.1f} {n_lines:>10} {parse_time:>10.3f} "
+                    f"{actual_mb / parse_time:>8.1f} {parse_time / scan_time:>8.2f}"
+                )
+
+    return throughput
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark solver log parser throughput")
+    parser.add_argument(
+        "--solvers",
+        type=str,
+        nargs="+",
+        default=list(LOG_TEMPLATES),
+        help="Log formats to benchmark. Default: gurobi scip baron",
+    )
+    parser.add_argument(
+        "--sizes",
+        type=float,
+        nargs="+",
+        default=[1, 8, 32],
+        help="Log sizes in MB. Default: 1 8 32",
+    )
+    parser.add_argument("--repeats", type=int, default=3, help="Parses per log. Default: 3")
+
+    args = parser.parse_args()
+
+    run_benchmark(solvers=args.solvers, sizes_mb=args.sizes, repeats=args.repeats)
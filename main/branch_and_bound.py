@@ -0,0 +1,352 @@
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import instances
+import numpy as np
+import pyomo.environ as pyo
+import symmetry
+import warm_start as warm_start_module
+from pyomo.opt import SolverResults, SolverStatus, TerminationCondition
+
+# Name of the solver in solve.solve_with_solver and the results store
+SOLVER_NAME = "bnb"
+
+# Relative and absolute tolerance below which a node cannot improve on the incumbent
+REL_TOL = 1e-9
+ABS_TOL = 1e-9
+
+# Nodes between two checks of the time limit
+CHECK_INTERVAL = 1000
+
+
+def point_order(points: np.ndarray) -> np.ndarray:
+    """
+    Order the points farthest-first, starting with the point farthest from their mean.
+
+    Spread-out points early in the order make the partial assignments costly early, so
+    more of the search tree is pruned.
+
+    Parameters
+    ----------
+    points : np.ndarray
+        Point coordinates of shape (n_points, n_dimensions)
+
+    Returns
+    -------
+    np.ndarray
+        Permutation of the point indices
+    """
+    n_points = len(points)
+    order = [int(((points - points.mean(axis=0)) ** 2).sum(axis=1).argmax())]
+    closest = ((points - points[order[0]]) ** 2).sum(axis=1)
+    closest[order[0]] = -np.inf
+    for _ in range(1, n_points):
+        index = int(closest.argmax())
+        order.append(index)
+        closest = np.minimum(closest, ((points - points[index]) ** 2).sum(axis=1))
+        # Ordered points are never chosen again, also among duplicates
+        closest[index] = -np.inf
+    return np.array(order)
+
+
+class _Search:
+    """Depth-first search over the assignments of one subproblem."""
+
+    def __init__(
+        self,
+        points: np.ndarray,
+        n_clusters: int,
+        tail_bounds: List[float],
+        incumbent: float,
+        deadline: float,
+    ):
+        self.points = points
+        self.n_clusters = n_clusters
+        # tail_bounds[m]: optimal objective of the last m points of the subproblem
+        self.tail_bounds = tail_bounds
+        self.incumbent = incumbent
+        self.best_assignment: Optional[np.ndarray] = None
+        self.deadline = deadline
+        self.nodes = 0
+        self.timed_out = False
+
+        n_points, n_dimensions = points.shape
+        self.assignment = np.full(n_points, -1)
+        self.sums = np.zeros((n_clusters, n_dimensions))
+        self.counts = np.zeros(n_clusters)
+        self.sse = 0.0
+
+    def _improves(self, value: float) -> bool:
+        if not np.isfinite(self.incumbent):
+            return True
+        return value < self.incumbent - max(ABS_TOL, REL_TOL * abs(self.incumbent))
+
+    def run(self) -> None:
+        # Depth-first search with an explicit stack of [depth, candidate order, cost
+        # increases, bound of the unassigned points, position in the order] entries, as
+        # the depth (the number of points) can exceed the recursion limit
+        n_points = len(self.points)
+        stack: List[List[Any]] = []
+        depth = 0
+        while True:
+            if depth == n_points:
+                if self._improves(self.sse):
+                    self.incumbent = self.sse
+                    self.best_assignment = self.assignment.copy()
+            else:
+                self.nodes += 1
+                if self.nodes % CHECK_INTERVAL == 0 and time.perf_counter() > self.deadline:
+                    self.timed_out = True
+                    return
+                stack.append([depth, *self._candidates(depth), 0])
+
+            # Backtrack to the next candidate cluster of the deepest open node
+            while stack:
+                frame = stack[-1]
+                node_depth, order, increase, rest_bound, position = frame
+                point = self.points[node_depth]
+                if position > 0:
+                    cluster = order[position - 1]
+                    self.sse -= increase[cluster]
+                    self.counts[cluster] -= 1
+                    self.sums[cluster] -= point
+                    self.assignment[node_depth] = -1
+                if position == len(order):
+                    stack.pop()
+                    continue
+                cluster = order[position]
+                bound = self.sse + increase[cluster] + rest_bound
+                if not np.isfinite(bound) or not self._improves(bound):
+                    # The candidates are ordered by cost, so none of the rest improves
+                    stack.pop()
+                    continue
+                frame[4] = position + 1
+                self.assignment[node_depth] = cluster
+                self.sums[cluster] += point
+                self.counts[cluster] += 1
+                self.sse += increase[cluster]
+                depth = node_depth + 1
+                break
+            else:
+                return
+
+    def _candidates(self, depth: int) -> Tuple[np.ndarray, np.ndarray, float]:
+        """Clusters the point at a depth can join, by cost increase, and the rest bound."""
+        n_points = len(self.points)
+        point = self.points[depth]
+        counts = self.counts
+        n_open = int(np.count_nonzero(counts))
+        # Cost increase of adding the point to every open cluster (the centroid moves
+        # by 1/(n+1) of the way), and to the first empty cluster (zero)
+        candidates = n_open + 1 if n_open < self.n_clusters else n_open
+        means = self.sums[:n_open] / counts[:n_open, None]
+        increase = np.zeros(candidates)
+        increase[:n_open] = (
+            counts[:n_open] / (counts[:n_open] + 1) * ((point - means) ** 2).sum(axis=1)
+        )
+        # Every cluster has to be used, so the remaining points must fill the empty ones
+        remaining = n_points - depth - 1
+        if self.n_clusters - n_open > remaining:
+            increase[:n_open] = np.inf
+        return np.argsort(increase, kind="stable"), increase, self.tail_bounds[remaining]
+
+
+def _sse(points: np.ndarray, assignment: np.ndarray, n_clusters: int) -> float:
+    """Sum of squared distances of the points to the centroids of their clusters."""
+    total = 0.0
+    for k in range(n_clusters):
+        members = points[assignment == k]
+        if len(members):
+            total += float(((members - members.mean(axis=0)) ** 2).sum())
+    return total
+
+
+def solve_instance(
+    points: np.ndarray,
+    n_clusters: int,
+    time_limit: float = 3600,
+    symmetry_scheme: str = symmetry.DEFAULT_SCHEME,
+    n_init: int = 10,
+    seed: Optional[int] = 0,
+) -> Dict[str, Any]:
+    """
+    Solve the minimum sum-of-squares clustering problem exactly by branch and bound.
+
+    The points are ordered farthest-first, and the problem is solved for the last m
+    points for m = n_clusters + 1, ..., n_points (repetitive branch and bound). The
+    optimal objectives of the smaller subproblems bound the unassigned points of the
+    larger ones, and the partial assignments are bounded by their within-cluster sum
+    of squares, updated for all clusters at once with NumPy. Clusters are opened in
+    order, which removes the label symmetry. The incumbent of every subproblem starts
+    from a k-means++/Lloyd clustering (see warm_start.compute_warm_start).
+
+    Parameters
+    ----------
+    points : np.ndarray
+        Point coordinates of shape (n_points, n_dimensions)
+    n_clusters : int
+        Number of clusters
+    time_limit : float, optional
+        Time limit in seconds, by default 3600
+    symmetry_scheme : str, optional
+        Symmetry-breaking scheme the clusters of the solution are labeled for, by
+        default symmetry.DEFAULT_SCHEME
+    n_init : int, optional
+        Number of k-means++ restarts of the heuristic incumbents, by default 10
+    seed : Optional[int], optional
+        Seed of the heuristic, by default 0
+
+    Returns
+    -------
+    Dict[str, Any]
+        The best clustering (centers, assignment, distances and objective as in
+        compute_warm_start), its lower_bound, the number of nodes, the status
+        ("optimal" or "time_limit") and the time in seconds
+    """
+    start = time.perf_counter()
+    deadline = start + time_limit
+    points = np.asarray(points, dtype=float)
+    n_points = len(points)
+    order = point_order(points)
+    ordered = points[order]
+
+    # tail_bounds[m]: optimal objective of the last m points of the order
+    tail_bounds = [0.0] * (n_points + 1)
+    nodes = 0
+    timed_out = False
+    solved = min(n_clusters, n_points)
+    best_assignment = None
+    incumbent = np.inf
+
+    heuristic = warm_start_module.compute_warm_start(points, n_clusters, n_init, seed)
+    print(f"Found heuristic solution: objective {heuristic['objective']}")
+
+    for m in range(solved + 1, n_points + 1):
+        subproblem = ordered[n_points - m :]
+        if m == n_points:
+            start_assignment = heuristic["assignment"][order]
+            print(f"Root bound: {tail_bounds[m - 1]}")
+        else:
+            start_assignment = warm_start_module.compute_warm_start(
+                subproblem, n_clusters, n_init, seed
+            )["assignment"]
+        search = _Search(
+            subproblem,
+            n_clusters,
+            tail_bounds,
+            _sse(subproblem, start_assignment, n_clusters) * (1 + 2 * REL_TOL) + ABS_TOL,
+            deadline,
+        )
+        search.run()
+        nodes += search.nodes
+        if search.timed_out:
+            timed_out = True
+            break
+        if search.best_assignment is not None:
+            tail_bounds[m] = search.incumbent
+            assignment = search.best_assignment
+        else:
+            # No assignment beats the heuristic, which is optimal then
+            tail_bounds[m] = _sse(subproblem, start_assignment, n_clusters)
+            assignment = start_assignment
+        solved = m
+        print(
+            f"Subproblem {m}/{n_points}: objective {tail_bounds[m]}, nodes {nodes}, "
+            f"time {time.perf_counter() - start:.2f}s"
+        )
+        if m == n_points:
+            best_assignment = assignment
+            incumbent = tail_bounds[m]
+
+    if best_assignment is None:
+        if n_points <= n_clusters:
+            # Every point in its own cluster
+            best_assignment = np.arange(n_points)
+            incumbent = 0.0
+        else:
+            best_assignment = heuristic["assignment"][order]
+            incumbent = _sse(ordered, best_assignment, n_clusters)
+    lower_bound = incumbent if not timed_out else tail_bounds[solved]
+
+    # Back to the input order of the points
+    assignment = np.empty(n_points, dtype=int)
+    assignment[order] = best_assignment
+    centers = np.array(
+        [
+            points[assignment == k].mean(axis=0) if (assignment == k).any() else points[0]
+            for k in range(n_clusters)
+        ]
+    )
+    result = warm_start_module.label_clusters(points, centers, assignment, symmetry_scheme)
+    result.update(
+        {
+            "lower_bound": lower_bound,
+            "nodes": nodes,
+            "status": "time_limit" if timed_out else "optimal",
+            "time": time.perf_counter() - start,
+        }
+    )
+    print(
+        f"Explored {nodes} nodes in {result['time']:.2f} seconds\n"
+        f"Best objective {result['objective']}, best bound {lower_bound}\n"
+        f"Status: {'Time limit reached' if timed_out else 'Optimal solution found'}"
+    )
+    return result
+
+
+def solve_model(
+    model: pyo.ConcreteModel, time_limit: float = 3600, strategy: str = ""
+) -> SolverResults:
+    """
+    Solve the instance behind a (transformed) k-means model and load the solution.
+
+    The clustering problem of the instance is solved by solve_instance; restrictions
+    the model adds beyond it (fixed assignments, linked duplicate points) are not
+    imposed, as they keep an optimal clustering feasible. The solution is set as the
+    values of the model like a warm start (see warm_start.apply_warm_start).
+
+    Parameters
+    ----------
+    model : pyo.ConcreteModel
+        A model created by k_means.build_model, before or after its GDP transformation,
+        with integer indicator variables
+    time_limit : float, optional
+        Time limit in seconds, by default 3600
+    strategy : str, optional
+        Reformulation strategy applied to the model, used to set the disaggregated
+        variables of hull reformulations, by default ""
+
+    Returns
+    -------
+    SolverResults
+        Results with the bounds, solver status and termination condition
+    """
+    if any(
+        not disjunct.binary_indicator_var.is_binary() for disjunct in model.disjunct_blocks.values()
+    ):
+        raise ValueError("The branch and bound solves the original (integer) problem only")
+
+    instance = instances.instance_from_model(model)
+    solve_start = time.perf_counter()
+    solution = solve_instance(
+        instance["points"],
+        instance["n_clusters"],
+        time_limit=time_limit,
+        symmetry_scheme=symmetry.scheme_of(model),
+    )
+    print(f"      {time.perf_counter() - solve_start:6.2f} seconds required for solver")
+    warm_start_module.apply_warm_start(model, solution, strategy)
+
+    results = SolverResults()
+    results.problem.sense = pyo.minimize
+    results.problem.lower_bound = solution["lower_bound"]
+    results.problem.upper_bound = solution["objective"]
+    results.solver.name = SOLVER_NAME
+    results.solver.status = SolverStatus.ok
+    results.solver.termination_condition = (
+        TerminationCondition.optimal
+        if solution["status"] == "optimal"
+        else TerminationCondition.maxTimeLimit
+    )
+    results.solver.wallclock_time = solution["time"]
+    return results
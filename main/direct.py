@@ -0,0 +1,537 @@
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pyomo.environ as pyo
+import pyomo.gdp as gdp
+from pyomo.common.gc_manager import PauseGC
+
+# Strategies emitted directly; "direct.hull_eps_<eps>" selects the hull epsilon
+STRATEGIES = ["direct.bigm", "direct.hull"]
+
+# Epsilon of the Furman-Sawaya-Grossmann perspective, as in gdp.hull
+DEFAULT_EPS = 1e-4
+
+
+def is_direct(strategy: str) -> bool:
+    """
+    Whether a reformulation strategy is emitted by this module.
+
+    Parameters
+    ----------
+    strategy : str
+        Reformulation strategy
+
+    Returns
+    -------
+    bool
+        True for "direct.bigm", "direct.hull" and "direct.hull_eps_<eps>"
+    """
+    return strategy.startswith("direct.")
+
+
+def plugin_strategy(strategy: str) -> str:
+    """
+    GDP transformation whose output a direct strategy reproduces.
+
+    Parameters
+    ----------
+    strategy : str
+        A direct reformulation strategy
+
+    Returns
+    -------
+    str
+        "gdp.bigm", "gdp.hull" or "gdp.hull_eps_<eps>"
+    """
+    return "gdp." + strategy[len("direct.") :]
+
+
+def hull_epsilon(strategy: str) -> float:
+    """
+    Epsilon of a hull strategy.
+
+    Parameters
+    ----------
+    strategy : str
+        A (direct or plugin) hull strategy
+
+    Returns
+    -------
+    float
+        The epsilon given as "_eps_<eps>" suffix, DEFAULT_EPS otherwise
+    """
+    if "hull_eps" in strategy:
+        return float(strategy.split("_")[-1])
+    return DEFAULT_EPS
+
+
+def apply_plugin(model: pyo.ConcreteModel, strategy: str, targets: Optional[list] = None) -> None:
+    """
+    Apply the Pyomo GDP transformation of a (plugin) strategy.
+
+    Parameters
+    ----------
+    model : pyo.ConcreteModel
+        The model to transform
+    strategy : str
+        "gdp.bigm", "gdp.hull" or "gdp.hull_eps_<eps>"
+    targets : Optional[list], optional
+        Disjunctions to transform, by default None (all)
+    """
+    options: Dict[str, Any] = {} if targets is None else {"targets": targets}
+    if strategy.startswith("gdp.hull"):
+        pyo.TransformationFactory("gdp.hull").apply_to(model, EPS=hull_epsilon(strategy), **options)
+    else:
+        pyo.TransformationFactory(strategy).apply_to(model, **options)
+
+
+def _model_arrays(model: pyo.ConcreteModel) -> Dict[str, np.ndarray]:
+    """Point coordinates and variable bounds of a k-means model as arrays."""
+    clusters, points, dimensions = list(model.clusters), list(model.points), list(model.dimensions)
+    center_bounds = np.array(
+        [[model.center_coordinates[k, j].bounds for j in dimensions] for k in clusters],
+        dtype=float,
+    )
+    distance_bounds = np.array([model.distance[i].bounds for i in points], dtype=float)
+    if np.isnan(center_bounds).any() or np.isnan(distance_bounds).any():
+        raise ValueError(
+            "Direct reformulations require bounds on all center and distance variables"
+        )
+    return {
+        "points": np.array(
+            [[pyo.value(model.points_coordinates[i, j]) for j in dimensions] for i in points]
+        ),
+        "center_lower": center_bounds[:, :, 0],
+        "center_upper": center_bounds[:, :, 1],
+        "distance_lower": distance_bounds[:, 0],
+        "distance_upper": distance_bounds[:, 1],
+    }
+
+
+def _coordinate_rows(model: pyo.ConcreteModel, np_points: np.ndarray) -> list:
+    """Point coordinates as rows of constants, or of the Params of a mutable model."""
+    if model.points_coordinates.mutable:
+        return [[model.points_coordinates[i, j] for j in model.dimensions] for i in model.points]
+    return np_points.tolist()
+
+
+def _big_m(arrays: Dict[str, np.ndarray]) -> np.ndarray:
+    """Big-M values of gdp.bigm for all (k, i), of shape (n_clusters, n_points)."""
+    np_points = arrays["points"]
+    farthest = np.maximum(
+        (np_points[None, :, :] - arrays["center_lower"][:, None, :]) ** 2,
+        (np_points[None, :, :] - arrays["center_upper"][:, None, :]) ** 2,
+    )
+    return farthest.sum(axis=2) - arrays["distance_lower"][None, :]
+
+
+def _finish(model: pyo.ConcreteModel, strategy: str) -> None:
+    """Deactivate the assignment disjunctions and transform any other disjunction."""
+    for disjunct in model.disjunct_blocks.values():
+        disjunct._deactivate_without_fixing_indicator()
+    model.assignment.deactivate()
+    remaining = list(model.component_objects(gdp.Disjunction, active=True))
+    if remaining:
+        apply_plugin(model, _remaining_strategy(strategy), targets=remaining)
+
+
+def _remaining_strategy(strategy: str) -> str:
+    """Plugin strategy for the disjunctions besides the assignment (gdp.hull needs eps > 0)."""
+    if strategy.startswith("direct.hull") and not hull_epsilon(strategy):
+        return "gdp.hull"
+    return plugin_strategy(strategy)
+
+
+def emit_bigm(model: pyo.ConcreteModel) -> None:
+    """
+    Reformulate the assignment disjunctions of a k-means model with big-M constraints.
+
+    Emits sum_j (p_ij - c_kj)^2 - d_i <= M_ki (1 - y_ki) and sum_k y_ki = 1 with the
+    big-M values gdp.bigm derives from the variable bounds,
+    M_ki = sum_j max((p_ij - lb(c_kj))^2, (p_ij - ub(c_kj))^2) - lb(d_i),
+    computed for all (k, i) at once from the coordinate array. For a model with mutable
+    coordinates (k_means.build_model(mutable=True)) the big-M values are mutable Params
+    as well, see update_parameters.
+
+    Parameters
+    ----------
+    model : pyo.ConcreteModel
+        A model created by k_means.build_model, before its GDP transformation
+    """
+    arrays = _model_arrays(model)
+    big_m = _big_m(arrays)
+    mutable = model.points_coordinates.mutable
+
+    y = {key: model.disjunct_blocks[key].binary_indicator_var for key in model.disjunct_blocks}
+    center_vars = [
+        [model.center_coordinates[k, j] for j in model.dimensions] for k in model.clusters
+    ]
+
+    with PauseGC():
+        model.direct_bigm = pyo.Block()
+        block = model.direct_bigm
+        block.indicator_vars = pyo.Reference(model.disjunct_blocks[:, :].binary_indicator_var)
+        block.assignment_xor = pyo.Constraint(
+            model.points, rule=lambda block, i: sum(y[k, i] for k in model.clusters) == 1
+        )
+        if mutable:
+            block.big_m = pyo.Param(
+                model.clusters,
+                model.points,
+                initialize=lambda block, k, i: float(big_m[k - 1, i - 1]),
+                mutable=True,
+            )
+        block.distance_cut = pyo.Constraint(model.clusters, model.points)
+        for i, row in enumerate(_coordinate_rows(model, arrays["points"]), start=1):
+            distance_i = model.distance[i]
+            for k, centers in enumerate(center_vars, start=1):
+                m_ki = block.big_m[k, i] if mutable else float(big_m[k - 1, i - 1])
+                block.distance_cut[k, i] = (
+                    sum((p - c) ** 2 for p, c in zip(row, centers))
+                    - distance_i
+                    - m_ki * (1 - y[k, i])
+                    <= 0
+                )
+
+    _finish(model, "direct.bigm")
+
+
+def emit_hull(model: pyo.ConcreteModel, epsilon: float = DEFAULT_EPS) -> None:
+    """
+    Reformulate the assignment disjunctions of a k-means model as their (epsilon-)hull.
+
+    Every disjunction i gets, per disjunct k, a copy v_ki of center k and w_ki of d_i,
+    and a copy of center k for the other disjuncts, with the same bounds and
+    disaggregation constraints as gdp.hull. The perspective of the disjunct constraint
+    is gdp.hull's Furman-Sawaya-Grossmann perspective multiplied by its positive
+    denominator lambda = (1 - eps) y + eps, which makes it quadratic:
+
+        sum_j (p_ij lambda - v_kij)^2 - w_ki lambda - eps |p_i|^2 (1 - y_ki) lambda <= 0
+
+    With eps = 0 this is the rotated second-order cone sum_j (p_ij y - v_kij)^2 <= w y.
+    For a model with mutable coordinates the perspectives reference the coordinate
+    Params and mutable squared norms |p_i|^2, see update_parameters.
+
+    Parameters
+    ----------
+    model : pyo.ConcreteModel
+        A model created by k_means.build_model, before its GDP transformation
+    epsilon : float, optional
+        Epsilon of the perspective, by default DEFAULT_EPS
+    """
+    arrays = _model_arrays(model)
+    np_points = arrays["points"]
+    center_lower, center_upper = arrays["center_lower"], arrays["center_upper"]
+    distance_lower, distance_upper = arrays["distance_lower"], arrays["distance_upper"]
+    squared_norms = (np_points**2).sum(axis=1)
+    mutable = model.points_coordinates.mutable
+
+    y = {key: model.disjunct_blocks[key].binary_indicator_var for key in model.disjunct_blocks}
+    c = model.center_coordinates
+
+    with PauseGC():
+        model.direct_hull = pyo.Block()
+        block = model.direct_hull
+        block.indicator_vars = pyo.Reference(model.disjunct_blocks[:, :].binary_indicator_var)
+
+        # A disaggregated variable is zero when its disjunct(s) are not selected
+        def center_bounds(block, k, i, j):
+            return min(0.0, center_lower[k - 1, j - 1]), max(0.0, center_upper[k - 1, j - 1])
+
+        block.center = pyo.Var(model.clusters, model.points, model.dimensions, bounds=center_bounds)
+        block.center_rest = pyo.Var(
+            model.clusters, model.points, model.dimensions, bounds=center_bounds
+        )
+        block.distance = pyo.Var(
+            model.clusters,
+            model.points,
+            bounds=lambda block, k, i: (
+                min(0.0, distance_lower[i - 1]),
+                max(0.0, distance_upper[i - 1]),
+            ),
+        )
+
+        block.assignment_xor = pyo.Constraint(
+            model.points, rule=lambda block, i: sum(y[k, i] for k in model.clusters) == 1
+        )
+        block.center_split = pyo.Constraint(
+            model.clusters,
+            model.points,
+            model.dimensions,
+            rule=lambda block, k, i, j: (
+                c[k, j] == block.center[k, i, j] + block.center_rest[k, i, j]
+            ),
+        )
+        block.distance_split = pyo.Constraint(
+            model.points,
+            rule=lambda block, i: (
+                model.distance[i] == sum(block.distance[k, i] for k in model.clusters)
+            ),
+        )
+
+        def center_bound_rule(block, k, i, j, side, rest):
+            var = block.center_rest[k, i, j] if rest else block.center[k, i, j]
+            share = 1 - y[k, i] if rest else y[k, i]
+            if side == "lb":
+                bound = center_lower[k - 1, j - 1]
+                return pyo.Constraint.Skip if not bound else float(bound) * share - var <= 0
+            bound = center_upper[k - 1, j - 1]
+            return pyo.Constraint.Skip if not bound else var - float(bound) * share <= 0
+
+        block.center_bounds = pyo.Constraint(
+            model.clusters,
+            model.points,
+            model.dimensions,
+            ["lb", "ub"],
+            [False, True],
+            rule=center_bound_rule,
+        )
+
+        def distance_bound_rule(block, k, i, side):
+            bound = distance_lower[i - 1] if side == "lb" else distance_upper[i - 1]
+            if not bound:
+                return pyo.Constraint.Skip
+            if side == "lb":
+                return float(bound) * y[k, i] - block.distance[k, i] <= 0
+            return block.distance[k, i] - float(bound) * y[k, i] <= 0
+
+        block.distance_bounds = pyo.Constraint(
+            model.clusters, model.points, ["lb", "ub"], rule=distance_bound_rule
+        )
+
+        if mutable:
+            block.squared_norm = pyo.Param(
+                model.points,
+                initialize=lambda block, i: float(squared_norms[i - 1]),
+                mutable=True,
+            )
+        block.perspective = pyo.Constraint(model.clusters, model.points)
+        for i, row in enumerate(_coordinate_rows(model, np_points), start=1):
+            squared_norm = block.squared_norm[i] if mutable else float(squared_norms[i - 1])
+            for k in model.clusters:
+                y_ki = y[k, i]
+                if epsilon:
+                    scale = (1 - epsilon) * y_ki + epsilon
+                    offset = epsilon * squared_norm * (1 - y_ki) * scale
+                else:
+                    scale = y_ki
+                    offset = 0
+                block.perspective[k, i] = (
+                    sum(
+                        (p * scale - block.center[k, i, j]) ** 2 for j, p in enumerate(row, start=1)
+                    )
+                    - block.distance[k, i] * scale
+                    - offset
+                    <= 0
+                )
+
+    _finish(model, f"direct.hull_eps_{epsilon}")
+
+
+def apply(model: pyo.ConcreteModel, strategy: str) -> None:
+    """
+    Apply a direct reformulation strategy to a model in place.
+
+    Parameters
+    ----------
+    model : pyo.ConcreteModel
+        A model created by k_means.build_model, before its GDP transformation
+    strategy : str
+        "direct.bigm", "direct.hull" or "direct.hull_eps_<eps>"
+    """
+    if strategy == "direct.bigm":
+        emit_bigm(model)
+    elif strategy.startswith("direct.hull"):
+        emit_hull(model, hull_epsilon(strategy))
+    else:
+        raise ValueError(f"Unknown direct strategy: {strategy}. Use one of {STRATEGIES}")
+
+
+def update_parameters(model: pyo.ConcreteModel) -> None:
+    """
+    Recompute the data-dependent Params of a direct reformulation with mutable coordinates.
+
+    To be called after the points_coordinates of a model built with
+    k_means.build_model(mutable=True) and reformulated by a direct strategy were
+    changed. The variable bounds are taken as they are; the disaggregated bounds of
+    direct.hull and the constraints skipped for zero bounds only depend on them.
+
+    Parameters
+    ----------
+    model : pyo.ConcreteModel
+        A model with mutable coordinates, reformulated by a direct strategy
+    """
+    if not model.points_coordinates.mutable:
+        raise ValueError("The model was not built with mutable coordinates")
+    arrays = _model_arrays(model)
+    bigm_block = model.component("direct_bigm")
+    if bigm_block is not None:
+        big_m = _big_m(arrays)
+        bigm_block.big_m.store_values(
+            {(k, i): float(big_m[k - 1, i - 1]) for k, i in bigm_block.big_m}
+        )
+    hull_block = model.component("direct_hull")
+    if hull_block is not None:
+        squared_norms = (arrays["points"] ** 2).sum(axis=1)
+        hull_block.squared_norm.store_values(
+            {i: float(squared_norms[i - 1]) for i in hull_block.squared_norm}
+        )
+
+
+def get_disaggregated_var(var: Any, disjunct: gdp.Disjunct) -> Any:
+    """
+    Copy of a center or distance variable for an assignment disjunct of direct.hull.
+
+    Mirrors the get_disaggregated_var method of the gdp.hull transformation.
+
+    Parameters
+    ----------
+    var : Any
+        A center_coordinates or distance variable of the model
+    disjunct : gdp.Disjunct
+        An assignment disjunct (disjunct_blocks[k, i]) of a direct.hull model
+
+    Returns
+    -------
+    Any
+        The disaggregated variable
+    """
+    model = disjunct.model()
+    block = model.component("direct_hull")
+    if block is None or disjunct.parent_component() is not model.disjunct_blocks:
+        raise ValueError(f"{disjunct.name} was not reformulated by direct.hull")
+    k, i = disjunct.index()
+    if var.parent_component() is model.distance and var.index() == i:
+        return block.distance[k, i]
+    if var.parent_component() is model.center_coordinates:
+        k_var, j = var.index()
+        return block.center[k, i, j] if k_var == k else block.center_rest[k_var, i, j]
+    raise ValueError(f"{var.name} is not disaggregated for {disjunct.name}")
+
+
+def _violations(model: pyo.ConcreteModel, scales: Dict[str, float]) -> np.ndarray:
+    """Sorted violations of all active constraints, divided by the given scales."""
+    violations = []
+    for constraint in model.component_data_objects(pyo.Constraint, active=True):
+        body = pyo.value(constraint.body)
+        violation = 0.0
+        if constraint.lower is not None:
+            violation = max(violation, pyo.value(constraint.lower) - body)
+        if constraint.upper is not None:
+            violation = max(violation, body - pyo.value(constraint.upper))
+        violations.append(violation / scales.get(constraint.name, 1.0))
+    return np.sort(np.array(violations))
+
+
+def validate(
+    model: pyo.ConcreteModel, strategy: str, n_samples: int = 10, seed: Optional[int] = 0
+) -> Dict[str, float]:
+    """
+    Compare a direct reformulation with the output of the corresponding GDP plugin.
+
+    The exact hull (eps = 0) has no plugin counterpart. Disjunctions besides the
+    assignment are transformed by the plugin in both models. Both reformulations of
+    the model are evaluated at random points: every variable of
+    the direct model (indicators continuous in [0, 1]) is drawn within its bounds and
+    copied to its counterpart in the plugin model. The reformulations are equivalent
+    if they have the same variable bounds and, at every sample, the same sorted
+    constraint violations (perspective constraints divided by their lambda).
+
+    Parameters
+    ----------
+    model : pyo.ConcreteModel
+        A model created by k_means.build_model, before its GDP transformation
+    strategy : str
+        A direct reformulation strategy
+    n_samples : int, optional
+        Number of random points, by default 10
+    seed : Optional[int], optional
+        Seed of the random generator, by default 0
+
+    Returns
+    -------
+    Dict[str, float]
+        Numbers of constraints and variables of both reformulations, the largest
+        difference of a variable bound and the largest difference of a violation
+    """
+    if strategy.startswith("direct.hull") and not hull_epsilon(strategy):
+        raise ValueError("gdp.hull has no exact (eps = 0) counterpart to validate against")
+
+    # Other disjunctions first, so their reformulation is named as in the direct model
+    plugin_model = model.clone()
+    remaining = [
+        disjunction
+        for disjunction in plugin_model.component_objects(gdp.Disjunction, active=True)
+        if disjunction is not plugin_model.assignment
+    ]
+    if remaining:
+        apply_plugin(plugin_model, plugin_strategy(strategy), targets=remaining)
+    apply_plugin(plugin_model, plugin_strategy(strategy), targets=[plugin_model.assignment])
+    direct_model = model.clone()
+    apply(direct_model, strategy)
+
+    hull = pyo.TransformationFactory("gdp.hull")
+    direct_block = direct_model.component("direct_hull")
+    pairs = []
+    for var in direct_model.component_data_objects(pyo.Var, active=None, descend_into=True):
+        if direct_block is not None and var.parent_block() is direct_block:
+            k, i = var.index()[:2]
+            disjunct = plugin_model.disjunct_blocks[k, i]
+            if var.parent_component() is direct_block.distance:
+                original = plugin_model.distance[i]
+            else:
+                original = plugin_model.center_coordinates[k, var.index()[2]]
+                if var.parent_component() is direct_block.center_rest:
+                    # The copy of center k shared by the other disjuncts of disjunction i
+                    other = next(k_other for k_other in model.clusters if k_other != k)
+                    disjunct = plugin_model.disjunct_blocks[other, i]
+            pairs.append((var, hull.get_disaggregated_var(original, disjunct)))
+        else:
+            pairs.append((var, plugin_model.find_component(var.name)))
+
+    bound_difference = 0.0
+    for var, plugin_var in pairs:
+        for bound, plugin_bound in zip(var.bounds, plugin_var.bounds):
+            if (bound is None) != (plugin_bound is None):
+                bound_difference = np.inf
+            elif bound is not None:
+                bound_difference = max(bound_difference, abs(bound - plugin_bound))
+
+    rng = np.random.default_rng(seed)
+    epsilon = hull_epsilon(strategy)
+    violation_difference = 0.0
+    n_constraints = (0, 0)
+    for _ in range(n_samples):
+        for var, plugin_var in pairs:
+            if not var.fixed:
+                lower = -10.0 if var.lb is None else var.lb
+                upper = 10.0 if var.ub is None else var.ub
+                var.set_value(float(rng.uniform(lower, upper)), skip_validation=True)
+            plugin_var.set_value(var.value, skip_validation=True)
+        scales = {}
+        if direct_block is not None:
+            for (k, i), constraint in direct_block.perspective.items():
+                y = pyo.value(direct_model.disjunct_blocks[k, i].binary_indicator_var)
+                scales[constraint.name] = (1 - epsilon) * y + epsilon if epsilon else y
+        direct_violations = _violations(direct_model, scales)
+        plugin_violations = _violations(plugin_model, {})
+        n_constraints = (len(direct_violations), len(plugin_violations))
+        if n_constraints[0] != n_constraints[1]:
+            violation_difference = np.inf
+            break
+        violation_difference = max(
+            violation_difference, float(np.max(np.abs(direct_violations - plugin_violations)))
+        )
+
+    summary = {
+        "direct_constraints": n_constraints[0],
+        "plugin_constraints": n_constraints[1],
+        "direct_variables": len(pairs),
+        "plugin_variables": sum(
+            1 for _ in plugin_model.component_data_objects(pyo.Var, active=None, descend_into=True)
+        ),
+        "max_bound_difference": bound_difference,
+        "max_violation_difference": violation_difference,
+    }
+    print(f"Validation of {strategy} against {plugin_strategy(strategy)}: {summary}")
+    return summary
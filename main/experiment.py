@@ -0,0 +1,214 @@
+import argparse
+import hashlib
+import inspect
+import os
+import tomllib
+from itertools import product
+from typing import Any, Dict, List
+
+import batch_run
+import instances
+import numpy as np
+
+# Keys of the spec other than the run_batch options
+SPEC_KEYS = ["name", "mode", "time_limit", "strategies", "solvers", "instances", "options"]
+
+
+def load_spec(spec_path: str) -> Dict[str, Any]:
+    """
+    Load and validate an experiment spec.
+
+    A spec is a TOML file such as
+
+        name = "hull_vs_bigm"
+        mode = "no_mode"
+        time_limit = 300
+        strategies = ["gdp.bigm", "gdp.hull"]
+
+        [[solvers]]
+        solver = "gams"
+        subsolver = "gurobi"
+
+        [instances]
+        dimensions = [2, 3]
+        clusters = [3, 4]
+        points = [10, 12]
+        coord_range = [-1.0, 1.0]
+        replicates = 2
+        seed = 0
+
+        [options]
+        n_cores = 4
+        calculate_relaxation_gap = true
+
+    The instances are either generated from the grid of dimensions, clusters and points
+    (see expand_instances) or taken from an existing batch with `batch = "<name>"`.
+    The options are passed to batch_run.run_batch as keyword arguments.
+
+    Parameters
+    ----------
+    spec_path : str
+        Path to the spec
+
+    Returns
+    -------
+    Dict[str, Any]
+        The spec with defaults filled in (mode "approximation", time limit 3600, a
+        single GAMS/Gurobi solver configuration, one replicate, coordinates in [0, 10]
+        and no options)
+    """
+    with open(spec_path, "rb") as f:
+        spec = tomllib.load(f)
+
+    unknown = [key for key in spec if key not in SPEC_KEYS]
+    if unknown:
+        raise ValueError(f"Unknown keys in experiment spec {spec_path}: {unknown}")
+    for key in ["name", "strategies", "instances"]:
+        if key not in spec:
+            raise ValueError(f"Experiment spec {spec_path} has no {key}")
+
+    spec.setdefault("mode", "approximation")
+    spec.setdefault("time_limit", 3600)
+    spec.setdefault("solvers", [{"solver": "gams", "subsolver": "gurobi"}])
+    spec.setdefault("options", {})
+    for config in spec["solvers"]:
+        # TOML has no null, so a missing subsolver means none
+        config.setdefault("subsolver", None)
+
+    grid = spec["instances"]
+    if "batch" not in grid:
+        for key in ["dimensions", "clusters", "points"]:
+            if key not in grid:
+                raise ValueError(f"Experiment spec {spec_path} has no instances.{key}")
+        grid.setdefault("coord_range", [0.0, 10.0])
+        grid.setdefault("replicates", 1)
+        grid.setdefault("seed", 0)
+
+    run_batch_parameters = inspect.signature(batch_run.run_batch).parameters
+    fixed = ["batch_path", "reformulation_strategies", "mode", "time_limit", "solver_configs"]
+    invalid = [
+        option
+        for option in spec["options"]
+        if option not in run_batch_parameters or option in fixed
+    ]
+    if invalid:
+        raise ValueError(f"Invalid options in experiment spec {spec_path}: {invalid}")
+
+    return spec
+
+
+def expand_instances(spec: Dict[str, Any], data_dir: str) -> str:
+    """
+    Create the batch file of an experiment, generating its instances if needed.
+
+    Generated instances are named after the experiment, a tag of the spec seed and
+    coordinate range, and their grid point, and the coordinates of every replicate are
+    drawn from a seed derived from the spec seed and the grid point. Expanding a spec
+    again therefore reuses the existing manifests, growing the grid only generates the
+    new grid points, and changing the seed or range generates new instances.
+
+    Parameters
+    ----------
+    spec : Dict[str, Any]
+        A spec from load_spec
+    data_dir : str
+        The data directory with the batches and models subdirectories
+
+    Returns
+    -------
+    str
+        Path to the batch file
+    """
+    grid = spec["instances"]
+    batches_dir = os.path.join(data_dir, "batches")
+    if "batch" in grid:
+        batch_path = os.path.join(batches_dir, f"{grid['batch']}.txt")
+        if not os.path.exists(batch_path):
+            raise FileNotFoundError(f"Batch file not found: {batch_path}")
+        return batch_path
+
+    models_dir = os.path.join(data_dir, "models")
+    coord_range = (float(grid["coord_range"][0]), float(grid["coord_range"][1]))
+    grid_tag = hashlib.sha256(repr((int(grid["seed"]), coord_range)).encode()).hexdigest()[:8]
+    # Sort combinations by difficulty (sum of parameters) as generate_batch does; values
+    # listed twice in the spec would name the same instances twice
+    param_combinations = sorted(
+        product(*(sorted(set(grid[key])) for key in ["dimensions", "clusters", "points"])),
+        key=lambda x: sum(x),
+    )
+    existing = set(os.listdir(models_dir)) if os.path.isdir(models_dir) else set()
+    model_names: List[str] = []
+    tasks = []
+    for (n_dim, n_clusters, n_points), replicate in product(
+        param_combinations, range(grid["replicates"])
+    ):
+        model_filename = (
+            f"exp_{spec['name']}_{grid_tag}_dim{n_dim}_clusters{n_clusters}_points{n_points}_"
+            f"{replicate + 1}{instances.MANIFEST_EXTENSION}"
+        )
+        model_names.append(model_filename)
+        if model_filename in existing:
+            continue
+
+        seed = int(
+            np.random.SeedSequence(
+                [grid["seed"], n_dim, n_clusters, n_points, replicate]
+            ).generate_state(1, dtype=np.uint64)[0]
+        )
+        tasks.append(
+            {
+                "filename": model_filename,
+                "n_dimensions": n_dim,
+                "n_clusters": n_clusters,
+                "n_points": n_points,
+                "coord_range": coord_range,
+                "seed": seed,
+            }
+        )
+    instances.generate_instances(tasks, models_dir, n_workers=spec["options"].get("n_cores", 1))
+
+    os.makedirs(batches_dir, exist_ok=True)
+    batch_path = os.path.join(batches_dir, f"exp_{spec['name']}.txt")
+    with open(batch_path, "w") as f:
+        for model_name in model_names:
+            f.write(f"{model_name}\n")
+
+    print(
+        f"Experiment '{spec['name']}': {len(model_names)} instances "
+        f"({len(tasks)} generated), batch file {batch_path}"
+    )
+    return batch_path
+
+
+def run_spec(spec_path: str) -> None:
+    """
+    Run the experiment described in a spec.
+
+    The experiment runs as a batch of its own (with its own ledger), and jobs whose
+    results are already in the results store are skipped, even if they were run under
+    another batch or model name (see jobs.drop_satisfied).
+
+    Parameters
+    ----------
+    spec_path : str
+        Path to the spec
+    """
+    spec = load_spec(spec_path)
+    batch_path = expand_instances(spec, os.path.join(os.path.dirname(os.getcwd()), "data"))
+    batch_run.run_batch(
+        batch_path=batch_path,
+        reformulation_strategies=spec["strategies"],
+        mode=spec["mode"],
+        time_limit=spec["time_limit"],
+        solver_configs=spec["solvers"],
+        **{"skip_satisfied": True, **spec["options"]},
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run an experiment from a TOML spec")
+    parser.add_argument("spec", type=str, help="Path to the experiment spec")
+
+    args = parser.parse_args()
+
+    run_spec(args.spec)
@@ -0,0 +1,311 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Tuple
+
+import model_cache
+import numpy as np
+import pyomo.environ as pyo
+from pyomo.opt import ProblemFormat, SolverResults, SolverStatus, TerminationCondition
+
+MODEL_FILE = "model.gms"
+META_FILE = "meta.json"
+# Written into the run directory of every solve; selects the solver and its options
+RUN_OPTIONS_FILE = "run_options.gms"
+
+# GAMS solve status -> (solver status, termination condition), as in Pyomo's GAMSShell
+SOLVE_STATUS = {
+    1: (SolverStatus.ok, None),
+    2: (SolverStatus.ok, TerminationCondition.maxIterations),
+    3: (SolverStatus.ok, TerminationCondition.maxTimeLimit),
+    4: (SolverStatus.warning, None),
+    5: (SolverStatus.ok, TerminationCondition.maxEvaluations),
+    6: (SolverStatus.unknown, None),
+    7: (SolverStatus.aborted, TerminationCondition.licensingProblems),
+    8: (SolverStatus.aborted, TerminationCondition.userInterrupt),
+    9: (SolverStatus.error, None),
+    10: (SolverStatus.error, TerminationCondition.solverFailure),
+    11: (SolverStatus.error, TerminationCondition.internalSolverError),
+    12: (SolverStatus.error, None),
+    13: (SolverStatus.error, None),
+}
+
+# GAMS model status -> termination condition; other statuses keep the one of the solve
+# status, or take FALLBACK_CONDITION
+MODEL_STATUS = {
+    1: TerminationCondition.optimal,
+    2: TerminationCondition.locallyOptimal,
+    3: TerminationCondition.unbounded,
+    4: TerminationCondition.infeasible,
+    5: TerminationCondition.infeasible,
+    6: TerminationCondition.infeasible,
+    7: TerminationCondition.feasible,
+    8: TerminationCondition.optimal,
+    9: TerminationCondition.intermediateNonInteger,
+    10: TerminationCondition.infeasible,
+    15: TerminationCondition.optimal,
+    16: TerminationCondition.optimal,
+    17: TerminationCondition.optimal,
+    18: TerminationCondition.unbounded,
+    19: TerminationCondition.infeasible,
+}
+FALLBACK_CONDITION = {
+    11: TerminationCondition.licensingProblems,
+    12: TerminationCondition.error,
+    13: TerminationCondition.error,
+    14: TerminationCondition.noSolution,
+}
+
+
+def replay_directory(model: pyo.ConcreteModel, strategy: str, cache_dir: str) -> str:
+    """
+    Content-addressed directory of the GAMS file of a transformed model.
+
+    Parameters
+    ----------
+    model : pyo.ConcreteModel
+        The transformed model, with the initial values it is solved from
+    strategy : str
+        Reformulation strategy applied to the model
+    cache_dir : str
+        Root directory of the GAMS file cache
+
+    Returns
+    -------
+    str
+        Directory below cache_dir named by the transformed-model cache key
+        (model_cache.cache_key) and the variable levels written to the file
+    """
+    levels = np.array(
+        [
+            np.nan if var.value is None else var.value
+            for var in model.component_data_objects(pyo.Var, descend_into=True)
+        ],
+        dtype=float,
+    )
+    digest = hashlib.sha256(model_cache.cache_key(model, strategy).encode())
+    digest.update(levels.tobytes())
+    key = digest.hexdigest()
+    return os.path.join(cache_dir, key[:2], key)
+
+
+def write_model(model: pyo.ConcreteModel, directory: str) -> Tuple[Dict[str, Any], float]:
+    """
+    Write the GAMS file of a model into its replay directory, unless it is there.
+
+    The file includes RUN_OPTIONS_FILE before its solve statement instead of any solver
+    selection or options, and puts its results into results.dat/resultsstat.dat of the
+    directory GAMS runs in. The names of the variables behind the GAMS symbols are kept
+    in META_FILE, so the results can be loaded into a model without writing it again.
+
+    Parameters
+    ----------
+    model : pyo.ConcreteModel
+        The transformed model
+    directory : str
+        Replay directory from replay_directory
+
+    Returns
+    -------
+    Tuple[Dict[str, Any], float]
+        The metadata (model type and variable symbols) and the seconds spent writing,
+        0 if the file was reused
+    """
+    meta_path = os.path.join(directory, META_FILE)
+    if os.path.exists(meta_path):
+        with open(meta_path, "r") as f:
+            return json.load(f), 0.0
+
+    start = time.perf_counter()
+    os.makedirs(os.path.dirname(directory), exist_ok=True)
+    # Write into a temporary directory first so concurrent jobs never see partial files
+    tmp_dir = tempfile.mkdtemp(dir=os.path.dirname(directory), suffix=".tmp")
+    try:
+        _, smap_id = model.write(
+            os.path.join(tmp_dir, MODEL_FILE),
+            format=ProblemFormat.gams,
+            io_options={
+                "symbolic_solver_labels": True,
+                "add_options": [f"$include {RUN_OPTIONS_FILE}"],
+                "put_results": "results",
+                "put_results_format": "dat",
+            },
+        )
+        symbol_map = model.solutions.symbol_map[smap_id]
+        symbols = {
+            symbol: component.name
+            for symbol, component in symbol_map.bySymbol.items()
+            if component.parent_component().ctype is pyo.Var
+        }
+        model.solutions.delete_symbol_map(smap_id)
+
+        with open(os.path.join(tmp_dir, MODEL_FILE), "r") as f:
+            model_type = re.search(r"SOLVE GAMS_MODEL USING (\w+)", f.read()).group(1)
+        meta = {"model_type": model_type, "symbols": symbols}
+        with open(os.path.join(tmp_dir, META_FILE), "w") as f:
+            json.dump(meta, f)
+
+        try:
+            os.rename(tmp_dir, directory)
+        except OSError:
+            # Another job wrote the same file first
+            shutil.rmtree(tmp_dir)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return meta, time.perf_counter() - start
+
+
+def _read_results(path: str) -> Dict[str, str]:
+    """First value after the symbol of every line of a GAMS put file (without header)."""
+    values = {}
+    with open(path, "r") as f:
+        for line in f.read().splitlines()[1:]:
+            items = line.split()
+            if len(items) > 1:
+                values[items[0]] = items[1]
+    return values
+
+
+def _number(text: str) -> float:
+    """A number of a GAMS put file, nan for NA and the like."""
+    try:
+        return float(text)
+    except ValueError:
+        return float("nan")
+
+
+def solver_results(model: pyo.ConcreteModel, stat_vars: Dict[str, float]) -> SolverResults:
+    """
+    Build the results object of a solve from the GAMS status values.
+
+    The status mapping and bounds follow Pyomo's GAMSShell.
+
+    Parameters
+    ----------
+    model : pyo.ConcreteModel
+        The solved model
+    stat_vars : Dict[str, float]
+        Values of resultsstat.dat (MODELSTAT, SOLVESTAT, OBJEST, OBJVAL, ...)
+
+    Returns
+    -------
+    SolverResults
+        Results with problem bounds and solver status
+    """
+    results = SolverResults()
+    objective = next(model.component_data_objects(pyo.Objective, active=True))
+    results.problem.sense = objective.sense
+    results.problem.number_of_variables = stat_vars.get("NUMVAR")
+    results.problem.number_of_constraints = stat_vars.get("NUMEQU")
+    results.problem.number_of_nonzeros = stat_vars.get("NUMNZ")
+    results.problem.number_of_integer_variables = stat_vars.get("NUMDVAR")
+    results.problem.number_of_objectives = 1
+    if objective.is_minimizing():
+        results.problem.lower_bound = stat_vars["OBJEST"]
+        results.problem.upper_bound = stat_vars["OBJVAL"]
+    else:
+        results.problem.lower_bound = stat_vars["OBJVAL"]
+        results.problem.upper_bound = stat_vars["OBJEST"]
+
+    status, condition = SOLVE_STATUS.get(int(stat_vars["SOLVESTAT"]), (SolverStatus.unknown, None))
+    model_status = int(stat_vars["MODELSTAT"])
+    if MODEL_STATUS.get(model_status) is not None:
+        condition = MODEL_STATUS[model_status]
+    elif condition is None:
+        condition = FALLBACK_CONDITION.get(model_status)
+    results.solver.status = status
+    results.solver.termination_condition = condition
+    results.solver.user_time = stat_vars.get("ETSOLVE")
+    results.solver.name = "GAMS"
+    return results
+
+
+def solve(
+    model: pyo.ConcreteModel,
+    directory: str,
+    solver_name: str,
+    add_options: List[str],
+    results_dir: str,
+    tee: bool = True,
+) -> SolverResults:
+    """
+    Solve a model with a GAMS subsolver from its (shared) GAMS file.
+
+    The file is written on the first call for the directory; every call only writes
+    the solver selection and add_options into RUN_OPTIONS_FILE of results_dir and
+    runs GAMS there, so all subsolvers read the same model. The variable levels of
+    the solution are loaded into the model. Timing lines are printed in the format of
+    Pyomo's report_timing, with the write time as presolve (0 for a reused file).
+
+    Parameters
+    ----------
+    model : pyo.ConcreteModel
+        The transformed model
+    directory : str
+        Replay directory from replay_directory
+    solver_name : str
+        GAMS solver, e.g. "gurobi", "baron" or "scip"
+    add_options : List[str]
+        GAMS statements inserted before the solve statement (options, option files)
+    results_dir : str
+        Directory GAMS runs in; receives the option files, listing and results
+    tee : bool, optional
+        Whether to print the GAMS log, by default True
+
+    Returns
+    -------
+    SolverResults
+        The results, see solver_results
+    """
+    meta, write_time = write_model(model, directory)
+    print(f"      {write_time:6.2f} seconds required for presolve")
+
+    results_dir = os.path.abspath(results_dir)
+    with open(os.path.join(results_dir, RUN_OPTIONS_FILE), "w") as f:
+        f.write("\n".join([f"option {meta['model_type']}={solver_name};", *add_options]) + "\n")
+
+    start = time.perf_counter()
+    command = [
+        pyo.SolverFactory("gams").executable(),
+        os.path.abspath(os.path.join(directory, MODEL_FILE)),
+        "o=output.lst",
+        f"curdir={results_dir}",
+        f"idir1={results_dir}",
+        "lo=3" if tee else "lo=0",
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    for line in process.stdout:
+        if tee:
+            sys.stdout.write(line)
+    returncode = process.wait()
+    if returncode != 0:
+        raise RuntimeError(
+            f"GAMS encountered an error during solve (return code {returncode}). "
+            f"Check listing file {os.path.join(results_dir, 'output.lst')} for details."
+        )
+    print(f"      {time.perf_counter() - start:6.2f} seconds required for solver")
+
+    start = time.perf_counter()
+    stat_vars = {
+        symbol: _number(value)
+        for symbol, value in _read_results(os.path.join(results_dir, "resultsstat.dat")).items()
+    }
+    levels = _read_results(os.path.join(results_dir, "results.dat"))
+    variables = {var.name: var for var in model.component_data_objects(pyo.Var, descend_into=True)}
+    for symbol, name in meta["symbols"].items():
+        var = variables.get(name)
+        if var is None or var.fixed or symbol not in levels:
+            continue
+        value = _number(levels[symbol])
+        if not np.isnan(value):
+            var.set_value(value, skip_validation=True)
+    results = solver_results(model, stat_vars)
+    print(f"      {time.perf_counter() - start:6.2f} seconds required for postsolve")
+    return results
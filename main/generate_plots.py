@@ -6,6 +6,7 @@ import matplotlib.gridspec as gridspec
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
+import results_store
 
 
 def _get_strategy_display_name(strategy: str) -> str:
@@ -1520,18 +1521,31 @@ def main() -> None:
         readme.write("6. Node relaxation comparison plots\n\n")
         readme.write("Generated by generate_plots.py\n")
 
-    # Check if results file exists
-    if not os.path.exists(results_file):
-        print(f"Error: Results file not found at {results_file}")
+    # Prefer the results store, fall back to an exported or legacy results workbook
+    store_file = results_store.default_store_path()
+    if os.path.exists(store_file):
+        print(f"Reading results from {store_file}")
+        df = results_store.read_results(store_file)
+    elif os.path.exists(results_file):
+        # Read the Excel file
+        print(f"Reading results from {results_file}")
+        df = pd.read_excel(results_file)
+    else:
+        print(f"Error: Results file not found at {store_file} or {results_file}")
         return
 
-    # Read the Excel file
-    print(f"Reading results from {results_file}")
-    df = pd.read_excel(results_file)
-
     # Filter to include only original models (not relaxations)
     df = df[df["Problem Type"] == "Original"]
 
+    # Compare the runs under the default solve options only; a model solved with a warm
+    # start, cutoff, other bounds, ... has a row of its own for each setting
+    if results_store.SETTINGS_COLUMN in df.columns:
+        default_settings = results_store.settings_key({})
+        n_other = int((df[results_store.SETTINGS_COLUMN] != default_settings).sum())
+        if n_other:
+            print(f"Leaving out {n_other} entries solved with non-default settings")
+        df = df[df[results_store.SETTINGS_COLUMN] == default_settings]
+
     print("\nData summary:")
     print(f"Total entries: {len(df)}")
     print(f"Unique models: {df['Model Name'].nunique()}")
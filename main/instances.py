@@ -0,0 +1,341 @@
+import argparse
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import k_means
+import numpy as np
+import pyomo.environ as pyo
+
+# Extension used for instance manifests in data/models
+MANIFEST_EXTENSION = ".npz"
+
+
+def is_manifest(filename: str) -> bool:
+    """
+    Check whether a model filename refers to an instance manifest.
+
+    Parameters
+    ----------
+    filename : str
+        Model filename or path
+
+    Returns
+    -------
+    bool
+        True for manifests, False for legacy pickled models
+    """
+    return filename.endswith(MANIFEST_EXTENSION)
+
+
+def save_instance(
+    directory: str,
+    filename: str,
+    points: np.ndarray,
+    n_clusters: int,
+    coord_range: Tuple[float, float],
+    seed: Optional[int] = None,
+) -> str:
+    """
+    Save a k-means instance as a compressed manifest.
+
+    The manifest stores the raw coordinate array together with the number of clusters,
+    the coordinate range and, if known, the seed the coordinates were drawn from. This is
+    everything k_means.build_model needs to rebuild the model deterministically.
+
+    Parameters
+    ----------
+    directory : str
+        Directory to save the manifest
+    filename : str
+        Name of the manifest file (should end with .npz)
+    points : np.ndarray
+        Point coordinates of shape (n_points, n_dimensions)
+    n_clusters : int
+        Number of clusters
+    coord_range : Tuple[float, float]
+        Range for point coordinates
+    seed : Optional[int], optional
+        Seed the coordinates were generated from, by default None
+
+    Returns
+    -------
+    str
+        Path to the saved manifest
+    """
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+
+    file_path = os.path.join(directory, filename)
+    manifest: Dict[str, Any] = {
+        "points": np.asarray(points, dtype=float),
+        "n_clusters": np.int64(n_clusters),
+        "coord_range": np.asarray(coord_range, dtype=float),
+    }
+    if seed is not None:
+        manifest["seed"] = np.uint64(seed)
+
+    # Write through a file handle so numpy does not append a second extension
+    with open(file_path, "wb") as f:
+        np.savez_compressed(f, **manifest)
+
+    print(f"Instance saved to {file_path}")
+    return file_path
+
+
+def generate_instance(directory: str, task: Dict[str, Any]) -> str:
+    """
+    Draw the coordinates of an instance from its seed and save them as a manifest.
+
+    Parameters
+    ----------
+    directory : str
+        Directory to save the manifest
+    task : Dict[str, Any]
+        The instance: filename, n_dimensions, n_clusters, n_points, coord_range and seed
+
+    Returns
+    -------
+    str
+        Path to the saved manifest
+    """
+    points = k_means.generate_points(
+        task["n_dimensions"], task["n_points"], task["coord_range"], task["seed"]
+    )
+    return save_instance(
+        directory,
+        task["filename"],
+        points=points,
+        n_clusters=task["n_clusters"],
+        coord_range=task["coord_range"],
+        seed=task["seed"],
+    )
+
+
+def generate_instances(
+    tasks: List[Dict[str, Any]], directory: str, n_workers: int = 1
+) -> List[str]:
+    """
+    Generate and save many instances, concurrently when more than one worker is given.
+
+    Every instance is drawn from its own seed, so the manifests do not depend on the
+    number of workers or the order they are written in.
+
+    Parameters
+    ----------
+    tasks : List[Dict[str, Any]]
+        The instances (see generate_instance)
+    directory : str
+        Directory to save the manifests
+    n_workers : int, optional
+        Number of worker processes, by default 1 (generate serially in-process)
+
+    Returns
+    -------
+    List[str]
+        Paths to the saved manifests, in the order of the tasks
+    """
+    os.makedirs(directory, exist_ok=True)
+    if n_workers <= 1 or len(tasks) <= 1:
+        return [generate_instance(directory, task) for task in tasks]
+
+    print(f"Generating {len(tasks)} instances on {n_workers} workers")
+    # Instances are small, so hand them to the workers in chunks to save round trips
+    chunksize = max(1, len(tasks) // (4 * n_workers))
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        return list(
+            executor.map(generate_instance, [directory] * len(tasks), tasks, chunksize=chunksize)
+        )
+
+
+def load_instance(file_path: str) -> Dict[str, Any]:
+    """
+    Load a k-means instance manifest.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the manifest
+
+    Returns
+    -------
+    Dict[str, Any]
+        Keyword arguments for k_means.build_model (n_dimensions, n_clusters, n_points,
+        coord_range, points) plus the stored seed (None if unknown)
+    """
+    with np.load(file_path) as data:
+        points = data["points"]
+        coord_range = tuple(float(v) for v in data["coord_range"])
+        n_clusters = int(data["n_clusters"])
+        seed = int(data["seed"]) if "seed" in data.files else None
+
+    return {
+        "n_dimensions": int(points.shape[1]),
+        "n_clusters": n_clusters,
+        "n_points": int(points.shape[0]),
+        "coord_range": coord_range,
+        "points": points,
+        "seed": seed,
+    }
+
+
+def build_instance(file_path: str) -> pyo.ConcreteModel:
+    """
+    Rebuild the k-means model stored in a manifest.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the manifest
+
+    Returns
+    -------
+    pyo.ConcreteModel
+        The rebuilt model
+    """
+    parameters = load_instance(file_path)
+    parameters.pop("seed")
+    model = k_means.build_model(**parameters)
+
+    print(f"Model built from {file_path}")
+    return model
+
+
+def instance_from_model(model: pyo.ConcreteModel) -> Dict[str, Any]:
+    """
+    Extract the instance data from an existing k-means model.
+
+    Parameters
+    ----------
+    model : pyo.ConcreteModel
+        A model created by k_means.build_model
+
+    Returns
+    -------
+    Dict[str, Any]
+        Dictionary with points, n_clusters and coord_range
+    """
+    points = np.array(
+        [
+            [pyo.value(model.points_coordinates[i, j]) for j in model.dimensions]
+            for i in model.points
+        ]
+    )
+    return {
+        "points": points,
+        "n_clusters": len(model.clusters),
+        "coord_range": (
+            float(pyo.value(model.coord_range_lower)),
+            float(pyo.value(model.coord_range_upper)),
+        ),
+    }
+
+
+def data_hash(instance: Dict[str, Any]) -> str:
+    """
+    Compute a content hash of instance data, independent of the file it is stored in.
+
+    Parameters
+    ----------
+    instance : Dict[str, Any]
+        Instance with points, n_clusters and coord_range, e.g. from load_instance or
+        instance_from_model
+
+    Returns
+    -------
+    str
+        Hex digest over the coordinates, their shape, the number of clusters and the
+        coordinate range
+    """
+    points = np.ascontiguousarray(instance["points"], dtype=float)
+    digest = hashlib.sha256()
+    digest.update(points.tobytes())
+    digest.update(repr(points.shape).encode())
+    digest.update(repr(int(instance["n_clusters"])).encode())
+    digest.update(repr(tuple(float(v) for v in instance["coord_range"])).encode())
+    return digest.hexdigest()
+
+
+def save_instance_from_model(model: pyo.ConcreteModel, directory: str, filename: str) -> str:
+    """
+    Save the instance behind an existing k-means model as a manifest.
+
+    Parameters
+    ----------
+    model : pyo.ConcreteModel
+        A model created by k_means.build_model
+    directory : str
+        Directory to save the manifest
+    filename : str
+        Name of the manifest file
+
+    Returns
+    -------
+    str
+        Path to the saved manifest
+    """
+    return save_instance(directory, filename, **instance_from_model(model))
+
+
+def convert_batch(batch_path: str) -> str:
+    """
+    Convert the pickled models listed in a batch file into manifests.
+
+    Each listed .pkl model is unpickled once and saved next to it as a .npz manifest.
+    A new batch file with the suffix "_npz" listing the manifests is written; the original
+    batch file and pickles are left untouched.
+
+    Parameters
+    ----------
+    batch_path : str
+        Path to the batch file
+
+    Returns
+    -------
+    str
+        Path to the new batch file
+    """
+    # Imported here since solve pulls in all GDP plugins
+    from solve import load_model
+
+    models_dir = os.path.join(os.path.dirname(os.path.dirname(batch_path)), "models")
+
+    with open(batch_path, "r") as f:
+        model_names = [line.strip() for line in f if line.strip()]
+
+    manifest_names = []
+    for i, model_name in enumerate(model_names):
+        if is_manifest(model_name):
+            manifest_names.append(model_name)
+            continue
+
+        print(f"Converting model {i+1}/{len(model_names)}: {model_name}")
+        model = load_model(os.path.join(models_dir, model_name))
+        manifest_name = os.path.splitext(model_name)[0] + MANIFEST_EXTENSION
+        save_instance_from_model(model, models_dir, manifest_name)
+        manifest_names.append(manifest_name)
+
+    new_batch_path = batch_path.replace(".txt", "_npz.txt")
+    with open(new_batch_path, "w") as f:
+        for manifest_name in manifest_names:
+            f.write(f"{manifest_name}\n")
+
+    print(f"Manifest batch file created: {new_batch_path}")
+    return new_batch_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert pickled model batches to manifests")
+    parser.add_argument(
+        "--batch",
+        type=str,
+        default="k_means_96",
+        help="Batch name to convert (e.g., 'k_means_96' for k_means_96.txt). Default: k_means_96",
+    )
+
+    args = parser.parse_args()
+
+    convert_batch(
+        os.path.join(os.path.dirname(os.getcwd()), "data", "batches", f"{args.batch}.txt")
+    )
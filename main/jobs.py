@@ -0,0 +1,413 @@
+import hashlib
+import multiprocessing
+import os
+import shutil
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
+import instances
+import ledger
+import results_store
+
+# Every solve in solve_with_solver is pinned to a single thread
+THREADS_PER_JOB = 1
+
+# Statuses of recorded results that do not satisfy a job, as the solve did not run to
+# its own end (see supervisor.py and portfolio.py)
+UNFINISHED_STATUSES = ["failed", "crashed", "out_of_memory", "cancelled"]
+
+
+def solver_label(solver: str, subsolver: Optional[str]) -> str:
+    """
+    Human-readable name of a solver configuration.
+
+    Parameters
+    ----------
+    solver : str
+        The main solver
+    subsolver : Optional[str]
+        The subsolver, if any
+
+    Returns
+    -------
+    str
+        E.g. "gams with gurobi" or "gurobi direct"
+    """
+    return f"{solver}" + (f" with {subsolver}" if subsolver else " direct")
+
+
+def job_id(job: Dict[str, Any]) -> str:
+    """
+    Identify a job by the settings that determine its result.
+
+    Besides the model and solver setting, the key holds the problems the job solves and
+    a short hash of its solve options that change the result (see
+    results_store.settings_key), so a batch rerun with other options is not taken as
+    done by its ledger.
+
+    Parameters
+    ----------
+    job : Dict[str, Any]
+        A job created by expand_jobs
+
+    Returns
+    -------
+    str
+        Key of the form model|strategy|solver|subsolver|mode|time_limit|problems|settings
+    """
+    if job["relaxation_only"]:
+        problems = "relaxation"
+    elif job["calculate_relaxation_gap"]:
+        problems = "original+relaxation"
+    else:
+        problems = "original"
+    settings = results_store.settings_key(job["solve_options"])
+    return "|".join(
+        str(part)
+        for part in (
+            job["model_name"],
+            job["strategy"],
+            job["solver"],
+            job["subsolver"],
+            job["mode"],
+            job["time_limit"],
+            problems,
+            hashlib.sha256(settings.encode()).hexdigest()[:12],
+        )
+    )
+
+
+def expand_jobs(
+    model_names: List[str],
+    reformulation_strategies: List[str],
+    solver_configs: List[Dict[str, Any]],
+    mode: str,
+    time_limit: int,
+    calculate_relaxation_gap: bool = False,
+    relaxation_only: bool = False,
+    transform_cache_dir: Optional[str] = None,
+    run_prefix: Optional[str] = None,
+    solve_options: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Expand a batch into independent (solver config, model, strategy) jobs.
+
+    Jobs are ordered solver configuration first, then model, then strategy, which is the
+    order the serial batch loop used. Repeated models, strategies or solver
+    configurations give the same job (see job_id), which is kept once.
+
+    Parameters
+    ----------
+    model_names : List[str]
+        Model names from the batch file
+    reformulation_strategies : List[str]
+        Reformulation strategies to apply
+    solver_configs : List[Dict[str, Any]]
+        Solver configurations with 'solver' and 'subsolver' keys
+    mode : str
+        Mode for solving
+    time_limit : int
+        Time limit in seconds
+    calculate_relaxation_gap : bool, optional
+        Whether to calculate the relaxation gap, by default False
+    relaxation_only : bool, optional
+        Whether to solve only the relaxation, by default False
+    transform_cache_dir : Optional[str], optional
+        Directory of the transformed-model cache, by default None
+    run_prefix : Optional[str], optional
+        Prefix of the per-job run ids, by default the current timestamp
+    solve_options : Optional[Dict[str, Any]], optional
+        Further keyword arguments for solve_model shared by all jobs, by default None
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        One dictionary per job with the keyword arguments for run_job
+    """
+    if run_prefix is None:
+        run_prefix = time.strftime("%Y-%m-%d_%H-%M-%S")
+
+    jobs = []
+    seen = set()
+    n_duplicates = 0
+    for config in solver_configs:
+        solver = config.get("solver", "gams")
+        subsolver = config.get("subsolver")
+        for model_name in model_names:
+            for strategy in reformulation_strategies:
+                job = {
+                    "model_name": model_name,
+                    "strategy": strategy,
+                    "solver": solver,
+                    "subsolver": subsolver,
+                    "mode": mode,
+                    "time_limit": time_limit,
+                    "calculate_relaxation_gap": calculate_relaxation_gap,
+                    "relaxation_only": relaxation_only,
+                    "transform_cache_dir": transform_cache_dir,
+                    # The strategy and solver are already part of the results path
+                    "run_id": f"{run_prefix}_{os.path.splitext(model_name)[0]}",
+                    "solve_options": dict(solve_options or {}),
+                }
+                if job_id(job) in seen:
+                    n_duplicates += 1
+                    continue
+                seen.add(job_id(job))
+                jobs.append(job)
+    if n_duplicates:
+        print(f"Warning: Dropped {n_duplicates} duplicate jobs of the batch")
+    return jobs
+
+
+def drop_satisfied(batch_jobs: List[Dict[str, Any]], models_dir: str) -> List[Dict[str, Any]]:
+    """
+    Drop jobs whose results are already in the results store.
+
+    A job is satisfied when the store has a finished result for every problem it solves
+    (original and/or relaxation) with the same instance data (instances.data_hash, so
+    copies of an instance under other names count), strategy, solver, subsolver, mode,
+    time limit, solve settings (results_store.settings_key) and solver tolerances
+    (solve.tolerance_key). Jobs on legacy pickled models are always kept.
+
+    Parameters
+    ----------
+    batch_jobs : List[Dict[str, Any]]
+        Jobs created by expand_jobs
+    models_dir : str
+        Directory of the instance manifests
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        The remaining jobs, in their original order
+    """
+    # Imported here so that pool workers load the solver stack themselves
+    from solve import tolerance_key
+
+    results = results_store.read_results()
+    columns = ["Instance Hash", "Tolerances", "Status", results_store.SETTINGS_COLUMN]
+    satisfied = set()
+    if not results.empty and all(column in results.columns for column in columns):
+        finished = results[results["Status"].notna() & ~results["Status"].isin(UNFINISHED_STATUSES)]
+        satisfied = {
+            (row[0], row[1], row[2], str(row[3]), row[4], float(row[5]), row[6], row[7], row[8])
+            for row in finished[
+                [
+                    "Instance Hash",
+                    "Strategy",
+                    "Solver",
+                    "Subsolver",
+                    "Mode",
+                    "Time Limit",
+                    "Tolerances",
+                    "Problem Type",
+                    results_store.SETTINGS_COLUMN,
+                ]
+            ].itertuples(index=False)
+            if row[0] is not None and row[5] is not None
+        }
+    tolerances = tolerance_key()
+
+    hashes: Dict[str, Optional[str]] = {}
+    remaining = []
+    n_satisfied = 0
+    for job in batch_jobs:
+        model_name = job["model_name"]
+        if model_name not in hashes:
+            hashes[model_name] = None
+            if instances.is_manifest(model_name):
+                try:
+                    hashes[model_name] = instances.data_hash(
+                        instances.load_instance(os.path.join(models_dir, model_name))
+                    )
+                except Exception as e:
+                    print(f"Warning: Could not read instance {model_name}: {str(e)}")
+        if hashes[model_name] is not None:
+            problem_types = [] if job["relaxation_only"] else ["Original"]
+            if job["relaxation_only"] or job["calculate_relaxation_gap"]:
+                problem_types.append("Relaxation")
+            keys = [
+                (
+                    hashes[model_name],
+                    job["strategy"],
+                    job["solver"],
+                    job["subsolver"] if job["subsolver"] else "None",
+                    job["mode"],
+                    float(job["time_limit"]),
+                    tolerances,
+                    problem_type,
+                    results_store.settings_key(job["solve_options"]),
+                )
+                for problem_type in problem_types
+            ]
+            if all(key in satisfied for key in keys):
+                n_satisfied += 1
+                continue
+        remaining.append(job)
+
+    print(
+        f"Deduplication: {n_satisfied} jobs already in the results store, "
+        f"{len(remaining)} jobs to run"
+    )
+    return remaining
+
+
+def run_job(job: Dict[str, Any], ledger_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Solve one job, isolating its temporary files in a private working directory.
+
+    Parameters
+    ----------
+    job : Dict[str, Any]
+        A job created by expand_jobs
+    ledger_path : Optional[str], optional
+        Job ledger in which the start of the job is recorded, by default None
+
+    Returns
+    -------
+    Dict[str, Any]
+        The job id, its status ("done" or "failed"), the error message if any and the
+        wall time in seconds
+    """
+    # Imported here so that pool workers load the solver stack themselves
+    from pyomo.common.tempfiles import TempfileManager
+    from solve import solve_model
+
+    work_dir = os.path.join(
+        os.path.dirname(os.getcwd()),
+        "data",
+        "work",
+        f"{job['solver']}_{job['subsolver']}_{job['strategy']}_{job['run_id']}",
+    )
+    os.makedirs(work_dir, exist_ok=True)
+
+    if ledger_path is not None:
+        ledger.record_job(ledger_path, job_id(job), ledger.RUNNING)
+
+    label = solver_label(job["solver"], job["subsolver"])
+    print(f"Processing model {job['model_name']} with {label} and strategy {job['strategy']}")
+
+    start = time.time()
+    status = "done"
+    error = None
+    previous_tempdir = TempfileManager.tempdir
+    previous_tmpdir_env = os.environ.get("TMPDIR")
+    try:
+        # Solver input files written by Pyomo and solver scratch files go to work_dir
+        TempfileManager.tempdir = work_dir
+        os.environ["TMPDIR"] = work_dir
+        solve_model(
+            model=None,  # No model since we're loading by name
+            reformulation_strategies=[job["strategy"]],  # Only one strategy at a time
+            mode=job["mode"],
+            time_limit=job["time_limit"],
+            existing_model_name=job["model_name"],
+            solver=job["solver"],
+            subsolver=job["subsolver"],
+            calculate_relaxation_gap=job["calculate_relaxation_gap"],
+            relaxation_only=job["relaxation_only"],
+            transform_cache_dir=job["transform_cache_dir"],
+            run_id=job["run_id"],
+            **job.get("solve_options", {}),
+        )
+        print(f"  Successfully completed strategy: {job['strategy']}")
+    except Exception as e:
+        status = "failed"
+        error = f"{type(e).__name__}: {str(e)}"
+        print(
+            f"  Error running model {job['model_name']} with {label} and "
+            f"strategy {job['strategy']}: {str(e)}"
+        )
+        traceback.print_exc()
+    finally:
+        TempfileManager.tempdir = previous_tempdir
+        if previous_tmpdir_env is None:
+            os.environ.pop("TMPDIR", None)
+        else:
+            os.environ["TMPDIR"] = previous_tmpdir_env
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        "job_id": job_id(job),
+        "status": status,
+        "error": error,
+        "wall_time": time.time() - start,
+    }
+
+
+def record_outcome(outcome: Dict[str, Any], ledger_path: Optional[str]) -> None:
+    """
+    Record how a job ended in the ledger, if there is one.
+
+    Parameters
+    ----------
+    outcome : Dict[str, Any]
+        Outcome returned by run_job
+    ledger_path : Optional[str]
+        Path to the job ledger
+    """
+    if ledger_path is None:
+        return
+    state = ledger.DONE if outcome["status"] == "done" else ledger.FAILED
+    ledger.record_job(ledger_path, outcome["job_id"], state, outcome["error"])
+
+
+def run_jobs(
+    jobs: List[Dict[str, Any]], n_cores: int = 1, ledger_path: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Run jobs, concurrently when the core budget allows more than one at a time.
+
+    Each job runs in its own worker process of a process pool. Results are written by
+    the jobs themselves into their own run directories and the shared results store,
+    which serializes concurrent writers itself, so no further coordination is needed.
+
+    Parameters
+    ----------
+    jobs : List[Dict[str, Any]]
+        Jobs created by expand_jobs
+    n_cores : int, optional
+        Number of cores the batch may use, by default 1 (run serially in-process)
+    ledger_path : Optional[str], optional
+        Job ledger recording when each job starts and how it ends, by default None
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        The run_job outcome of every job, in completion order
+    """
+    max_workers = max(1, n_cores // THREADS_PER_JOB)
+    outcomes = []
+
+    if max_workers == 1:
+        for i, job in enumerate(jobs):
+            print(f"Job {i+1}/{len(jobs)}")
+            outcome = run_job(job, ledger_path)
+            record_outcome(outcome, ledger_path)
+            outcomes.append(outcome)
+        return outcomes
+
+    print(f"Running {len(jobs)} jobs on {max_workers} workers")
+    # Spawned workers start without inherited solver state (e.g. license environments)
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+        futures = {executor.submit(run_job, job, ledger_path): job for job in jobs}
+        for i, future in enumerate(as_completed(futures), 1):
+            job = futures[future]
+            try:
+                outcome = future.result()
+            except Exception as e:
+                # The worker process itself died (e.g. killed by the OS)
+                outcome = {
+                    "job_id": job_id(job),
+                    "status": "failed",
+                    "error": f"{type(e).__name__}: {str(e)}",
+                    "wall_time": None,
+                }
+            record_outcome(outcome, ledger_path)
+            outcomes.append(outcome)
+            print(f"Finished job {i}/{len(jobs)}: {outcome['job_id']} ({outcome['status']})")
+
+    return outcomes
@@ -1,8 +1,155 @@
-from typing import Tuple
+from typing import Dict, Optional, Tuple
 
 import numpy as np
 import pyomo.environ as pyo
 import pyomo.gdp as gdp
+import symmetry
+from pyomo.common.gc_manager import PauseGC
+
+# Variable bounds supported by build_model: the coordinate box, bounds derived from the
+# data, and data bounds plus bounds on the first center coordinate of the outer clusters
+BOUND_MODES = ["box", "data", "data_clusters"]
+
+
+def coordinates_to_dict(np_points: np.ndarray) -> Dict[Tuple[int, int], float]:
+    """
+    Convert a (n_points, n_dimensions) coordinate array into a 1-based Param dictionary.
+
+    Parameters
+    ----------
+    np_points : np.ndarray
+        Point coordinates, one row per point
+
+    Returns
+    -------
+    Dict[Tuple[int, int], float]
+        Mapping (point, dimension) -> coordinate using Pyomo's 1-based indices
+    """
+    return {
+        (i, j): value
+        for i, row in enumerate(np_points.tolist(), start=1)
+        for j, value in enumerate(row, start=1)
+    }
+
+
+def generate_points(
+    n_dimensions: int,
+    n_points: int,
+    coord_range: Tuple[float, float],
+    seed: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Draw uniformly distributed point coordinates.
+
+    Parameters
+    ----------
+    n_dimensions : int
+        Number of dimensions
+    n_points : int
+        Number of points
+    coord_range : Tuple[float, float]
+        Range for point coordinates
+    seed : Optional[int], optional
+        Seed for a dedicated generator, by default None (uses the global NumPy state)
+
+    Returns
+    -------
+    np.ndarray
+        Array of shape (n_points, n_dimensions)
+    """
+    if seed is None:
+        return np.random.uniform(
+            low=coord_range[0], high=coord_range[1], size=(n_points, n_dimensions)
+        )
+    rng = np.random.default_rng(seed)
+    return rng.uniform(low=coord_range[0], high=coord_range[1], size=(n_points, n_dimensions))
+
+
+def data_bounds(
+    np_points: np.ndarray, n_clusters: int, cluster_bounds: bool = False
+) -> Dict[str, np.ndarray]:
+    """
+    Derive bounds on the center and distance variables from the point coordinates.
+
+    A non-empty cluster has its center at the mean of its points, so every center lies
+    in the bounding box of the data, and the squared distance from point i to its center
+    is at most the squared distance to the farthest corner of that box. Some optimal
+    solution has no empty cluster, so the bounds keep an optimal solution feasible.
+
+    With cluster_bounds, the clusters are additionally taken to be ordered by their
+    first center coordinate (symmetry.FIRST_COORDINATE_ORDERED schemes). The
+    overall mean is a weighted average of the cluster means, so the first cluster's
+    coordinate is at most and the last cluster's at least the mean of the points.
+
+    Parameters
+    ----------
+    np_points : np.ndarray
+        Point coordinates of shape (n_points, n_dimensions)
+    n_clusters : int
+        Number of clusters
+    cluster_bounds : bool, optional
+        Whether to add the per-cluster bounds on the first coordinate, by default False
+
+    Returns
+    -------
+    Dict[str, np.ndarray]
+        center_lower and center_upper of shape (n_clusters, n_dimensions) and
+        distance_upper of shape (n_points,)
+    """
+    lower = np_points.min(axis=0)
+    upper = np_points.max(axis=0)
+    center_lower = np.tile(lower, (n_clusters, 1))
+    center_upper = np.tile(upper, (n_clusters, 1))
+    if cluster_bounds and n_clusters > 1:
+        mean = np_points[:, 0].mean()
+        center_upper[0, 0] = mean
+        center_lower[-1, 0] = mean
+    distance_upper = np.maximum((np_points - lower) ** 2, (upper - np_points) ** 2).sum(axis=1)
+    return {
+        "center_lower": center_lower,
+        "center_upper": center_upper,
+        "distance_upper": distance_upper,
+    }
+
+
+def set_data_bounds(
+    model: pyo.ConcreteModel, np_points: Optional[np.ndarray] = None, cluster_bounds: bool = False
+) -> None:
+    """
+    Replace the coordinate-box bounds of a k-means model by bounds derived from the data.
+
+    Must be applied before the GDP transformation, which derives its big-M values and
+    disaggregated variable bounds from these bounds.
+
+    Parameters
+    ----------
+    model : pyo.ConcreteModel
+        A model created by build_model
+    np_points : Optional[np.ndarray], optional
+        Point coordinates of the model, by default None (read from points_coordinates)
+    cluster_bounds : bool, optional
+        Whether to add the per-cluster bounds of data_bounds, by default False
+    """
+    if np_points is None:
+        np_points = np.array(
+            [
+                [pyo.value(model.points_coordinates[i, j]) for j in model.dimensions]
+                for i in model.points
+            ]
+        )
+    if cluster_bounds and symmetry.scheme_of(model) not in symmetry.FIRST_COORDINATE_ORDERED:
+        raise ValueError(
+            f"Per-cluster bounds require one of {symmetry.FIRST_COORDINATE_ORDERED}, "
+            f"the model uses {symmetry.scheme_of(model)}"
+        )
+    bounds = data_bounds(np_points, len(model.clusters), cluster_bounds)
+    for k in model.clusters:
+        for j in model.dimensions:
+            model.center_coordinates[k, j].setlb(float(bounds["center_lower"][k - 1, j - 1]))
+            model.center_coordinates[k, j].setub(float(bounds["center_upper"][k - 1, j - 1]))
+    for i in model.points:
+        model.distance[i].setlb(0)
+        model.distance[i].setub(float(bounds["distance_upper"][i - 1]))
 
 
 def build_model(
@@ -10,7 +157,62 @@ def build_model(
     n_clusters: int,
     n_points: int,
     coord_range: Tuple[float, float],
+    bulk: bool = True,
+    points: Optional[np.ndarray] = None,
+    seed: Optional[int] = None,
+    bounds: str = "box",
+    symmetry_scheme: str = symmetry.DEFAULT_SCHEME,
+    mutable: bool = False,
 ) -> pyo.ConcreteModel:
+    """
+    Build the GDP formulation of the minimum-sum-of-squares k-means problem.
+
+    Parameters
+    ----------
+    n_dimensions : int
+        Number of dimensions
+    n_clusters : int
+        Number of clusters
+    n_points : int
+        Number of points
+    coord_range : Tuple[float, float]
+        Range for point coordinates
+    bulk : bool, optional
+        Initialize the coordinates from a dictionary and build all disjunct constraints
+        in one pass over the coordinate array instead of per-element rule callbacks,
+        by default True. Both paths produce identical models.
+    points : Optional[np.ndarray], optional
+        Coordinates of shape (n_points, n_dimensions) to use instead of random ones,
+        by default None
+    seed : Optional[int], optional
+        Seed used to draw the coordinates when points is None, by default None
+    bounds : str, optional
+        Variable bounds, one of BOUND_MODES, by default "box": centers within
+        coord_range and a uniform distance bound. "data" and "data_clusters" use the
+        bounds of data_bounds (without and with the per-cluster bounds).
+    symmetry_scheme : str, optional
+        Symmetry-breaking scheme, one of symmetry.SCHEMES, by default
+        "first_coordinate" (order the clusters by their first center coordinate)
+    mutable : bool, optional
+        Make points_coordinates a mutable Param that the constraints reference, by
+        default False. The coordinates of such a model can be replaced after it was
+        built (see template.py); otherwise they are constants in the constraints.
+
+    Returns
+    -------
+    pyo.ConcreteModel
+        The k-means GDP model
+    """
+    if bounds not in BOUND_MODES:
+        raise ValueError(f"Unknown bounds: {bounds}. Use one of {BOUND_MODES}")
+    if symmetry_scheme not in symmetry.SCHEMES:
+        raise ValueError(
+            f"Unknown symmetry-breaking scheme: {symmetry_scheme}. "
+            f"Use one of {list(symmetry.SCHEMES)}"
+        )
+    if bounds == "data_clusters" and symmetry_scheme not in symmetry.FIRST_COORDINATE_ORDERED:
+        raise ValueError(f"Bounds data_clusters require one of {symmetry.FIRST_COORDINATE_ORDERED}")
+
     # Create model
     model = pyo.ConcreteModel()
 
@@ -27,16 +229,30 @@ def build_model(
     model.points = pyo.Set(initialize=pyo.RangeSet(n_points))
 
     # Point coordinates (1-based indexing for Pyomo, 0-based for numpy)
-    np_points = np.random.uniform(
-        low=coord_range[0], high=coord_range[1], size=(n_points, n_dimensions)
-    )
+    if points is not None:
+        np_points = np.asarray(points, dtype=float)
+        if np_points.shape != (n_points, n_dimensions):
+            raise ValueError(
+                f"Expected points of shape {(n_points, n_dimensions)}, got {np_points.shape}"
+            )
+    else:
+        np_points = generate_points(n_dimensions, n_points, coord_range, seed)
 
-    def points_coord_init(model, i, j):
-        return float(np_points[i - 1, j - 1])
+    if bulk:
+        model.points_coordinates = pyo.Param(
+            model.points,
+            model.dimensions,
+            initialize=coordinates_to_dict(np_points),
+            mutable=mutable,
+        )
+    else:
 
-    model.points_coordinates = pyo.Param(
-        model.points, model.dimensions, initialize=points_coord_init
-    )
+        def points_coord_init(model, i, j):
+            return float(np_points[i - 1, j - 1])
+
+        model.points_coordinates = pyo.Param(
+            model.points, model.dimensions, initialize=points_coord_init, mutable=mutable
+        )
 
     # Variables
     model.center_coordinates = pyo.Var(
@@ -47,28 +263,53 @@ def build_model(
         within=pyo.NonNegativeReals,
         bounds=(0, model.n_points * (coord_range[1] - coord_range[0]) * model.n_dimensions),
     )
+    if bounds != "box":
+        set_data_bounds(model, np_points, cluster_bounds=bounds == "data_clusters")
 
-    # Symmetry-breaking constraint: c_{k-1,1} <= c_{k,1} for k in 2..n_clusters
-    def symmetry_breaking_rule(model, k):
-        if k == 1:
-            return pyo.Constraint.Skip
-        return model.center_coordinates[k - 1, 1] <= model.center_coordinates[k, 1]
-
-    model.symmetry_breaking = pyo.Constraint(model.clusters, rule=symmetry_breaking_rule)
+    # Symmetry-breaking constraint: c_{k-1,1} <= c_{k,1} for k in 2..n_clusters. The
+    # default scheme keeps its original position, so default models are unchanged.
+    if symmetry_scheme == symmetry.DEFAULT_SCHEME:
+        symmetry.apply_scheme(model, symmetry_scheme)
 
     # Disjuncts: For each (i, k), if Y_ik is true, then d_i >= sum_j (p_ij - c_kj)^2
-    def disjunct_rule(disj, k, i):
-        m = disj.model()
-        # Attach a Constraint to the disjunct itself
-        disj.cons = pyo.Constraint(
-            expr=m.distance[i]
-            >= sum(
-                (m.points_coordinates[i, j] - m.center_coordinates[k, j]) ** 2 for j in m.dimensions
+    if bulk:
+        # Build every squared-distance expression in one pass over the coordinate rows,
+        # reusing the per-cluster center variable lists. The expression trees are the same
+        # as in the rule-based path, so the GDP transformations see identical constraints.
+        center_vars = [
+            [model.center_coordinates[k, j] for j in model.dimensions] for k in model.clusters
+        ]
+        # The cyclic garbage collector is paused while the n_points * n_clusters disjunct
+        # blocks are created, as the Pyomo writers do for large models.
+        with PauseGC():
+            model.disjunct_blocks = gdp.Disjunct(model.clusters, model.points)
+            if mutable:
+                rows = [
+                    [model.points_coordinates[i, j] for j in model.dimensions] for i in model.points
+                ]
+            else:
+                rows = np_points.tolist()
+            for i, row in enumerate(rows, start=1):
+                distance_i = model.distance[i]
+                for k, centers in enumerate(center_vars, start=1):
+                    model.disjunct_blocks[k, i].cons = pyo.Constraint(
+                        expr=distance_i >= sum((p - c) ** 2 for p, c in zip(row, centers))
+                    )
+    else:
+
+        def disjunct_rule(disj, k, i):
+            m = disj.model()
+            # Attach a Constraint to the disjunct itself
+            disj.cons = pyo.Constraint(
+                expr=m.distance[i]
+                >= sum(
+                    (m.points_coordinates[i, j] - m.center_coordinates[k, j]) ** 2
+                    for j in m.dimensions
+                )
             )
-        )
 
-    # Rebuild the Disjunct component with this rule:
-    model.disjunct_blocks = gdp.Disjunct(model.clusters, model.points, rule=disjunct_rule)
+        # Rebuild the Disjunct component with this rule:
+        model.disjunct_blocks = gdp.Disjunct(model.clusters, model.points, rule=disjunct_rule)
 
     # Disjunction: For each i, exactly one k is assigned
     def disjunction_rule(model, i):
@@ -76,6 +317,9 @@ def build_model(
 
     model.assignment = gdp.Disjunction(model.points, rule=disjunction_rule)
 
+    if symmetry_scheme != symmetry.DEFAULT_SCHEME:
+        symmetry.apply_scheme(model, symmetry_scheme)
+
     # Objective: Minimize the sum of distances
     model.obj = pyo.Objective(expr=sum(model.distance[i] for i in model.points), sense=pyo.minimize)
 
@@ -0,0 +1,146 @@
+import fcntl
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# Job states recorded in the ledger
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+# Stopped by a portfolio race after another strategy proved optimality (see portfolio.py)
+CANCELLED = "cancelled"
+
+
+def record_job(ledger_path: str, job_id: str, state: str, error: Optional[str] = None) -> None:
+    """
+    Append a state change of a job to the ledger.
+
+    The ledger is an append-only JSON-lines file. Appends are serialized with an flock,
+    so worker processes and the batch driver can write to it concurrently.
+
+    Parameters
+    ----------
+    ledger_path : str
+        Path to the ledger file
+    job_id : str
+        Id of the job (see jobs.job_id)
+    state : str
+        One of "pending", "running", "done", "failed" or "cancelled"
+    error : Optional[str], optional
+        Error message for failed jobs, by default None
+    """
+    os.makedirs(os.path.dirname(ledger_path), exist_ok=True)
+
+    entry = {
+        "job_id": job_id,
+        "state": state,
+        "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "pid": os.getpid(),
+        "error": error,
+    }
+    with open(ledger_path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def load_ledger(ledger_path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Replay the ledger into the latest state of every job.
+
+    Parameters
+    ----------
+    ledger_path : str
+        Path to the ledger file
+
+    Returns
+    -------
+    Dict[str, Dict[str, Any]]
+        Mapping job id -> {"state", "attempts", "error"}, where attempts counts how
+        often the job was started
+    """
+    jobs_state: Dict[str, Dict[str, Any]] = {}
+    if not os.path.exists(ledger_path):
+        return jobs_state
+
+    with open(ledger_path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # A line cut short by a crash; everything before it is still valid
+                print(f"Warning: Skipping malformed ledger line in {ledger_path}")
+                continue
+
+            state = jobs_state.setdefault(
+                entry["job_id"], {"state": PENDING, "attempts": 0, "error": None}
+            )
+            state["state"] = entry["state"]
+            state["error"] = entry.get("error")
+            if entry["state"] == RUNNING:
+                state["attempts"] += 1
+
+    return jobs_state
+
+
+def select_jobs(
+    jobs: List[Dict[str, Any]],
+    ledger: Dict[str, Dict[str, Any]],
+    retry_failed: bool = True,
+    max_attempts: int = 3,
+) -> List[Dict[str, Any]]:
+    """
+    Select the jobs that still have to run according to the ledger.
+
+    Completed jobs are skipped, as are jobs cancelled by a portfolio race. Failed jobs
+    are retried while they have been started fewer than max_attempts times. Jobs left
+    "running" by a crashed or rebooted batch were interrupted and are run again under
+    the same attempt limit.
+
+    Parameters
+    ----------
+    jobs : List[Dict[str, Any]]
+        All jobs of the batch
+    ledger : Dict[str, Dict[str, Any]]
+        Ledger state from load_ledger
+    retry_failed : bool, optional
+        Whether to retry failed jobs at all, by default True
+    max_attempts : int, optional
+        Maximum number of times a job is started, by default 3
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        The jobs to run, in their original order
+    """
+    # Imported here to avoid a circular import (jobs records to the ledger)
+    from jobs import job_id
+
+    selected = []
+    n_done = n_exhausted = 0
+    for job in jobs:
+        state = ledger.get(job_id(job))
+        if state is None or state["state"] == PENDING:
+            selected.append(job)
+        elif state["state"] in (DONE, CANCELLED):
+            n_done += 1
+        elif state["state"] == FAILED and not retry_failed:
+            n_exhausted += 1
+        elif state["attempts"] >= max_attempts:
+            n_exhausted += 1
+        else:
+            selected.append(job)
+
+    print(
+        f"Ledger: {n_done} jobs already done, {n_exhausted} failed jobs not retried, "
+        f"{len(selected)} jobs to run"
+    )
+    return selected
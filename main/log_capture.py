@@ -0,0 +1,135 @@
+import gzip
+import io
+import os
+import threading
+import time
+from contextlib import contextmanager, redirect_stdout
+from typing import Any, Iterator, List, Optional
+
+import log_parser
+
+
+class LogStream(io.TextIOBase):
+    """
+    Text stream that writes solver output straight to a log file.
+
+    Output is written through as it arrives instead of being buffered in memory, so the
+    log of a running solve can be followed on disk. Complete lines are also handed to
+    the attached parsers (anything with a feed_block method, e.g. log_parser.LogParser),
+    so their results are up to date while the solver is still running.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        parsers: Optional[List[Any]] = None,
+        compress: bool = False,
+        flush_interval: float = 1.0,
+    ):
+        """
+        Open the log file.
+
+        Parameters
+        ----------
+        path : str
+            Path of the log file; ".gz" is appended when compressing
+        parsers : Optional[List[Any]], optional
+            Incremental parsers fed with every complete line, by default None
+        compress : bool, optional
+            Whether to gzip the log, by default False
+        flush_interval : float, optional
+            Seconds between flushes of a compressed log, by default 1.0. Plain logs are
+            flushed after every write.
+        """
+        super().__init__()
+        self.compress = compress
+        self.path = path + ".gz" if compress else path
+        self.parsers = list(parsers) if parsers else []
+        self.flush_interval = flush_interval
+        if compress:
+            self._file = gzip.open(self.path, "wt")
+        else:
+            self._file = open(self.path, "w")
+        self._pending = ""
+        self._last_flush = time.time()
+        # Pyomo's tee writes from reader threads
+        self._lock = threading.Lock()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        with self._lock:
+            self._file.write(s)
+            now = time.time()
+            if not self.compress or now - self._last_flush >= self.flush_interval:
+                self._file.flush()
+                self._last_flush = now
+
+            if self.parsers:
+                self._pending += s
+                cut = self._pending.rfind("\n") + 1
+                if cut:
+                    block, self._pending = self._pending[:cut], self._pending[cut:]
+                    for parser in self.parsers:
+                        parser.feed_block(block)
+        return len(s)
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._pending:
+                for parser in self.parsers:
+                    parser.feed_block(self._pending)
+                self._pending = ""
+            if not self._file.closed:
+                self._file.close()
+        super().close()
+
+
+@contextmanager
+def capture_output(
+    results_dir: str,
+    solver: str,
+    subsolver: Optional[str] = None,
+    compress: bool = False,
+    parsers: Optional[List[Any]] = None,
+) -> Iterator[LogStream]:
+    """
+    Stream everything printed in the block to the run's output log.
+
+    A LogParser for the solver is attached as the first parser of the stream, so
+    stream.parsers[0].summary() gives the root relaxation and bounds seen so far.
+
+    Parameters
+    ----------
+    results_dir : str
+        Run directory receiving the output log
+    solver : str
+        The solver used
+    subsolver : Optional[str], optional
+        The subsolver used, by default None
+    compress : bool, optional
+        Whether to gzip the log, by default False
+    parsers : Optional[List[Any]], optional
+        Further incremental parsers to attach after the LogParser, by default None
+
+    Yields
+    ------
+    LogStream
+        The open log stream
+    """
+    stream = LogStream(
+        os.path.join(results_dir, log_parser.OUTPUT_LOG),
+        parsers=[log_parser.LogParser(solver, subsolver), *(parsers or [])],
+        compress=compress,
+    )
+    try:
+        with redirect_stdout(stream):
+            yield stream
+    finally:
+        stream.close()
@@ -0,0 +1,627 @@
+import gzip
+import os
+import re
+from typing import IO, Any, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+# Number formats used by the solver logs. Root relaxation values are always printed
+# with a decimal point; bounds may also be plain integers.
+DECIMAL = r"[-+]?\d*\.\d+(?:[eE][-+]?\d+)?"
+NUMBER = r"[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?"
+
+_DECIMAL_RE = re.compile(DECIMAL)
+
+# Size of the blocks in which log files are read
+BLOCK_SIZE = 1 << 20
+
+# Name of the captured solver output in a run directory
+OUTPUT_LOG = "output_log.txt"
+
+# Allocation failures reported by the solvers (e.g. Gurobi "Out of memory", SCIP
+# "insufficient memory"), GAMS or Python, in lower case
+MEMORY_FAILURES = (
+    "out of memory",
+    "insufficient memory",
+    "memory allocation fail",
+    "memory allocation error",
+    "memoryerror",
+    "std::bad_alloc",
+)
+
+# Summary values that parse_run_logs completes from gurobi_solver.log
+LOG_VALUES = ("root_relaxation", "lower_bound", "upper_bound", "nodes", "status")
+
+
+class Rule(NamedTuple):
+    """A pattern the parser looks for in every line of a solver log."""
+
+    # Name under which the match is stored; rules sharing a name are alternatives
+    name: str
+    # Substring that must occur in the line before the (more expensive) match is tried
+    trigger: Optional[str]
+    # Returns a match (truthy) or None for a line
+    match: Callable[[str], Any]
+    # Name of a rule that must have matched on an earlier line before this one is tried
+    after: Optional[str] = None
+    # Keep the last match instead of the first
+    last: bool = False
+
+
+def _rule(
+    name: str,
+    pattern: str,
+    trigger: Optional[str],
+    after: Optional[str] = None,
+    last: bool = False,
+    flags: int = 0,
+) -> Rule:
+    """Create a rule from a regular expression, compiling it once."""
+    return Rule(name, trigger, re.compile(pattern, flags).search, after, last)
+
+
+def _baron_row(line: str) -> Optional[float]:
+    """Extract the lower bound from a row of the BARON iteration table."""
+    line = line.strip()
+    if not line or line.startswith("==="):
+        return None
+
+    match = re.search(r"\s*\S+\s+\S+\s+\S+\s+(" + DECIMAL + r")\s+", line)
+    if match:
+        return float(match.group(1))
+
+    parts = line.split()
+    if len(parts) >= 5:
+        try:
+            return float(parts[3])
+        except ValueError:
+            numeric_parts = []
+            for part in parts:
+                try:
+                    numeric_parts.append(float(part))
+                except ValueError:
+                    pass
+            if len(numeric_parts) >= 3:
+                return numeric_parts[2]
+    return None
+
+
+# Per-solver registry of the patterns extracted in a single pass over a log
+PATTERNS: Dict[str, List[Rule]] = {
+    "gurobi": [
+        _rule("root_objective", r"Root relaxation: objective\s+(" + DECIMAL + ")", "Root relax"),
+        _rule("root_cutoff", r"Root relaxation: cutoff", "Root relax"),
+        _rule(
+            "nodes_header",
+            r"Nodes\s+\|\s+Current Node\s+\|\s+Objective Bounds",
+            "Current Node",
+        ),
+        _rule("first_node_row", r"^\s+\d+\s+\d+", None, after="nodes_header"),
+        _rule("explored", r"Explored (\d+) nodes?", "Explored"),
+        _rule("best_bound", r"[Bb]est bound (" + DECIMAL + ")", "est bound"),
+        _rule(
+            "gap_line_root",
+            r"[Bb]est objective " + DECIMAL + r", best bound (" + DECIMAL + ")",
+            "est objective",
+        ),
+        _rule(
+            "gap_line",
+            r"[Bb]est objective\s+(" + NUMBER + r"),\s*best bound\s+(" + NUMBER + ")",
+            "est objective",
+        ),
+        _rule(
+            "explored_gap_line",
+            r"Explored \d+ nodes.*best objective\s+(" + NUMBER + r"),\s*"
+            r"best bound\s+(" + NUMBER + ")",
+            "xplored",
+            flags=re.IGNORECASE,
+        ),
+        _rule("status", r"(Optimal solution found)", "Optimal solution"),
+        _rule("status", r"(Time limit reached)", "Time limit"),
+        _rule("status", r"(Infeasible or unbounded model)", "nbounded model"),
+        _rule("status", r"(Model is infeasible|Infeasible model)", "nfeasible"),
+        _rule("status", r"(Unbounded model)", "Unbounded model"),
+    ],
+    "baron": [
+        _rule(
+            "iteration_header",
+            r"Iteration\s+Time.*Lower bound\s+Upper bound\s+Progress",
+            "Iteration",
+        ),
+        Rule("iteration_row", None, _baron_row, after="iteration_header"),
+        _rule("preprocessing", r"Problem solved during preprocessing", "during preprocessing"),
+        _rule("best_possible_root", r"Best possible = (" + DECIMAL + ")", "Best possible"),
+        _rule("lower_bound_is", r"Lower bound is\s+(" + DECIMAL + ")", "Lower bound is"),
+        _rule("best_possible", r"Best possible\s*=\s*(" + NUMBER + ")", "Best possible"),
+        _rule("best_solution", r"Best solution\s*=\s*(" + NUMBER + ")", "Best solution"),
+        _rule("nodes", r"Total no\. of BaR iterations:\s*(\d+)", "BaR iterations"),
+        _rule("status", r"\*\*\* (.+?) \*\*\*", "*** "),
+    ],
+    "scip": [
+        _rule("trivial", r"problem is solved by trivial preprocessing", "trivial preprocessing"),
+        _rule("objective_value", r"objective value\s*:\s*(" + DECIMAL + ")", "objective value"),
+        _rule(
+            "lp0",
+            r"LP0\s+\(\d+r,\s*\d+c\)\s*:\s*(?:opt\.|infeas\.|unbounded)\s*\[(" + DECIMAL + ")",
+            "LP0",
+        ),
+        _rule("root_node", r"root node", "root node"),
+        _rule(
+            "root_dual_bound",
+            r"dual bound\s*:\s*(" + DECIMAL + ")",
+            "dual bound",
+            after="root_node",
+        ),
+        _rule("dual_bound_root", r"Dual Bound\s*:\s*(" + DECIMAL + ")", "Dual Bound"),
+        _rule("dual_bound", r"Dual Bound\s*:\s*(" + NUMBER + ")", "Dual Bound"),
+        _rule("primal_bound", r"Primal Bound\s*:\s*(" + NUMBER + ")", "Primal Bound"),
+        _rule("nodes", r"Solving Nodes\s*:\s*(\d+)", "Solving Nodes"),
+        _rule("status", r"SCIP Status\s*:\s*(.*?)\s*$", "SCIP Status"),
+    ],
+    "ipopt": [
+        _rule("objective", r"Objective\s*\.\.\.\s*(" + DECIMAL + ")", "Objective"),
+        _rule(
+            "f_line",
+            r"IPOPT\s+\d+\s+\d+\.\d+\s+\d+\.\d+\s+f\s+(" + DECIMAL + ")",
+            "IPOPT",
+        ),
+        _rule("last_line", r"IPOPT.*", "IPOPT", last=True),
+        _rule("status", r"EXIT:\s*(.*?)\s*$", "EXIT:"),
+    ],
+    "bnb": [
+        _rule("root_bound", r"Root bound:\s*(" + NUMBER + ")", "Root bound"),
+        _rule("explored", r"Explored (\d+) nodes?", "Explored"),
+        _rule(
+            "final",
+            r"Best objective\s+(" + NUMBER + r"),\s*best bound\s+(" + NUMBER + ")",
+            "Best objective",
+        ),
+        _rule("status", r"Status:\s*(.*?)\s*$", "Status:"),
+    ],
+}
+
+
+# Pyomo's report_timing output of opt.solve, printed for every solver
+TIMING_RULES = [
+    _rule("write_time", r"([\d.]+) seconds required for presolve", "required for presolve"),
+    _rule("solver_time", r"([\d.]+) seconds required for solver", "required for solver"),
+    _rule("load_time", r"([\d.]+) seconds required for postsolve", "required for postsolve"),
+]
+for _family_rules in PATTERNS.values():
+    _family_rules.extend(TIMING_RULES)
+
+
+def solver_family(solver: str, subsolver: Optional[str] = None) -> str:
+    """
+    Determine which solver actually wrote a log.
+
+    Parameters
+    ----------
+    solver : str
+        The solver used
+    subsolver : Optional[str], optional
+        The subsolver used, by default None
+
+    Returns
+    -------
+    str
+        Key into PATTERNS: "gurobi", "baron", "scip", "ipopt" or "bnb"
+    """
+    name = solver.lower()
+    if name == "gams" and subsolver:
+        name = subsolver.lower()
+
+    if name == "baron":
+        return "baron"
+    if name == "ipopth" or name == "ipopt":
+        return "ipopt"
+    if "scip" in name:
+        return "scip"
+    if name == "bnb":
+        return "bnb"
+    return "gurobi"
+
+
+class LogParser:
+    """
+    Extract root relaxation, final bounds, node count and status from a solver log.
+
+    The log is read exactly once, either line by line (e.g. while the solver is still
+    writing it) or in blocks. Only the rules that are still open are tried: once a rule
+    has found its (first) match it is dropped. In blocks, the parser jumps straight to
+    the lines containing a trigger of an open rule, so the bulk of a log (node and
+    iteration tables) is skipped at str.find speed.
+    """
+
+    def __init__(self, solver: str, subsolver: Optional[str] = None):
+        self.family = solver_family(solver, subsolver)
+        self.matches: Dict[str, Any] = {}
+        self._rules = PATTERNS[self.family]
+        self._set_open([rule for rule in self._rules if rule.after is None])
+
+    def _set_open(self, rules: List[Rule]) -> None:
+        """Set the open rules and collect their triggers."""
+        self._open = rules
+        self._always = any(rule.trigger is None for rule in rules)
+        self._triggers = {rule.trigger for rule in rules if rule.trigger is not None}
+
+    def feed(self, line: str) -> None:
+        """
+        Parse one line of the log.
+
+        Parameters
+        ----------
+        line : str
+            The line, with or without its line break
+        """
+        done = None
+        for rule in self._open:
+            if rule.trigger is not None and rule.trigger not in line:
+                continue
+            if not rule.last and rule.name in self.matches:
+                continue
+            match = rule.match(line)
+            if match is None:
+                continue
+            self.matches[rule.name] = match
+            if not rule.last:
+                if done is None:
+                    done = set()
+                done.add(rule.name)
+
+        if done is not None:
+            # Close the matched rules (and their alternatives) and open the rules
+            # waiting for them, starting with the next line
+            still_open = [rule for rule in self._open if rule.last or rule.name not in done]
+            self._set_open(still_open + [rule for rule in self._rules if rule.after in done])
+
+    def feed_block(self, block: str) -> None:
+        """
+        Parse a block of complete lines of the log.
+
+        Parameters
+        ----------
+        block : str
+            One or more lines; a trailing partial line is parsed as a line
+        """
+        n = len(block)
+        pos = 0
+        # Position of the next occurrence of every trigger at or after pos (-1 if none)
+        next_hit: Dict[str, int] = {}
+        while pos < n:
+            if self._always:
+                # A rule without a trigger is open, so every line has to be tried
+                end = block.find("\n", pos)
+                end = n if end < 0 else end + 1
+                self.feed(block[pos:end])
+                pos = end
+                continue
+
+            hit = -1
+            for trigger in self._triggers:
+                index = next_hit.get(trigger)
+                if index is None or (0 <= index < pos):
+                    index = block.find(trigger, pos)
+                    next_hit[trigger] = index
+                if index >= 0 and (hit < 0 or index < hit):
+                    hit = index
+            if hit < 0:
+                return
+
+            start = block.rfind("\n", pos, hit) + 1 or pos
+            end = block.find("\n", hit)
+            end = n if end < 0 else end + 1
+            self.feed(block[start:end])
+            pos = end
+
+    def feed_lines(self, lines: Iterable[str]) -> "LogParser":
+        """
+        Parse several lines of the log.
+
+        Parameters
+        ----------
+        lines : Iterable[str]
+            The lines, e.g. an open log file
+
+        Returns
+        -------
+        LogParser
+            The parser itself
+        """
+        for line in lines:
+            self.feed(line)
+        return self
+
+    def _number(self, name: str, group: int = 1) -> Optional[float]:
+        """Convert a group of a stored match to a float."""
+        match = self.matches.get(name)
+        if match is None:
+            return None
+        return float(match.group(group))
+
+    def _root_relaxation(self) -> Any:
+        """Apply the per-solver precedence of the root relaxation patterns."""
+        if self.family == "gurobi":
+            if "root_objective" in self.matches:
+                return self._number("root_objective"), "standard"
+            if "root_cutoff" in self.matches and "first_node_row" in self.matches:
+                row = self.matches["first_node_row"].string
+                bd_match = re.search(r"\|\s+.*?\s+.*?\s+\|\s+.*?\s+(" + DECIMAL + r")\s+", row)
+                if bd_match:
+                    return float(bd_match.group(1)), "cutoff table regex"
+                values = []
+                for part in row.split():
+                    try:
+                        values.append(float(part))
+                    except ValueError:
+                        pass
+                if len(values) >= 2:
+                    return values[-2], "cutoff table"
+            if "explored" in self.matches and "best_bound" in self.matches:
+                return self._number("best_bound"), "best bound"
+            if "gap_line_root" in self.matches:
+                return self._number("gap_line_root"), "from gap line"
+
+        elif self.family == "baron":
+            if "iteration_row" in self.matches:
+                return self.matches["iteration_row"], "lower bound"
+            if "preprocessing" in self.matches:
+                if "best_possible_root" in self.matches:
+                    return self._number("best_possible_root"), "preprocessing"
+                if "lower_bound_is" in self.matches:
+                    return self._number("lower_bound_is"), "lower bound"
+
+        elif self.family == "scip":
+            if "trivial" in self.matches and "objective_value" in self.matches:
+                return self._number("objective_value"), "trivial preprocessing"
+            if "lp0" in self.matches:
+                return self._number("lp0"), "LP0"
+            if "root_dual_bound" in self.matches:
+                return self._number("root_dual_bound"), "dual bound"
+            if "dual_bound_root" in self.matches:
+                return self._number("dual_bound_root"), "dual bound summary"
+
+        elif self.family == "ipopt":
+            if "objective" in self.matches:
+                return self._number("objective"), "objective"
+            if "f_line" in self.matches:
+                return self._number("f_line"), "f value"
+            if "last_line" in self.matches:
+                numeric_values = _DECIMAL_RE.findall(self.matches["last_line"].group(0))
+                if len(numeric_values) >= 2:
+                    return float(numeric_values[-2]), "iteration table"
+                if len(numeric_values) == 1:
+                    return float(numeric_values[0]), "single value"
+
+        elif self.family == "bnb":
+            if "root_bound" in self.matches:
+                return self._number("root_bound"), "root bound"
+
+        return None, None
+
+    def _bounds(self) -> Any:
+        """Apply the per-solver precedence of the final bound patterns."""
+        if self.family == "gurobi":
+            for name in ("gap_line", "explored_gap_line"):
+                if name in self.matches:
+                    return self._number(name, 2), self._number(name, 1)
+        elif self.family == "baron":
+            return self._number("best_possible"), self._number("best_solution")
+        elif self.family == "scip":
+            return self._number("dual_bound"), self._number("primal_bound")
+        elif self.family == "bnb":
+            return self._number("final", 2), self._number("final", 1)
+        return None, None
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarize what has been parsed so far.
+
+        Returns
+        -------
+        Dict[str, Any]
+            Dictionary with root_relaxation, root_relaxation_source, lower_bound,
+            upper_bound, nodes, status and the write, solver and load times of opt.solve
+            (None where not found)
+        """
+        root_relaxation, source = self._root_relaxation()
+        lower_bound, upper_bound = self._bounds()
+
+        nodes = None
+        node_match = self.matches.get("explored") or self.matches.get("nodes")
+        if node_match is not None:
+            nodes = int(node_match.group(1))
+
+        status = None
+        if "status" in self.matches:
+            status = self.matches["status"].group(1)
+
+        return {
+            "solver_family": self.family,
+            "root_relaxation": root_relaxation,
+            "root_relaxation_source": source,
+            "lower_bound": lower_bound,
+            "upper_bound": upper_bound,
+            "nodes": nodes,
+            "status": status,
+            "write_time": self._number("write_time"),
+            "solver_time": self._number("solver_time"),
+            "load_time": self._number("load_time"),
+        }
+
+
+def open_log(log_path: str) -> IO[str]:
+    """
+    Open a solver log for reading, decompressing gzipped logs.
+
+    Parameters
+    ----------
+    log_path : str
+        Path to the log file (".gz" for compressed logs)
+
+    Returns
+    -------
+    IO[str]
+        The open text stream
+    """
+    if log_path.endswith(".gz"):
+        return gzip.open(log_path, "rt", errors="replace")
+    return open(log_path, "r", errors="replace")
+
+
+def find_log(results_dir: str, name: str = OUTPUT_LOG) -> Optional[str]:
+    """
+    Find a log in a run directory, plain or compressed.
+
+    Parameters
+    ----------
+    results_dir : str
+        Run directory
+    name : str, optional
+        Name of the uncompressed log, by default OUTPUT_LOG
+
+    Returns
+    -------
+    Optional[str]
+        Path to the log, or None if neither variant exists
+    """
+    for path in (os.path.join(results_dir, name), os.path.join(results_dir, name + ".gz")):
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def feed_file(log_path: str, parsers: List[Any]) -> None:
+    """
+    Feed a whole log file to parsers in blocks of complete lines.
+
+    Parameters
+    ----------
+    log_path : str
+        Path to the log file
+    parsers : List[Any]
+        Parsers with a feed_block method
+    """
+    with open_log(log_path) as f:
+        remainder = ""
+        while True:
+            block = f.read(BLOCK_SIZE)
+            if not block:
+                break
+            # Only complete lines are parsed; the rest is carried over to the next block
+            block = remainder + block
+            cut = block.rfind("\n") + 1
+            for parser in parsers:
+                parser.feed_block(block[:cut])
+            remainder = block[cut:]
+        if remainder:
+            for parser in parsers:
+                parser.feed_block(remainder)
+
+
+class MemoryFailureParser:
+    """
+    Find the first line of a log that reports a failed allocation.
+
+    Kept apart from LogParser, as it is only needed for jobs that failed and its
+    case-insensitive search would slow down the parsing of every log.
+    """
+
+    def __init__(self) -> None:
+        self.line: Optional[str] = None
+
+    def feed_block(self, block: str) -> None:
+        """
+        Search a block of complete lines of the log.
+
+        Parameters
+        ----------
+        block : str
+            One or more lines
+        """
+        if self.line is not None:
+            return
+        lowered = block.lower()
+        hits = [index for index in map(lowered.find, MEMORY_FAILURES) if index >= 0]
+        if hits:
+            start = block.rfind("\n", 0, min(hits)) + 1
+            end = block.find("\n", min(hits))
+            self.line = block[start : end if end >= 0 else len(block)].strip()
+
+
+def parse_log(
+    log_path: str, solver: str = "gurobi", subsolver: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Parse a solver log in a single pass.
+
+    Parameters
+    ----------
+    log_path : str
+        Path to the log file (plain or gzipped)
+    solver : str, optional
+        The solver used, by default "gurobi"
+    subsolver : Optional[str], optional
+        The subsolver used, by default None
+
+    Returns
+    -------
+    Optional[Dict[str, Any]]
+        The LogParser summary, or None if the log does not exist
+    """
+    if not os.path.exists(log_path):
+        print(f"Warning: Output log file not found at {log_path}")
+        return None
+
+    parser = LogParser(solver, subsolver)
+    feed_file(log_path, [parser])
+    return parser.summary()
+
+
+def parse_run_logs(
+    results_dir: str,
+    solver: str = "gurobi",
+    subsolver: Optional[str] = None,
+    summary: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Parse all solver logs of a run directory, each exactly once.
+
+    The captured output log is parsed first, unless its summary is already known from
+    parsing it while it was written. Values it lacks are taken from the dedicated
+    gurobi_solver.log that direct Gurobi solves write.
+
+    Parameters
+    ----------
+    results_dir : str
+        Directory containing the logs
+    solver : str, optional
+        The solver used, by default "gurobi"
+    subsolver : Optional[str], optional
+        The subsolver used, by default None
+    summary : Optional[Dict[str, Any]], optional
+        LogParser summary of the output log, by default None (parse the file)
+
+    Returns
+    -------
+    Dict[str, Any]
+        The merged LogParser summary (all values None if no log was found)
+    """
+    if summary is None:
+        output_log_path = find_log(results_dir)
+        if output_log_path is not None:
+            summary = parse_log(output_log_path, solver, subsolver)
+        else:
+            print(f"Warning: Output log file not found in {results_dir}")
+    if summary is None:
+        summary = LogParser(solver, subsolver).summary()
+    summary = dict(summary)
+
+    gurobi_log_path = os.path.join(results_dir, "gurobi_solver.log")
+    missing = any(summary[key] is None for key in LOG_VALUES)
+    if missing and os.path.exists(gurobi_log_path):
+        gurobi_summary = parse_log(gurobi_log_path, "gurobi", None)
+        if gurobi_summary is not None:
+            for key, value in gurobi_summary.items():
+                if summary[key] is None:
+                    summary[key] = value
+
+    return summary
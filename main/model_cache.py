@@ -0,0 +1,180 @@
+import hashlib
+import inspect
+import os
+import tempfile
+from typing import Callable, Dict, Optional
+
+import dill as pickle
+import direct
+import instances
+import numpy as np
+import phase_timing
+import pyomo.environ as pyo
+import pyomo.version
+import symmetry
+
+# Versions of the transformation plugins, computed once per process
+_strategy_versions: Dict[str, str] = {}
+
+
+def instance_hash(model: pyo.ConcreteModel) -> str:
+    """
+    Compute a content hash of the instance behind a k-means model.
+
+    Parameters
+    ----------
+    model : pyo.ConcreteModel
+        A model created by k_means.build_model
+
+    Returns
+    -------
+    str
+        Hex digest over the coordinates, number of clusters, coordinate range, the
+        bounds of the center and distance variables, the fixed assignment indicators
+        and the symmetry-breaking scheme
+    """
+    instance = instances.instance_from_model(model)
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(instance["points"], dtype=float).tobytes())
+    digest.update(repr(instance["points"].shape).encode())
+    digest.update(repr(instance["n_clusters"]).encode())
+    digest.update(repr(instance["coord_range"]).encode())
+    # The transformations derive big-M values and disaggregated bounds from these
+    variable_bounds = [
+        var.bounds for var in (*model.center_coordinates.values(), *model.distance.values())
+    ]
+    digest.update(np.array(variable_bounds, dtype=float).tobytes())
+    # Indicators fixed by the symmetry breaking or presolve, and presolve's linking rows
+    fixed_indicators = [
+        -1 if not var.fixed else var.value
+        for var in (d.binary_indicator_var for d in model.disjunct_blocks.values())
+    ]
+    digest.update(np.array(fixed_indicators, dtype=float).tobytes())
+    digest.update(repr(model.component("presolve") is not None).encode())
+    digest.update(symmetry.scheme_of(model).encode())
+    return digest.hexdigest()
+
+
+def strategy_version(strategy: str) -> str:
+    """
+    Identify the code that implements a reformulation strategy.
+
+    The version combines the Pyomo version with a hash of the source file of the
+    transformation class (of direct.py for the direct strategies), so edits to the local
+    GDP plugins invalidate cached models.
+
+    Parameters
+    ----------
+    strategy : str
+        Reformulation strategy, e.g. "gdp.hull_exact" or "gdp.hull_eps_1e-3"
+
+    Returns
+    -------
+    str
+        Version string for the strategy
+    """
+    if strategy in _strategy_versions:
+        return _strategy_versions[strategy]
+
+    transformation_name = "gdp.hull" if strategy.startswith("gdp.hull_eps") else strategy
+    source_hash = "unknown"
+    try:
+        if direct.is_direct(strategy):
+            source_file = inspect.getsourcefile(direct)
+        else:
+            transformation = pyo.TransformationFactory(transformation_name)
+            source_file = inspect.getsourcefile(type(transformation))
+        if source_file is not None:
+            with open(source_file, "rb") as f:
+                source_hash = hashlib.sha256(f.read()).hexdigest()[:16]
+    except Exception as e:
+        print(f"Warning: Could not determine version of strategy {strategy}: {str(e)}")
+
+    version = f"pyomo-{pyomo.version.version}-{source_hash}"
+    _strategy_versions[strategy] = version
+    return version
+
+
+def cache_key(model: pyo.ConcreteModel, strategy: str) -> str:
+    """
+    Compute the cache key of a (instance, strategy) pair.
+
+    Parameters
+    ----------
+    model : pyo.ConcreteModel
+        The untransformed k-means model
+    strategy : str
+        Reformulation strategy
+
+    Returns
+    -------
+    str
+        Hex digest identifying the transformed model
+    """
+    key = f"{instance_hash(model)}|{strategy}|{strategy_version(strategy)}"
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def get_transformed_model(
+    model: pyo.ConcreteModel,
+    strategy: str,
+    cache_dir: str,
+    transform: Callable[[pyo.ConcreteModel, str], None],
+    timings: Optional[Dict[str, float]] = None,
+) -> pyo.ConcreteModel:
+    """
+    Return a fresh transformed copy of a model, reusing a cached transformation if present.
+
+    On a cache miss the model is cloned, transformed and stored under its content
+    address. Every call returns a new object, so solving it never touches the cache.
+
+    Parameters
+    ----------
+    model : pyo.ConcreteModel
+        The untransformed k-means model (left unchanged)
+    strategy : str
+        Reformulation strategy
+    cache_dir : str
+        Root directory of the transformed-model cache
+    transform : Callable[[pyo.ConcreteModel, str], None]
+        Function applying the strategy to a model in place
+    timings : Optional[Dict[str, float]], optional
+        Phase timings receiving "cache_load" on a hit, "clone" and "transformation" on
+        a miss, by default None
+
+    Returns
+    -------
+    pyo.ConcreteModel
+        The transformed model
+    """
+    key = cache_key(model, strategy)
+    cache_path = os.path.join(cache_dir, key[:2], f"{key}.pkl")
+
+    if os.path.exists(cache_path):
+        try:
+            with phase_timing.timed(timings, "cache_load"), open(cache_path, "rb") as f:
+                transformed = pickle.load(f)
+            print(f"Loaded transformed model ({strategy}) from cache: {cache_path}")
+            return transformed
+        except Exception as e:
+            print(f"Warning: Could not load cached model {cache_path}: {str(e)}")
+
+    with phase_timing.timed(timings, "clone"):
+        transformed = model.clone()
+    with phase_timing.timed(timings, "transformation"):
+        transform(transformed, strategy)
+
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    # Write to a temporary file first so concurrent readers never see partial pickles
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(transformed, f)
+        os.replace(tmp_path, cache_path)
+        print(f"Cached transformed model ({strategy}) at {cache_path}")
+    except Exception as e:
+        print(f"Warning: Could not cache transformed model: {str(e)}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return transformed
@@ -0,0 +1,64 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+# Phases of solve_model and their column in the results store
+PHASE_COLUMNS = {
+    "model_load": "Model Load Time (sec)",
+    "cache_load": "Cache Load Time (sec)",
+    "clone": "Clone Time (sec)",
+    "transformation": "Transformation Time (sec)",
+    "template_update": "Template Update Time (sec)",
+    "warm_start": "Warm Start Time (sec)",
+    "presolve": "Presolve Time (sec)",
+    "problem_write": "Problem Write Time (sec)",
+    "solver": "Solver Process Time (sec)",
+    "solution_load": "Solution Load Time (sec)",
+    "log_parsing": "Log Parsing Time (sec)",
+    "result_persistence": "Result Persistence Time (sec)",
+}
+
+# Phases inside opt.solve, as reported by Pyomo's report_timing output (see log_parser)
+SOLVE_PHASES = {
+    "write_time": "problem_write",
+    "solver_time": "solver",
+    "load_time": "solution_load",
+}
+
+
+@contextmanager
+def timed(timings: Optional[Dict[str, float]], phase: str) -> Iterator[None]:
+    """
+    Add the wall time of the enclosed block to timings[phase].
+
+    Parameters
+    ----------
+    timings : Optional[Dict[str, float]]
+        Phase timings in seconds; nothing is recorded if None
+    phase : str
+        Name of the phase, see PHASE_COLUMNS
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings[phase] = timings.get(phase, 0.0) + time.perf_counter() - start
+
+
+def timing_columns(timings: Optional[Dict[str, float]]) -> Dict[str, Optional[float]]:
+    """
+    Convert phase timings to results store columns.
+
+    Parameters
+    ----------
+    timings : Optional[Dict[str, float]]
+        Phase timings in seconds
+
+    Returns
+    -------
+    Dict[str, Optional[float]]
+        One column per phase in PHASE_COLUMNS (None for phases that did not run)
+    """
+    timings = timings or {}
+    return {column: timings.get(phase) for phase, column in PHASE_COLUMNS.items()}
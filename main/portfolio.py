@@ -0,0 +1,376 @@
+import multiprocessing
+import queue
+import signal
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import jobs
+import ledger
+import results_store
+import supervisor
+
+# Strategy name of the results row summarizing a race
+PORTFOLIO_STRATEGY = "portfolio"
+
+
+def race_key(job: Dict[str, Any]) -> str:
+    """
+    Identify the race a job belongs to: all strategies of one model and solver setting.
+
+    Parameters
+    ----------
+    job : Dict[str, Any]
+        A job created by jobs.expand_jobs
+
+    Returns
+    -------
+    str
+        Key of the form model|solver|subsolver|mode|time_limit
+    """
+    return "|".join(
+        str(job[part]) for part in ("model_name", "solver", "subsolver", "mode", "time_limit")
+    )
+
+
+def race_groups(batch_jobs: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """
+    Group jobs into races, keeping the order of their first jobs.
+
+    Parameters
+    ----------
+    batch_jobs : List[Dict[str, Any]]
+        Jobs created by jobs.expand_jobs
+
+    Returns
+    -------
+    List[List[Dict[str, Any]]]
+        The jobs of every race, one per strategy
+    """
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for job in batch_jobs:
+        groups.setdefault(race_key(job), []).append(job)
+    return list(groups.values())
+
+
+def proven_optimal(row: Optional[Dict[str, Any]]) -> bool:
+    """
+    Whether a results row proves optimality within the solver tolerances.
+
+    Parameters
+    ----------
+    row : Optional[Dict[str, Any]]
+        A results row of an original problem
+
+    Returns
+    -------
+    bool
+        True if the solve ended optimal and its bounds are closed within TOLS (the
+        absolute gap, or the relative gap to the objective as the solvers measure it)
+    """
+    # Imported here so that only the race driver loads the solver stack for TOLS
+    from solve import TOLS
+
+    if row is None or row.get("Status") != "optimal":
+        return False
+    lower_bound, objective = row.get("Lower Bound"), row.get("Objective Value")
+    if lower_bound is None or objective is None:
+        return False
+    return objective - lower_bound <= max(TOLS["abs_gap"], TOLS["rel_gap"] * abs(objective))
+
+
+def record_race(race: Dict[str, Any]) -> None:
+    """
+    Record the summary row of a finished race under the strategy PORTFOLIO_STRATEGY.
+
+    With a winner, the row is the winner's row plus the winning strategy and the wall
+    time to its proof, i.e. the time to proven optimum of the portfolio. Otherwise it
+    holds the best objective and bound over all strategies.
+
+    Parameters
+    ----------
+    race : Dict[str, Any]
+        A finished race (see run_portfolio)
+    """
+    # Imported here so that only the race driver loads the solver stack
+    from solve import tolerance_key
+
+    first_job = race["jobs"][0]
+    key_columns = supervisor.key_columns(first_job, PORTFOLIO_STRATEGY)
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    if race["winner"] is not None:
+        row = {
+            **race["winner_row"],
+            **key_columns,
+            "Run Time": now,
+            "Portfolio Winner": race["winner"]["strategy"],
+            "Portfolio Time (sec)": race["winner_time"],
+        }
+    else:
+        rows = [
+            supervisor.stored_result(job, race["since"])
+            for job in race["jobs"]
+            if race["outcomes"][jobs.job_id(job)]["status"] == "done"
+        ]
+        objectives = [
+            row["Objective Value"] for row in rows if row and row.get("Objective Value") is not None
+        ]
+        lower_bounds = [
+            row["Lower Bound"] for row in rows if row and row.get("Lower Bound") is not None
+        ]
+        row = {
+            **key_columns,
+            **supervisor.instance_columns(first_job),
+            "Tolerances": tolerance_key(),
+            "Run Time": now,
+            "Status": "not proven",
+            "Objective Value": min(objectives) if objectives else None,
+            "Lower Bound": max(lower_bounds) if lower_bounds else None,
+            "Portfolio Winner": None,
+            "Portfolio Time (sec)": None,
+        }
+    try:
+        results_store.upsert_result(row, replace=True)
+    except Exception as e:
+        print(f"Warning: Could not record the portfolio result: {str(e)}")
+
+
+def _start_race(
+    group: List[Dict[str, Any]],
+    context: Any,
+    outcomes: Any,
+    ledger_path: Optional[str],
+    memory_limit: Optional[float],
+    watchdog_grace: float,
+) -> Dict[str, Any]:
+    """Start one worker process per strategy of a race."""
+    start = time.time()
+    race: Dict[str, Any] = {
+        "jobs": group,
+        "start": start,
+        "since": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "deadlines": {
+            jobs.job_id(job): start + supervisor.job_deadline(job, watchdog_grace) for job in group
+        },
+        "processes": {},
+        "outcomes": {},
+        "winner": None,
+        "winner_row": None,
+        "winner_time": None,
+    }
+    for job in group:
+        process = context.Process(
+            target=supervisor.worker, args=(job, ledger_path, outcomes, memory_limit)
+        )
+        process.start()
+        race["processes"][jobs.job_id(job)] = process
+    print(
+        f"Racing {len(group)} strategies on {race_key(group[0])}: "
+        f"{', '.join(job['strategy'] for job in group)}"
+    )
+    return race
+
+
+def _finish_job(
+    race: Dict[str, Any],
+    job: Dict[str, Any],
+    outcome: Dict[str, Any],
+    ledger_path: Optional[str],
+    grace_period: float,
+) -> None:
+    """Record the outcome of a race job and cancel the others if it proved optimality."""
+    current_id = jobs.job_id(job)
+    race["processes"].pop(current_id).join()
+    outcome = supervisor.classify(outcome, job)
+    race["outcomes"][current_id] = outcome
+    if outcome["status"] not in ("done", "failed"):
+        # Stopped by the watchdog or died: record what its logs show, as run_supervised
+        if ledger_path is not None:
+            ledger.record_job(
+                ledger_path, current_id, ledger.FAILED, f"{outcome['status']}: {outcome['error']}"
+            )
+        supervisor.record_partial(
+            job, time.time() - race["start"], race["since"], outcome["status"]
+        )
+    else:
+        jobs.record_outcome(outcome, ledger_path)
+    print(f"Finished race job {current_id} ({outcome['status']})")
+
+    if race["winner"] is not None or outcome["status"] != "done":
+        return
+    row = supervisor.stored_result(job, race["since"])
+    if not proven_optimal(row):
+        return
+
+    race["winner"], race["winner_row"] = job, row
+    race["winner_time"] = outcome["wall_time"]
+    running = {
+        job_id: race["processes"].pop(job_id)
+        for job_id in list(race["processes"])
+        if job_id not in race["outcomes"]
+    }
+    print(
+        f"Strategy {job['strategy']} proved optimality in {outcome['wall_time']:.2f} "
+        f"seconds; cancelling {len(running)} other strategies"
+    )
+    supervisor.terminate(list(running.values()), grace_period)
+    for other in race["jobs"]:
+        other_id = jobs.job_id(other)
+        if other_id not in running:
+            continue
+        wall_time = time.time() - race["start"]
+        race["outcomes"][other_id] = {
+            "job_id": other_id,
+            "status": ledger.CANCELLED,
+            "error": None,
+            "wall_time": wall_time,
+        }
+        if ledger_path is not None:
+            ledger.record_job(ledger_path, other_id, ledger.CANCELLED)
+        supervisor.record_partial(other, wall_time, race["since"], ledger.CANCELLED)
+
+
+def _dispatch(
+    races: List[Dict[str, Any]],
+    outcome: Dict[str, Any],
+    ledger_path: Optional[str],
+    grace_period: float,
+) -> None:
+    """Hand a reported outcome to the race of its job."""
+    for race in races:
+        # Outcomes of cancelled jobs that finished just in time are dropped
+        if outcome["job_id"] in race["processes"]:
+            job = next(job for job in race["jobs"] if jobs.job_id(job) == outcome["job_id"])
+            _finish_job(race, job, outcome, ledger_path, grace_period)
+            return
+
+
+def run_portfolio(
+    batch_jobs: List[Dict[str, Any]],
+    n_cores: int = 1,
+    ledger_path: Optional[str] = None,
+    memory_limit: Optional[float] = None,
+    grace_period: float = supervisor.TERMINATE_GRACE,
+    watchdog_grace: float = supervisor.WATCHDOG_GRACE,
+) -> List[Dict[str, Any]]:
+    """
+    Race the strategies of every model and solver setting against each other.
+
+    All strategies of a race run at once, each in its own worker process. As soon as
+    one proves optimality within TOLS (see proven_optimal), the others are cancelled
+    and their partial results (bounds and nodes from their output logs) are recorded
+    with status "cancelled"; the ledger marks them as such, so a resumed batch does not
+    rerun them. A summary row per race is recorded with the strategy
+    PORTFOLIO_STRATEGY (see record_race). Races are started while the core budget
+    allows, but at least one runs at a time, so a race may use more cores than
+    n_cores. As in supervisor.run_supervised, a watchdog stops strategies that overrun
+    supervisor.job_deadline (TIMEOUT), and workers that die without reporting are
+    recorded as CRASHED.
+
+    Parameters
+    ----------
+    batch_jobs : List[Dict[str, Any]]
+        Jobs created by jobs.expand_jobs
+    n_cores : int, optional
+        Number of cores the batch may use, by default 1
+    ledger_path : Optional[str], optional
+        Job ledger recording when each job starts and how it ends, by default None
+    memory_limit : Optional[float], optional
+        Address space limit per job in GB, by default None (no limit)
+    grace_period : float, optional
+        Seconds a cancelled run gets to stop before it is killed, by default
+        supervisor.TERMINATE_GRACE
+    watchdog_grace : float, optional
+        Seconds a strategy may run beyond the time limits of its solves, by default
+        supervisor.WATCHDOG_GRACE
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        The outcome of every job (see jobs.run_job; cancelled jobs have the status
+        "cancelled"), in completion order of the races
+    """
+    pending = race_groups(batch_jobs)
+    print(f"Running {len(batch_jobs)} jobs as {len(pending)} portfolio races")
+    # Spawned workers start without inherited solver state (e.g. license environments)
+    context = multiprocessing.get_context("spawn")
+    outcomes = context.Queue()
+    races: List[Dict[str, Any]] = []
+    results: List[Dict[str, Any]] = []
+
+    while pending or races:
+        # Start races while their workers fit into the core budget
+        while pending and (
+            not races or sum(len(race["processes"]) for race in races) + len(pending[0]) <= n_cores
+        ):
+            races.append(
+                _start_race(
+                    pending.pop(0), context, outcomes, ledger_path, memory_limit, watchdog_grace
+                )
+            )
+
+        timeout = min(
+            [
+                supervisor.POLL_INTERVAL,
+                *(
+                    race["deadlines"][job_id] - time.time()
+                    for race in races
+                    for job_id in race["processes"]
+                ),
+            ]
+        )
+        try:
+            _dispatch(races, outcomes.get(timeout=max(0.0, timeout)), ledger_path, grace_period)
+        except queue.Empty:
+            # Outcomes of workers that exited since are in the queue by now
+            while True:
+                try:
+                    _dispatch(races, outcomes.get_nowait(), ledger_path, grace_period)
+                except queue.Empty:
+                    break
+            now = time.time()
+            for race in races:
+                for job in race["jobs"]:
+                    job_id = jobs.job_id(job)
+                    process = race["processes"].get(job_id)
+                    if process is None:
+                        continue
+                    wall_time = now - race["start"]
+                    if process.exitcode is not None:
+                        # Died without reporting (e.g. killed by the OS)
+                        error = f"Worker exited with code {process.exitcode}"
+                        if process.exitcode == -signal.SIGKILL:
+                            error += " (killed by SIGKILL, e.g. by the OS out-of-memory killer)"
+                        stopped = {
+                            "job_id": job_id,
+                            "status": supervisor.CRASHED,
+                            "error": error,
+                            "wall_time": wall_time,
+                        }
+                    elif now >= race["deadlines"][job_id]:
+                        print(f"Watchdog: stopping job {job_id} after {wall_time:.0f} seconds")
+                        supervisor.terminate([process], grace_period)
+                        stopped = {
+                            "job_id": job_id,
+                            "status": supervisor.TIMEOUT,
+                            "error": f"Stopped by the watchdog after {wall_time:.0f} seconds",
+                            "wall_time": wall_time,
+                        }
+                    else:
+                        continue
+                    _finish_job(race, job, stopped, ledger_path, grace_period)
+
+        for race in [race for race in races if not race["processes"]]:
+            races.remove(race)
+            record_race(race)
+            results.extend(race["outcomes"].values())
+            if race["winner"] is not None:
+                print(
+                    f"Race {race_key(race['jobs'][0])}: {race['winner']['strategy']} "
+                    f"proved optimality in {race['winner_time']:.2f} seconds"
+                )
+            else:
+                print(f"Race {race_key(race['jobs'][0])}: no strategy proved optimality")
+
+    return results
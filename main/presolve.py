@@ -0,0 +1,181 @@
+from typing import Dict, Optional
+
+import numpy as np
+import pyomo.environ as pyo
+import symmetry
+
+# Bound mode under which center boxes can exclude points (see k_means.data_bounds)
+EFFECTIVE_BOUNDS = "data_clusters"
+
+
+def duplicate_groups(np_points: np.ndarray) -> np.ndarray:
+    """
+    Find points with identical coordinates.
+
+    Parameters
+    ----------
+    np_points : np.ndarray
+        Point coordinates of shape (n_points, n_dimensions)
+
+    Returns
+    -------
+    np.ndarray
+        For every point the (0-based) index of the first point with the same coordinates
+    """
+    _, first, inverse = np.unique(np_points, axis=0, return_index=True, return_inverse=True)
+    return first[inverse.reshape(-1)]
+
+
+def min_squared_distances(
+    np_points: np.ndarray, center_lower: np.ndarray, center_upper: np.ndarray
+) -> np.ndarray:
+    """
+    Smallest squared distance from every point to the bound box of every center.
+
+    Parameters
+    ----------
+    np_points : np.ndarray
+        Point coordinates of shape (n_points, n_dimensions)
+    center_lower : np.ndarray
+        Lower center bounds of shape (n_clusters, n_dimensions)
+    center_upper : np.ndarray
+        Upper center bounds of shape (n_clusters, n_dimensions)
+
+    Returns
+    -------
+    np.ndarray
+        Array of shape (n_points, n_clusters)
+    """
+    points = np_points[:, None, :]
+    gap = np.maximum(np.maximum(center_lower[None] - points, points - center_upper[None]), 0.0)
+    return (gap**2).sum(axis=2)
+
+
+def presolve(model: pyo.ConcreteModel, upper_bound: Optional[float] = None) -> Dict[str, int]:
+    """
+    Fix assignments of a k-means GDP model that are determined by bound arguments.
+
+    Runs on the untransformed model, so every reformulation strategy sees the fixed
+    indicator variables and drops the corresponding disjuncts. Each step keeps at least
+    one optimal solution feasible, also together with the symmetry-breaking schemes:
+
+    - Points with identical coordinates are placed in the same cluster as the first
+      such point (linking their indicator variables and distances). Distinct points,
+      however close, can lie on either side of a cluster boundary, so they are never
+      merged.
+    - With a known upper bound on the objective, no single distance can exceed it.
+    - A disjunct is infeasible if the squared distance from its point to the bound box
+      of its center exceeds the point's distance bound; its indicator is fixed to False.
+    - A disjunction left with a single possible disjunct has it fixed to True.
+
+    Under "box" and "data" bounds every point lies in the bound box of every center, so
+    no disjunct is excluded; only the per-cluster bounds of EFFECTIVE_BOUNDS together
+    with an upper bound exclude any. On the uniformly drawn batch instances this fixes
+    a few disjuncts at most, and duplicate points do not occur; the presolve pays off
+    on data with repeated points or tight cutoffs. A warning is printed when it finds
+    nothing.
+
+    Parameters
+    ----------
+    model : pyo.ConcreteModel
+        A model created by k_means.build_model, before its GDP transformation
+    upper_bound : Optional[float], optional
+        Objective value of a known feasible solution, by default None
+
+    Returns
+    -------
+    Dict[str, int]
+        Number of duplicate points linked to an earlier point, disjuncts fixed to
+        False and disjuncts fixed to True
+    """
+    points = list(model.points)
+    clusters = list(model.clusters)
+    np_points = np.array(
+        [[pyo.value(model.points_coordinates[i, j]) for j in model.dimensions] for i in points]
+    )
+    stats = {"duplicate_points": 0, "fixed_false": 0, "fixed_true": 0}
+
+    # Distances cannot exceed the objective of a solution that is to be improved on
+    if upper_bound is not None:
+        for i in points:
+            var = model.distance[i]
+            if var.ub is None or var.ub > upper_bound:
+                var.setub(max(upper_bound, var.lb or 0.0))
+
+    # Disjuncts whose point is too far from every admissible center
+    center_lower = np.array(
+        [[model.center_coordinates[k, j].lb for j in model.dimensions] for k in clusters],
+        dtype=float,
+    )
+    center_upper = np.array(
+        [[model.center_coordinates[k, j].ub for j in model.dimensions] for k in clusters],
+        dtype=float,
+    )
+    center_lower = np.nan_to_num(center_lower, nan=-np.inf)
+    center_upper = np.nan_to_num(center_upper, nan=np.inf)
+    distance_upper = np.array(
+        [np.inf if model.distance[i].ub is None else model.distance[i].ub for i in points]
+    )
+    infeasible = min_squared_distances(np_points, center_lower, center_upper) > (
+        distance_upper[:, None] * (1 + 1e-9) + 1e-9
+    )
+    for position, i in enumerate(points):
+        for k_position, k in enumerate(clusters):
+            disjunct = model.disjunct_blocks[k, i]
+            if infeasible[position, k_position] and not disjunct.indicator_var.fixed:
+                disjunct.indicator_var.fix(False)
+                disjunct.binary_indicator_var.fix(0)
+                stats["fixed_false"] += 1
+
+    # Disjunctions with a single possible disjunct
+    for i in points:
+        open_disjuncts = [
+            model.disjunct_blocks[k, i]
+            for k in clusters
+            if not (
+                model.disjunct_blocks[k, i].indicator_var.fixed
+                and not model.disjunct_blocks[k, i].indicator_var.value
+            )
+        ]
+        if len(open_disjuncts) == 1 and not open_disjuncts[0].indicator_var.fixed:
+            open_disjuncts[0].indicator_var.fix(True)
+            open_disjuncts[0].binary_indicator_var.fix(1)
+            stats["fixed_true"] += 1
+
+    # Identical points share the cluster and distance of their first occurrence
+    first = duplicate_groups(np_points)
+    duplicates = [
+        (points[position], points[first[position]])
+        for position in range(len(points))
+        if first[position] != position
+    ]
+    stats["duplicate_points"] = len(duplicates)
+    if duplicates:
+        if model.component("presolve") is not None:
+            model.del_component("presolve")
+        model.presolve = pyo.Block()
+        model.presolve.duplicates = pyo.Set(initialize=duplicates, dimen=2)
+        model.presolve.same_cluster = pyo.Constraint(
+            model.presolve.duplicates,
+            model.clusters,
+            rule=lambda block, i, first_i, k: (
+                model.disjunct_blocks[k, i].binary_indicator_var
+                == model.disjunct_blocks[k, first_i].binary_indicator_var
+            ),
+        )
+        model.presolve.same_distance = pyo.Constraint(
+            model.presolve.duplicates,
+            rule=lambda block, i, first_i: model.distance[i] == model.distance[first_i],
+        )
+
+    print(
+        f"Presolve ({symmetry.scheme_of(model)} symmetry breaking): "
+        f"{stats['duplicate_points']} duplicate points, {stats['fixed_false']} disjuncts "
+        f"excluded, {stats['fixed_true']} assignments fixed"
+    )
+    if not any(stats.values()):
+        print(
+            "Warning: Presolve found no reductions; disjuncts are only excluded with "
+            f"{EFFECTIVE_BOUNDS} bounds and an objective cutoff"
+        )
+    return stats
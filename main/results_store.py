@@ -0,0 +1,471 @@
+import argparse
+import json
+import os
+import sqlite3
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+# Column holding the canonical solve settings of a result (see settings_key)
+SETTINGS_COLUMN = "Settings"
+
+# Columns that identify a result; re-running the same job replaces its row
+KEY_COLUMNS = [
+    "Model Name",
+    "Strategy",
+    "Mode",
+    "Solver",
+    "Subsolver",
+    "Problem Type",
+    "Time Limit",
+    SETTINGS_COLUMN,
+]
+
+KEY_COLUMN = "Result Key"
+TABLE = "results"
+
+# Options of solve.solve_model that change its result, with the values None stands for.
+# Instances are built with symmetry.DEFAULT_SCHEME, which symmetry_scheme=None keeps
+RESULT_SETTINGS: Dict[str, Any] = {
+    "warm_start": False,
+    "upper_bound": None,
+    "cutoff_sources": None,
+    "bounds": "box",
+    "symmetry_scheme": "first_coordinate",
+    "presolve": False,
+    "use_template": False,
+}
+
+
+def default_store_path() -> str:
+    """
+    Path of the results store next to the legacy results workbook.
+
+    Returns
+    -------
+    str
+        data/results.sqlite relative to the parent of the working directory
+    """
+    return os.path.join(os.path.dirname(os.getcwd()), "data", "results.sqlite")
+
+
+def default_excel_path() -> str:
+    """
+    Path of the exported results workbook.
+
+    Returns
+    -------
+    str
+        data/results.xlsx relative to the parent of the working directory
+    """
+    return os.path.join(os.path.dirname(os.getcwd()), "data", "results.xlsx")
+
+
+def result_key(row: Dict[str, Any]) -> str:
+    """
+    Build the unique key of a results row.
+
+    Parameters
+    ----------
+    row : Dict[str, Any]
+        A results row containing all KEY_COLUMNS
+
+    Returns
+    -------
+    str
+        The key columns joined with "|"
+    """
+    return "|".join(str(row.get(column)) for column in KEY_COLUMNS)
+
+
+def settings_key(options: Dict[str, Any]) -> str:
+    """
+    Build a canonical string of the solve settings that change a result.
+
+    Parameters
+    ----------
+    options : Dict[str, Any]
+        Keyword arguments of solve.solve_model; options missing from it or None take
+        their defaults and options not in RESULT_SETTINGS are ignored
+
+    Returns
+    -------
+    str
+        JSON object of all RESULT_SETTINGS with sorted keys
+    """
+    settings = {}
+    for name, default in RESULT_SETTINGS.items():
+        value = options.get(name)
+        if value is None:
+            value = default
+        settings[name] = sorted(value) if isinstance(value, (list, tuple)) else value
+    return json.dumps(settings, sort_keys=True)
+
+
+def _legacy_settings(row: Dict[str, Any]) -> str:
+    """
+    Settings of a row recorded before the settings were part of the key.
+
+    The options are recovered from the columns the run recorded. The source of an
+    objective cutoff was not recorded, so it is marked "unknown".
+    """
+    return settings_key(
+        {
+            "warm_start": row.get("Warm Start Objective") is not None,
+            "cutoff_sources": ["unknown"] if row.get("Objective Cutoff") is not None else None,
+            "bounds": row.get("Bounds"),
+            "symmetry_scheme": row.get("Symmetry"),
+            "presolve": row.get("Presolve Fixed Disjuncts") is not None,
+        }
+    )
+
+
+def _quote(column: str) -> str:
+    """Quote a column name for use in SQL."""
+    return '"' + column.replace('"', '""') + '"'
+
+
+def _to_sql_value(value: Any) -> Any:
+    """Convert a value to a type SQLite can store (NumPy scalars, enums, ...)."""
+    if value is None or isinstance(value, (int, float, str, bytes)):
+        return value
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def connect(db_path: Optional[str] = None) -> sqlite3.Connection:
+    """
+    Open the results store, creating it if needed.
+
+    The database runs in WAL mode, so readers never block the writer and concurrent
+    batch jobs only wait for each other for the duration of a single-row write.
+
+    Parameters
+    ----------
+    db_path : Optional[str], optional
+        Path to the SQLite database, by default default_store_path()
+
+    Returns
+    -------
+    sqlite3.Connection
+        An open connection
+    """
+    if db_path is None:
+        db_path = default_store_path()
+    if os.path.dirname(db_path):
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+    connection = sqlite3.connect(db_path, timeout=120)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.execute(
+        f"CREATE TABLE IF NOT EXISTS {TABLE} ({_quote(KEY_COLUMN)} TEXT PRIMARY KEY)"
+    )
+    _migrate_settings(connection)
+    return connection
+
+
+def _migrate_settings(connection: sqlite3.Connection) -> None:
+    """Add the settings to the rows and keys of a store written before they were keyed."""
+    if SETTINGS_COLUMN in {row[1] for row in connection.execute(f"PRAGMA table_info({TABLE})")}:
+        return
+    # Lock the store, so concurrent jobs migrate it once
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        existing = {row[1] for row in connection.execute(f"PRAGMA table_info({TABLE})")}
+        if SETTINGS_COLUMN not in existing:
+            connection.execute(f"ALTER TABLE {TABLE} ADD COLUMN {_quote(SETTINGS_COLUMN)}")
+            cursor = connection.execute(f"SELECT * FROM {TABLE}")
+            columns = [description[0] for description in cursor.description]
+            for values in cursor.fetchall():
+                row = dict(zip(columns, values))
+                row[SETTINGS_COLUMN] = _legacy_settings(row)
+                connection.execute(
+                    f"UPDATE {TABLE} SET {_quote(SETTINGS_COLUMN)} = ?, {_quote(KEY_COLUMN)} = ? "
+                    f"WHERE {_quote(KEY_COLUMN)} = ?",
+                    [row[SETTINGS_COLUMN], result_key(row), row[KEY_COLUMN]],
+                )
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+
+
+def _ensure_columns(connection: sqlite3.Connection, columns: List[str]) -> None:
+    """Add any missing columns to the results table."""
+    existing = {row[1] for row in connection.execute(f"PRAGMA table_info({TABLE})")}
+    for column in columns:
+        if column not in existing:
+            connection.execute(f"ALTER TABLE {TABLE} ADD COLUMN {_quote(column)}")
+
+
+def upsert_results(
+    rows: List[Dict[str, Any]], db_path: Optional[str] = None, replace: bool = False
+) -> None:
+    """
+    Insert results rows, replacing existing rows with the same key.
+
+    New columns are added to the table on the fly, so the store follows the results
+    record as it grows. All rows are written in a single transaction.
+
+    Parameters
+    ----------
+    rows : List[Dict[str, Any]]
+        The results rows
+    db_path : Optional[str], optional
+        Path to the SQLite database, by default default_store_path()
+    replace : bool, optional
+        Whether to set the columns a row does not hold to NULL, by default False (an
+        existing row keeps them). Rows of partial runs use this, so no values of an
+        earlier run with the same key are left in them
+    """
+    connection = connect(db_path)
+    try:
+        with connection:
+            for row in rows:
+                record = {KEY_COLUMN: result_key(row), **row}
+                _ensure_columns(connection, list(record))
+                if replace:
+                    for column in connection.execute(f"PRAGMA table_info({TABLE})"):
+                        record.setdefault(column[1], None)
+                columns = list(record)
+                column_sql = ", ".join(_quote(column) for column in columns)
+                placeholders = ", ".join("?" for _ in columns)
+                updates = ", ".join(
+                    f"{_quote(column)} = excluded.{_quote(column)}"
+                    for column in columns
+                    if column != KEY_COLUMN
+                )
+                connection.execute(
+                    f"INSERT INTO {TABLE} ({column_sql}) VALUES ({placeholders}) "
+                    f"ON CONFLICT({_quote(KEY_COLUMN)}) DO UPDATE SET {updates}",
+                    [_to_sql_value(record[column]) for column in columns],
+                )
+    finally:
+        connection.close()
+
+
+def upsert_result(
+    row: Dict[str, Any], db_path: Optional[str] = None, replace: bool = False
+) -> None:
+    """
+    Insert a results row, replacing an existing row with the same key.
+
+    Parameters
+    ----------
+    row : Dict[str, Any]
+        The results row
+    db_path : Optional[str], optional
+        Path to the SQLite database, by default default_store_path()
+    replace : bool, optional
+        Whether to set the columns the row does not hold to NULL, by default False
+    """
+    upsert_results([row], db_path, replace)
+
+
+def update_results(
+    match: Dict[str, Any], values: Dict[str, Any], db_path: Optional[str] = None
+) -> int:
+    """
+    Update columns of all rows matching the given column values.
+
+    Parameters
+    ----------
+    match : Dict[str, Any]
+        Column values a row must have to be updated
+    values : Dict[str, Any]
+        New column values
+    db_path : Optional[str], optional
+        Path to the SQLite database, by default default_store_path()
+
+    Returns
+    -------
+    int
+        Number of updated rows
+    """
+    connection = connect(db_path)
+    try:
+        with connection:
+            _ensure_columns(connection, list(match) + list(values))
+            assignments = ", ".join(f"{_quote(column)} = ?" for column in values)
+            conditions = " AND ".join(f"{_quote(column)} IS ?" for column in match)
+            cursor = connection.execute(
+                f"UPDATE {TABLE} SET {assignments} WHERE {conditions}",
+                [_to_sql_value(value) for value in [*values.values(), *match.values()]],
+            )
+            return cursor.rowcount
+    finally:
+        connection.close()
+
+
+def get_result(row: Dict[str, Any], db_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Read the stored row with the key of a given row.
+
+    Parameters
+    ----------
+    row : Dict[str, Any]
+        Values of all KEY_COLUMNS
+    db_path : Optional[str], optional
+        Path to the SQLite database, by default default_store_path()
+
+    Returns
+    -------
+    Optional[Dict[str, Any]]
+        The stored row without the key column, or None if there is none
+    """
+    connection = connect(db_path)
+    try:
+        cursor = connection.execute(
+            f"SELECT * FROM {TABLE} WHERE {_quote(KEY_COLUMN)} = ?", [result_key(row)]
+        )
+        values = cursor.fetchone()
+        columns = [description[0] for description in cursor.description]
+    finally:
+        connection.close()
+    if values is None:
+        return None
+    stored = dict(zip(columns, values))
+    stored.pop(KEY_COLUMN)
+    return stored
+
+
+def min_value(column: str, match: Dict[str, Any], db_path: Optional[str] = None) -> Optional[float]:
+    """
+    Smallest non-null value of a column over the rows matching the given column values.
+
+    Parameters
+    ----------
+    column : str
+        Column to minimize over
+    match : Dict[str, Any]
+        Column values a row must have; a list or tuple matches any of its values
+    db_path : Optional[str], optional
+        Path to the SQLite database, by default default_store_path()
+
+    Returns
+    -------
+    Optional[float]
+        The smallest value, or None if no matching row has one
+    """
+    connection = connect(db_path)
+    try:
+        _ensure_columns(connection, [column, *match])
+        conditions = [f"{_quote(column)} IS NOT NULL"]
+        parameters: List[Any] = []
+        for name, value in match.items():
+            if isinstance(value, (list, tuple)):
+                placeholders = ", ".join("?" for _ in value)
+                conditions.append(f"{_quote(name)} IN ({placeholders})")
+                parameters.extend(_to_sql_value(v) for v in value)
+            else:
+                conditions.append(f"{_quote(name)} IS ?")
+                parameters.append(_to_sql_value(value))
+        row = connection.execute(
+            f"SELECT MIN({_quote(column)}) FROM {TABLE} WHERE {' AND '.join(conditions)}",
+            parameters,
+        ).fetchone()
+    finally:
+        connection.close()
+    return row[0] if row is not None else None
+
+
+def read_results(db_path: Optional[str] = None) -> pd.DataFrame:
+    """
+    Read all results into a DataFrame.
+
+    Parameters
+    ----------
+    db_path : Optional[str], optional
+        Path to the SQLite database, by default default_store_path()
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per result with the same columns as the legacy results workbook
+    """
+    connection = connect(db_path)
+    try:
+        df = pd.read_sql_query(f"SELECT * FROM {TABLE}", connection)
+    finally:
+        connection.close()
+    return df.drop(columns=[KEY_COLUMN])
+
+
+def export_to_excel(db_path: Optional[str] = None, excel_path: Optional[str] = None) -> str:
+    """
+    Export the results store to an Excel workbook.
+
+    Parameters
+    ----------
+    db_path : Optional[str], optional
+        Path to the SQLite database, by default default_store_path()
+    excel_path : Optional[str], optional
+        Path of the workbook to write, by default default_excel_path()
+
+    Returns
+    -------
+    str
+        Path to the written workbook
+    """
+    if excel_path is None:
+        excel_path = default_excel_path()
+
+    df = read_results(db_path)
+    df.to_excel(excel_path, index=False)
+    print(f"Exported {len(df)} results to {excel_path}")
+    return excel_path
+
+
+def import_from_excel(excel_path: str, db_path: Optional[str] = None) -> int:
+    """
+    Load the rows of a legacy results workbook into the store.
+
+    Rows with the same key overwrite each other, so the latest run of a job wins. Rows
+    of workbooks written before the settings were keyed get the settings of their
+    legacy columns, as the store migration gives them.
+
+    Parameters
+    ----------
+    excel_path : str
+        Path to the workbook
+    db_path : Optional[str], optional
+        Path to the SQLite database, by default default_store_path()
+
+    Returns
+    -------
+    int
+        Number of imported rows
+    """
+    df = pd.read_excel(excel_path)
+    df = df.astype(object).where(pd.notna(df), None)
+    rows = df.to_dict(orient="records")
+    for row in rows:
+        if row.get(SETTINGS_COLUMN) is None:
+            row[SETTINGS_COLUMN] = _legacy_settings(row)
+    upsert_results(rows, db_path)
+    print(f"Imported {len(df)} rows from {excel_path}")
+    return len(df)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the results store")
+    parser.add_argument(
+        "--export",
+        action="store_true",
+        help="Export the store to data/results.xlsx",
+    )
+    parser.add_argument(
+        "--import-excel",
+        type=str,
+        default=None,
+        help="Import the rows of an existing results workbook into the store",
+    )
+
+    args = parser.parse_args()
+
+    if args.import_excel is not None:
+        import_from_excel(args.import_excel)
+    if args.export:
+        export_to_excel()
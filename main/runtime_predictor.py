@@ -0,0 +1,297 @@
+import math
+import os
+from typing import Any, Dict, List, Optional
+
+import instances
+import jobs
+import numpy as np
+import pandas as pd
+import results_store
+
+# Statuses of runs stopped before they finished; their duration is a lower bound on the
+# runtime (right-censored)
+CENSORED_STATUSES = ["maxTimeLimit", "timeout", "cancelled"]
+
+# Statuses of runs whose duration says nothing about the runtime
+EXCLUDED_STATUSES = ["failed", "crashed", "out_of_memory", "not proven"]
+
+# Fewest usable results rows to fit a predictor from
+MIN_TRAINING_ROWS = 20
+
+# Ridge penalty on all coefficients but the intercept
+RIDGE_PENALTY = 1e-2
+
+# Iterations of the censored-regression EM
+EM_ITERATIONS = 20
+
+# Shortest runtime the predictor is fitted to, in seconds (log of zero durations)
+MIN_RUNTIME = 0.01
+
+# Time limit of jobs predicted to time out, as a fraction of their limit (see plan_jobs)
+SHORTENED_FRACTION = 0.25
+
+
+def _normal_cdf(z: np.ndarray) -> np.ndarray:
+    return 0.5 * (1.0 + np.vectorize(math.erf)(z / math.sqrt(2.0)))
+
+
+def _normal_pdf(z: np.ndarray) -> np.ndarray:
+    return np.exp(-0.5 * z**2) / math.sqrt(2.0 * math.pi)
+
+
+def _features(
+    predictor: Dict[str, Any],
+    n_dimensions: np.ndarray,
+    n_clusters: np.ndarray,
+    n_points: np.ndarray,
+    strategies: List[str],
+    solvers: List[str],
+) -> np.ndarray:
+    """Design matrix: size terms plus one-hot strategies and solvers (zero if unknown)."""
+    log_d, log_k, log_n = (
+        np.log(np.asarray(v, dtype=float)) for v in (n_dimensions, n_clusters, n_points)
+    )
+    columns = [np.ones_like(log_d), log_d, log_k, log_n, log_k * log_n, log_d * log_n]
+    for category, values in (("strategies", strategies), ("solvers", solvers)):
+        for known in predictor[category]:
+            columns.append(np.array([value == known for value in values], dtype=float))
+    return np.column_stack(columns)
+
+
+def training_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Select the results rows a predictor can be fitted to.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Results as returned by results_store.read_results
+
+    Returns
+    -------
+    pd.DataFrame
+        Original-problem rows with instance sizes and a duration, without portfolio
+        summaries and runs that failed; the column "Censored" marks rows whose run was
+        stopped before it finished
+    """
+    required = ["n_dimensions", "n_clusters", "n_points", "Duration (sec)", "Status"]
+    if df.empty or any(column not in df.columns for column in required):
+        return df.iloc[0:0]
+    rows = df[
+        (df["Problem Type"] == "Original")
+        & (df["Strategy"] != "portfolio")
+        & ~df["Status"].isin(EXCLUDED_STATUSES)
+    ].dropna(subset=required)
+    rows = rows.assign(Censored=rows["Status"].isin(CENSORED_STATUSES))
+    return rows
+
+
+def fit(df: Optional[pd.DataFrame] = None) -> Optional[Dict[str, Any]]:
+    """
+    Fit a log-normal runtime model to the recorded results.
+
+    The log runtime is regressed (ridge) on the log numbers of dimensions, clusters and
+    points, two interactions, and one-hot strategies and solver configurations. Runs
+    stopped at their time limit only tell that the runtime exceeds their duration; they
+    are fitted by EM for censored normal regression, each iteration replacing their log
+    runtime by its expected value above the duration under the current fit.
+
+    Parameters
+    ----------
+    df : Optional[pd.DataFrame], optional
+        Results to fit to, by default everything in the results store
+
+    Returns
+    -------
+    Optional[Dict[str, Any]]
+        The predictor (coefficients, known strategies and solvers, residual standard
+        deviation, number of rows), or None if there are fewer than MIN_TRAINING_ROWS
+        usable rows
+    """
+    if df is None:
+        df = results_store.read_results()
+    rows = training_rows(df)
+    if len(rows) < MIN_TRAINING_ROWS:
+        print(f"Runtime predictor: only {len(rows)} usable results, not fitted")
+        return None
+
+    solvers = [
+        jobs.solver_label(solver, None if subsolver == "None" else subsolver)
+        for solver, subsolver in zip(rows["Solver"], rows["Subsolver"])
+    ]
+    predictor: Dict[str, Any] = {
+        "strategies": sorted(rows["Strategy"].unique()),
+        "solvers": sorted(set(solvers)),
+    }
+    X = _features(
+        predictor,
+        rows["n_dimensions"].to_numpy(),
+        rows["n_clusters"].to_numpy(),
+        rows["n_points"].to_numpy(),
+        list(rows["Strategy"]),
+        solvers,
+    )
+    observed = np.log(np.maximum(rows["Duration (sec)"].to_numpy(dtype=float), MIN_RUNTIME))
+    censored = rows["Censored"].to_numpy(dtype=bool)
+
+    penalty = RIDGE_PENALTY * np.eye(X.shape[1])
+    penalty[0, 0] = 0.0
+    y = observed.copy()
+    variance = np.zeros_like(y)
+    coef = np.linalg.solve(X.T @ X + penalty, X.T @ y)
+    sigma = max(float(np.std(y - X @ coef)), 1e-3)
+    for _ in range(EM_ITERATIONS if censored.any() else 0):
+        # E-step: mean and variance of the log runtime beyond the censoring point
+        mean = X @ coef
+        z = (observed[censored] - mean[censored]) / sigma
+        ratio = _normal_pdf(z) / np.maximum(1.0 - _normal_cdf(z), 1e-12)
+        y[censored] = mean[censored] + sigma * ratio
+        variance[censored] = sigma**2 * np.maximum(1.0 + z * ratio - ratio**2, 0.0)
+        # M-step
+        coef = np.linalg.solve(X.T @ X + penalty, X.T @ y)
+        sigma = max(math.sqrt(float(np.mean((y - X @ coef) ** 2 + variance))), 1e-3)
+
+    predictor.update({"coef": coef, "sigma": sigma, "n_rows": len(rows)})
+    print(
+        f"Runtime predictor: fitted to {len(rows)} results ({int(censored.sum())} censored), "
+        f"log-runtime residual std {sigma:.2f}"
+    )
+    return predictor
+
+
+def predict(
+    predictor: Dict[str, Any],
+    n_dimensions: int,
+    n_clusters: int,
+    n_points: int,
+    strategy: str,
+    solver: str,
+    subsolver: Optional[str],
+    time_limit: float,
+) -> Dict[str, float]:
+    """
+    Predict the runtime of a solve and the probability that it exceeds its time limit.
+
+    Parameters
+    ----------
+    predictor : Dict[str, Any]
+        A predictor from fit
+    n_dimensions : int
+        Number of dimensions
+    n_clusters : int
+        Number of clusters
+    n_points : int
+        Number of points
+    strategy : str
+        Reformulation strategy
+    solver : str
+        The main solver
+    subsolver : Optional[str]
+        The subsolver, if any
+    time_limit : float
+        Time limit in seconds
+
+    Returns
+    -------
+    Dict[str, float]
+        "runtime": median predicted runtime in seconds, and "timeout_probability"
+    """
+    X = _features(
+        predictor,
+        np.array([n_dimensions]),
+        np.array([n_clusters]),
+        np.array([n_points]),
+        [strategy],
+        [jobs.solver_label(solver, subsolver)],
+    )
+    mean = float((X @ predictor["coef"])[0])
+    z = (math.log(max(time_limit, MIN_RUNTIME)) - mean) / predictor["sigma"]
+    return {
+        "runtime": math.exp(mean),
+        "timeout_probability": 1.0 - float(_normal_cdf(np.array([z]))[0]),
+    }
+
+
+def plan_jobs(
+    batch_jobs: List[Dict[str, Any]],
+    predictor: Dict[str, Any],
+    models_dir: str,
+    predicted_timeouts: str = "run",
+    timeout_threshold: float = 0.9,
+) -> List[Dict[str, Any]]:
+    """
+    Order jobs longest-first by predicted runtime, and treat predicted timeouts.
+
+    Longest-first keeps long jobs from starting last and leaving the other cores idle.
+    Jobs whose instance cannot be read keep their relative order after the others.
+
+    Parameters
+    ----------
+    batch_jobs : List[Dict[str, Any]]
+        Jobs created by jobs.expand_jobs
+    predictor : Dict[str, Any]
+        A predictor from fit
+    models_dir : str
+        Directory of the instance manifests
+    predicted_timeouts : str, optional
+        What to do with jobs whose timeout probability is at least timeout_threshold:
+        "run" them as they are (default), "skip" them, or "shorten" their time limit to
+        SHORTENED_FRACTION of it (the shortened runs still give bounds; their job ids
+        carry the shortened limit, so a resumed batch checks those against its ledger)
+    timeout_threshold : float, optional
+        Timeout probability from which a job counts as predicted to time out, by
+        default 0.9
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        The jobs to run, in the planned order
+    """
+    if predicted_timeouts not in ("run", "skip", "shorten"):
+        raise ValueError(f"Unknown treatment of predicted timeouts: {predicted_timeouts}")
+
+    sizes: Dict[str, Optional[Dict[str, Any]]] = {}
+    predicted = []
+    unknown = []
+    n_skipped = n_shortened = 0
+    for job in batch_jobs:
+        model_name = job["model_name"]
+        if model_name not in sizes:
+            sizes[model_name] = None
+            if instances.is_manifest(model_name):
+                try:
+                    sizes[model_name] = instances.load_instance(
+                        os.path.join(models_dir, model_name)
+                    )
+                except Exception as e:
+                    print(f"Warning: Could not read instance {model_name}: {str(e)}")
+        instance = sizes[model_name]
+        if instance is None:
+            unknown.append(job)
+            continue
+
+        prediction = predict(
+            predictor,
+            instance["n_dimensions"],
+            instance["n_clusters"],
+            instance["n_points"],
+            job["strategy"],
+            job["solver"],
+            job["subsolver"],
+            job["time_limit"],
+        )
+        if prediction["timeout_probability"] >= timeout_threshold:
+            if predicted_timeouts == "skip":
+                n_skipped += 1
+                continue
+            if predicted_timeouts == "shorten":
+                job = {**job, "time_limit": max(1, int(job["time_limit"] * SHORTENED_FRACTION))}
+                n_shortened += 1
+        predicted.append((min(prediction["runtime"], job["time_limit"]), job))
+
+    predicted.sort(key=lambda item: item[0], reverse=True)
+    print(
+        f"Runtime predictor: ordered {len(predicted)} jobs longest-first "
+        f"({len(unknown)} without prediction, {n_skipped} skipped, {n_shortened} shortened)"
+    )
+    return [job for _, job in predicted] + unknown
@@ -1,15 +1,20 @@
-import io
 import json
 import os
-import re
 import time
-from contextlib import redirect_stdout
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
 
+import branch_and_bound
 import dill as pickle
+import direct
+import gams_replay
+import instances
 import k_means
-import pandas as pd
+import log_capture
+import log_parser
+import model_cache
+import phase_timing
+import presolve as presolve_module
 import pyomo.environ as pyo
 import pyomo.gdp.plugins.hull_exact
 import pyomo.gdp.plugins.hull_exact_conic
@@ -22,6 +27,12 @@ import pyomo.gdp.plugins.hull_exact_conic_no_cholesky
 import pyomo.gdp.plugins.hull_reduced_y
 import pyomo.gdp.plugins.hull_exact_extra_var
 import pyomo.gdp.plugins.hull_exact_extra_var_inequal
+import results_store
+import solver_session
+import symmetry
+import template as template_module
+import trajectory
+import warm_start as warm_start_module
 
 possible_modes = ["approximation", "exact", "reduced_power_y", "no_mode"]
 
@@ -65,6 +76,25 @@ TOLS = {
     "int": 1e-5,
 }
 
+# Relative slack added to an upper bound used as objective cutoff, so that the solution
+# the bound came from is not cut off itself
+CUTOFF_TOLERANCE = 1e-4
+
+# Statuses of recorded runs whose objective value belongs to a feasible solution
+FEASIBLE_STATUSES = ["optimal", "locallyOptimal", "feasible", "maxTimeLimit"]
+
+
+def tolerance_key() -> str:
+    """
+    Identify the solver tolerances results were obtained with.
+
+    Returns
+    -------
+    str
+        TOLS as JSON with sorted keys, as recorded in the "Tolerances" results column
+    """
+    return json.dumps(TOLS, sort_keys=True)
+
 
 def save_model(model: pyo.ConcreteModel, directory: str, filename: str = "model.pkl") -> str:
     """
@@ -136,239 +166,23 @@ def parse_root_relaxation(
     Optional[float]
         The root relaxation objective value if found, None otherwise
     """
-    if not os.path.exists(output_log_path):
-        print(f"Warning: Output log file not found at {output_log_path}")
-        return None
-
     try:
-        with open(output_log_path, "r") as f:
-            log_content = f.read()
-
-        # Check if this is BARON output (through GAMS)
-        if solver.lower() == "gams" and subsolver and subsolver.lower() == "baron":
-            # For BARON, find the first iteration table and its first row
-            header_match = re.search(
-                r"Iteration\s+Time[^\\n]*Lower bound\s+Upper bound\s+Progress", log_content
-            )
-
-            if header_match:
-                header_end = header_match.end()
-                post_header = log_content[header_end:]
-                lines = post_header.strip().split("\n")
-
-                for line in lines:
-                    line = line.strip()
-                    if not line or line.startswith("==="):
-                        continue
-
-                    match = re.search(
-                        r"\s*\S+\s+\S+\s+\S+\s+([-+]?\d*\.\d+(?:[eE][-+]?\d+)?)\s+", line
-                    )
-                    if match:
-                        lower_bound = float(match.group(1))
-                        print(f"Found BARON root relaxation (lower bound): {lower_bound}")
-                        return lower_bound
-
-                    parts = line.split()
-                    if len(parts) >= 5:
-                        try:
-                            lower_bound = float(parts[3])
-                            print(
-                                f"Found BARON root relaxation \
-                                    (lower bound from column): {lower_bound}"
-                            )
-                            return lower_bound
-                        except ValueError:
-                            numeric_parts = []
-                            for part in parts:
-                                try:
-                                    value = float(part)
-                                    numeric_parts.append(value)
-                                except ValueError:
-                                    pass
-
-                            if len(numeric_parts) >= 3:
-                                lower_bound = numeric_parts[2]
-                                print(
-                                    f"Found BARON root relaxation \
-                                        (lower bound from numeric extraction): {lower_bound}"
-                                )
-                                return lower_bound
-
-            # Check for "Problem solved during preprocessing" case
-            preprocessing_match = re.search(r"Problem solved during preprocessing", log_content)
-            if preprocessing_match:
-                best_possible_match = re.search(
-                    r"Best possible = ([-+]?\d*\.\d+(?:[eE][-+]?\d+)?)", log_content
-                )
-                if best_possible_match:
-                    best_possible = float(best_possible_match.group(1))
-                    print(f"Found BARON root relaxation (preprocessing): {best_possible}")
-                    return best_possible
-
-                lower_bound_match = re.search(
-                    r"Lower bound is\s+([-+]?\d*\.\d+(?:[eE][-+]?\d+)?)", log_content
-                )
-                if lower_bound_match:
-                    lower_bound = float(lower_bound_match.group(1))
-                    print(f"Found BARON root relaxation (lower bound): {lower_bound}")
-                    return lower_bound
-
-            print("BARON root relaxation value not found in output log")
-            return None
-        elif solver.lower() == "gams" and subsolver and subsolver.lower() == "ipopth":
-            # For IPOPT through GAMS
-            objective_match = re.search(
-                r"Objective\s*\.\.\.\s*([-+]?\d*\.\d+(?:[eE][-+]?\d+)?)", log_content
-            )
-            if objective_match:
-                objective_value = float(objective_match.group(1))
-                print(f"Found IPOPT objective value: {objective_value}")
-                return objective_value
-
-            ipopt_f_match = re.search(
-                r"IPOPT\s+\d+\s+\d+\.\d+\s+\d+\.\d+\s+f\s+" r"([-+]?\d*\.\d+(?:[eE][-+]?\d+)?)",
-                log_content,
-            )
-            if ipopt_f_match:
-                f_value = float(ipopt_f_match.group(1))
-                print(f"Found IPOPT f value: {f_value}")
-                return f_value
-
-            ipopt_lines = re.findall(r"IPOPT.*", log_content)
-            if ipopt_lines:
-                last_ipopt_line = ipopt_lines[-1]
-                numeric_values = re.findall(r"[-+]?\d*\.\d+(?:[eE][-+]?\d+)?", last_ipopt_line)
-                if numeric_values:
-                    if len(numeric_values) >= 2:
-                        obj_value = float(numeric_values[-2])
-                        print(f"Found IPOPT objective value from iteration table: {obj_value}")
-                        return obj_value
-                    elif len(numeric_values) == 1:
-                        obj_value = float(numeric_values[0])
-                        print(f"Found single IPOPT numeric value: {obj_value}")
-                        return obj_value
-
-            print("IPOPT root relaxation value not found in output log")
-            return None
-        elif (
-            solver.lower() == "scip"
-            or (solver.lower() == "gams" and subsolver and subsolver.lower() == "scip")
-            or (solver.lower() == "gams" and subsolver and subsolver.lower() == "scip_convex")
-        ):
-            # For SCIP
-            trivial_preprocessing = re.search(
-                r"problem is solved by trivial preprocessing", log_content
-            )
-            if trivial_preprocessing:
-                obj_value_match = re.search(
-                    r"objective value\s*:\s*([-+]?\d*\.\d+(?:[eE][-+]?\d+)?)", log_content
-                )
-                if obj_value_match:
-                    obj_value = float(obj_value_match.group(1))
-                    print(f"Found SCIP root relaxation (trivial preprocessing): {obj_value}")
-                    return obj_value
-
-            lp_relax_match = re.search(
-                r"LP0\s+\(\d+r,\s*\d+c\)\s*:\s*(?:opt\.|infeas\.|unbounded)\s*\[([-+]?\d*\.\d+(?:[eE][-+]?\d+)?)",
-                log_content,
-            )
-            if lp_relax_match:
-                lp_value = float(lp_relax_match.group(1))
-                print(f"Found SCIP root relaxation (LP0): {lp_value}")
-                return lp_value
-
-            dual_bound_match = re.search(
-                r"root node[\s\S]*?dual bound\s*:\s*([-+]?\d*\.\d+(?:[eE][-+]?\d+)?)", log_content
-            )
-            if dual_bound_match:
-                dual_bound = float(dual_bound_match.group(1))
-                print(f"Found SCIP root relaxation (dual bound): {dual_bound}")
-                return dual_bound
-
-            dual_bound_summary_match = re.search(
-                r"Dual Bound\s*:\s*([-+]?\d*\.\d+(?:[eE][-+]?\d+)?)", log_content
-            )
-            if dual_bound_summary_match:
-                dual_bound = float(dual_bound_summary_match.group(1))
-                print(f"Found SCIP root relaxation (dual bound summary): {dual_bound}")
-                return dual_bound
-
-            print("SCIP root relaxation not found in log")
-            return None
-        else:
-            # For Gurobi, try multiple patterns
-            match = re.search(
-                r"Root relaxation: objective\s+([-+]?\d*\.\d+(?:[eE][-+]?\d+)?)", log_content
-            )
-            if match:
-                root_relaxation_value = float(match.group(1))
-                print(f"Found Gurobi root relaxation (standard): {root_relaxation_value}")
-                return root_relaxation_value
-
-            cutoff_match = re.search(r"Root relaxation: cutoff", log_content)
-            if cutoff_match:
-                nodes_table_match = re.search(
-                    r"Nodes\s+\|\s+Current Node\s+\|\s+Objective Bounds", log_content
-                )
-                if nodes_table_match:
-                    table_end = nodes_table_match.end()
-                    table_content = log_content[table_end:]
-                    lines = table_content.strip().split("\n")
-
-                    for line in lines:
-                        if re.search(r"^\s+\d+\s+\d+", line):
-                            bd_match = re.search(
-                                r"\|\s+.*?\s+.*?\s+\|\s+.*?\s+([-+]?\d*\.\d+(?:[eE][-+]?\d+)?)\s+",
-                                line,
-                            )
-                            if bd_match:
-                                bound_value = float(bd_match.group(1))
-                                print(
-                                    f"Found Gurobi root relaxation \
-                                        (cutoff table regex): {bound_value}"
-                                )
-                                return bound_value
-
-                            values = []
-                            for part in line.split():
-                                try:
-                                    values.append(float(part))
-                                except ValueError:
-                                    pass
-
-                            if len(values) >= 2:
-                                bound_value = values[-2]
-                                print(f"Found Gurobi root relaxation (cutoff table): {bound_value}")
-                                return bound_value
-                            break
-
-            single_node_match = re.search(r"Explored \d+ nodes?", log_content)
-            best_bound_match = re.search(
-                r"[Bb]est bound ([-+]?\d*\.\d+(?:[eE][-+]?\d+)?)", log_content
-            )
-
-            if single_node_match and best_bound_match:
-                bound_value = float(best_bound_match.group(1))
-                print(f"Found Gurobi root relaxation (best bound): {bound_value}")
-                return bound_value
-
-            gap_line_match = re.search(
-                r"[Bb]est objective [-+]?\d*\.\d+(?:[eE][-+]?\d+)?,"
-                + r" best bound ([-+]?\d*\.\d+(?:[eE][-+]?\d+)?)",
-                log_content,
-            )
-
-            if gap_line_match:
-                bound_value = float(gap_line_match.group(1))
-                print(f"Found Gurobi root relaxation (from gap line): {bound_value}")
-                return bound_value
-
-            print("Gurobi root relaxation not found in log")
-            return None
+        summary = log_parser.parse_log(output_log_path, solver, subsolver)
     except Exception as e:
         print(f"Error parsing output log: {str(e)}")
         return None
+    if summary is None:
+        return None
+
+    family = summary["solver_family"]
+    if summary["root_relaxation"] is None:
+        print(f"{family} root relaxation not found in log")
+    else:
+        print(
+            f"Found {family} root relaxation ({summary['root_relaxation_source']}): "
+            f"{summary['root_relaxation']}"
+        )
+    return summary["root_relaxation"]
 
 
 def parse_solver_bounds(
@@ -391,98 +205,21 @@ def parse_solver_bounds(
     Tuple[Optional[float], Optional[float]]
         A tuple of (lower_bound, upper_bound)
     """
-    if not os.path.exists(output_log_path):
-        print(f"Warning: Output log file not found at {output_log_path}")
-        return None, None
-
     try:
-        with open(output_log_path, "r") as f:
-            log_content = f.read()
-
-        lower_bound = None
-        upper_bound = None
-
-        # Handle GAMS with Gurobi subsolver
-        if solver.lower() == "gams" and subsolver and subsolver.lower() == "gurobi":
-            # Pattern: "Best objective X.XXXe+XX, best bound Y.YYYe+YY, gap Z.ZZ%"
-            gap_line_match = re.search(
-                r"[Bb]est objective\s+([-+]?\d*\.?\d+(?:[eE][-+]?\d+)?),\s*"
-                r"best bound\s+([-+]?\d*\.?\d+(?:[eE][-+]?\d+)?)",
-                log_content,
-            )
-            if gap_line_match:
-                upper_bound = float(gap_line_match.group(1))
-                lower_bound = float(gap_line_match.group(2))
-                print(f"Parsed bounds from Gurobi output: lower={lower_bound}, upper={upper_bound}")
-                return lower_bound, upper_bound
-
-            explored_match = re.search(
-                r"Explored \d+ nodes.*best objective\s+([-+]?\d*\.?\d+(?:[eE][-+]?\d+)?),\s*"
-                r"best bound\s+([-+]?\d*\.?\d+(?:[eE][-+]?\d+)?)",
-                log_content,
-                re.IGNORECASE,
-            )
-            if explored_match:
-                upper_bound = float(explored_match.group(1))
-                lower_bound = float(explored_match.group(2))
-                print(
-                    f"Parsed bounds from Gurobi explored line:\
-                         lower={lower_bound}, upper={upper_bound}"
-                )
-                return lower_bound, upper_bound
-
-        # Handle GAMS with BARON subsolver
-        elif solver.lower() == "gams" and subsolver and subsolver.lower() == "baron":
-            best_possible_match = re.search(
-                r"Best possible\s*=\s*([-+]?\d*\.?\d+(?:[eE][-+]?\d+)?)", log_content
-            )
-            best_solution_match = re.search(
-                r"Best solution\s*=\s*([-+]?\d*\.?\d+(?:[eE][-+]?\d+)?)", log_content
-            )
-            if best_possible_match:
-                lower_bound = float(best_possible_match.group(1))
-            if best_solution_match:
-                upper_bound = float(best_solution_match.group(1))
-            if lower_bound is not None or upper_bound is not None:
-                print(f"Parsed bounds from BARON output: lower={lower_bound}, upper={upper_bound}")
-                return lower_bound, upper_bound
-
-        # Handle direct Gurobi
-        elif solver.lower() == "gurobi":
-            gap_line_match = re.search(
-                r"[Bb]est objective\s+([-+]?\d*\.?\d+(?:[eE][-+]?\d+)?),\s*"
-                r"best bound\s+([-+]?\d*\.?\d+(?:[eE][-+]?\d+)?)",
-                log_content,
-            )
-            if gap_line_match:
-                upper_bound = float(gap_line_match.group(1))
-                lower_bound = float(gap_line_match.group(2))
-                print(f"Parsed bounds from Gurobi output: lower={lower_bound}, upper={upper_bound}")
-                return lower_bound, upper_bound
-
-        # Handle SCIP
-        elif solver.lower() == "scip" or (
-            solver.lower() == "gams" and subsolver and "scip" in subsolver.lower()
-        ):
-            dual_bound_match = re.search(
-                r"Dual Bound\s*:\s*([-+]?\d*\.?\d+(?:[eE][-+]?\d+)?)", log_content
-            )
-            primal_bound_match = re.search(
-                r"Primal Bound\s*:\s*([-+]?\d*\.?\d+(?:[eE][-+]?\d+)?)", log_content
-            )
-            if dual_bound_match:
-                lower_bound = float(dual_bound_match.group(1))
-            if primal_bound_match:
-                upper_bound = float(primal_bound_match.group(1))
-            if lower_bound is not None or upper_bound is not None:
-                print(f"Parsed bounds from SCIP output: lower={lower_bound}, upper={upper_bound}")
-                return lower_bound, upper_bound
-
-        return lower_bound, upper_bound
-
+        summary = log_parser.parse_log(output_log_path, solver, subsolver)
     except Exception as e:
         print(f"Error parsing solver bounds: {str(e)}")
         return None, None
+    if summary is None:
+        return None, None
+
+    lower_bound, upper_bound = summary["lower_bound"], summary["upper_bound"]
+    if lower_bound is not None or upper_bound is not None:
+        print(
+            f"Parsed bounds from {summary['solver_family']} output: "
+            f"lower={lower_bound}, upper={upper_bound}"
+        )
+    return lower_bound, upper_bound
 
 
 def calculate_root_relaxation_gap(
@@ -532,6 +269,16 @@ def save_results(
     absolute_gap: Optional[float] = None,
     root_relaxation_value: Optional[float] = None,
     results_cache: Optional[Dict] = None,
+    time_limit: Optional[int] = None,
+    log_summary: Optional[Dict[str, Any]] = None,
+    trajectory_metrics: Optional[Dict[str, Any]] = None,
+    timings: Optional[Dict[str, float]] = None,
+    warm_start_objective: Optional[float] = None,
+    cutoff: Optional[float] = None,
+    bounds: Optional[str] = None,
+    symmetry_scheme: Optional[str] = None,
+    presolve_stats: Optional[Dict[str, int]] = None,
+    settings: Optional[str] = None,
 ) -> None:
     """
     Save model parameters, solution, and performance data to a JSON file.
@@ -568,6 +315,30 @@ def save_results(
         Root relaxation objective value from the solver output, by default None
     results_cache : Optional[Dict], optional
         Cache for storing results for gap calculation, by default None
+    time_limit : Optional[int], optional
+        Time limit the model was solved with, by default None
+    log_summary : Optional[Dict[str, Any]], optional
+        Values parsed from the solver logs by log_parser.parse_run_logs, by default None
+        (parse the logs in results_dir)
+    trajectory_metrics : Optional[Dict[str, Any]], optional
+        Primal, dual and primal-dual integrals from record_trajectory, by default None
+    timings : Optional[Dict[str, float]], optional
+        Seconds spent in each phase of solve_model (see phase_timing.PHASE_COLUMNS),
+        by default None
+    warm_start_objective : Optional[float], optional
+        Objective of the k-means++/Lloyd heuristic solution, by default None
+    cutoff : Optional[float], optional
+        Objective cutoff the problem was solved with, by default None
+    bounds : Optional[str], optional
+        Variable bounds the model was solved with (see k_means.BOUND_MODES), by default
+        None
+    symmetry_scheme : Optional[str], optional
+        Symmetry-breaking scheme of the model (see symmetry.SCHEMES), by default None
+    presolve_stats : Optional[Dict[str, int]], optional
+        Reductions of presolve.presolve, by default None (no presolve)
+    settings : Optional[str], optional
+        Solve settings of the run (see results_store.settings_key), by default the
+        defaults of solve_model
     """
     # Extract model parameters
     model_params = {
@@ -576,6 +347,7 @@ def save_results(
         "n_points": len(model.points),
         "coord_range_lower": model.coord_range_lower.value,
         "coord_range_upper": model.coord_range_upper.value,
+        "instance_hash": instances.data_hash(instances.instance_from_model(model)),
     }
 
     # Extract solution details
@@ -662,26 +434,14 @@ def save_results(
         if upper_bound is None and hasattr(result, "upper_bound"):
             upper_bound = result.upper_bound
 
-        # If bounds are still not found, try parsing from output log
+        # If bounds are still not found, take them from the solver logs
         if lower_bound is None or upper_bound is None:
-            output_log_path = os.path.join(results_dir, "output_log.txt")
-            parsed_lower, parsed_upper = parse_solver_bounds(output_log_path, solver, subsolver)
-            if lower_bound is None and parsed_lower is not None:
-                lower_bound = parsed_lower
-            if upper_bound is None and parsed_upper is not None:
-                upper_bound = parsed_upper
-
-        # For direct Gurobi, also try the dedicated Gurobi log file.
-        if lower_bound is None or upper_bound is None:
-            gurobi_log_path = os.path.join(results_dir, "gurobi_solver.log")
-            if os.path.exists(gurobi_log_path):
-                parsed_lower, parsed_upper = parse_solver_bounds(
-                    gurobi_log_path, "gurobi", None
-                )
-                if lower_bound is None and parsed_lower is not None:
-                    lower_bound = parsed_lower
-                if upper_bound is None and parsed_upper is not None:
-                    upper_bound = parsed_upper
+            if log_summary is None:
+                log_summary = log_parser.parse_run_logs(results_dir, solver, subsolver)
+            if lower_bound is None:
+                lower_bound = log_summary["lower_bound"]
+            if upper_bound is None:
+                upper_bound = log_summary["upper_bound"]
 
     except Exception as e:
         print(f"Warning: Could not extract bound from solver result: {str(e)}")
@@ -730,7 +490,18 @@ def save_results(
         "is_relaxation": is_relaxation,
         "root_relaxation_value": root_relaxation_value,
         "root_relaxation_gap_percent": root_relaxation_gap,
+        "time_limit": time_limit,
+        "nodes": log_summary["nodes"] if log_summary else None,
+        "log_status": log_summary["status"] if log_summary else None,
     }
+    performance.update(trajectory_metrics or {})
+    performance["phase_timings"] = timings
+    performance["warm_start_objective"] = warm_start_objective
+    performance["objective_cutoff"] = cutoff
+    performance["bounds"] = bounds
+    performance["symmetry_scheme"] = symmetry_scheme
+    performance["presolve"] = presolve_stats
+    performance["settings"] = settings if settings is not None else results_store.settings_key({})
 
     # Only add relaxation gaps to original model data
     if not is_relaxation:
@@ -772,8 +543,8 @@ def save_results(
         except Exception as e:
             print(f"Error reading relaxation data: {str(e)}")
 
-    # Save to Excel file
-    save_to_excel(
+    # Save to the results store
+    save_to_results_store(
         model_params,
         solution,
         performance,
@@ -789,10 +560,11 @@ def save_results(
         root_relaxation_value,
         root_relaxation_gap,
         results_cache=results_cache,
+        time_limit=time_limit,
     )
 
 
-def save_to_excel(
+def save_to_results_store(
     model_params: Dict[str, Any],
     solution: Dict[str, Any],
     performance: Dict[str, Any],
@@ -808,10 +580,15 @@ def save_to_excel(
     root_relaxation_value: Optional[float] = None,
     root_relaxation_gap: Optional[float] = None,
     results_cache: Optional[Dict] = None,
+    time_limit: Optional[int] = None,
 ) -> None:
     """
-    Save results to an Excel file, creating it if it doesn't exist.
-    Appends new data without deleting existing data.
+    Save results as one row of the results store.
+
+    Rows are upserted by (model, strategy, mode, solver, subsolver, problem type,
+    time limit, settings), so re-running a job with the same settings replaces its
+    previous row. Use
+    results_store.export_to_excel to get the results workbook.
 
     Parameters
     ----------
@@ -845,15 +622,9 @@ def save_to_excel(
         Relative gap between final objective and root relaxation (percentage), by default None
     results_cache : Optional[Dict], optional
         Cache for storing results for gap calculation, by default None
+    time_limit : Optional[int], optional
+        Time limit the model was solved with, by default None
     """
-    # Path to Excel file
-    excel_dir = os.path.join(os.path.dirname(os.getcwd()), "data")
-    excel_path = os.path.join(excel_dir, "results.xlsx")
-
-    # Ensure data directory exists
-    if not os.path.exists(excel_dir):
-        os.makedirs(excel_dir)
-
     # Prepare data for the new row
     run_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     current_time = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
@@ -863,7 +634,7 @@ def save_to_excel(
     if model_name is None:
         model_name = custom_filename
     if model_name is None:
-        model_name = f"model_{mode}_{current_time}.pkl"
+        model_name = f"model_{mode}_{current_time}{instances.MANIFEST_EXTENSION}"
 
     # Flatten center_coordinates into a single string if they exist
     center_coordinates_str = ""
@@ -882,6 +653,15 @@ def save_to_excel(
         distance_parts = [f"d{k}={v:.6f}" for k, v in distances.items()]
         distances_str = ", ".join(distance_parts)
 
+    # Presolve reductions, if the model was presolved
+    presolve_fixed = None
+    presolve_duplicates = None
+    if performance.get("presolve"):
+        presolve_fixed = (
+            performance["presolve"]["fixed_false"] + performance["presolve"]["fixed_true"]
+        )
+        presolve_duplicates = performance["presolve"]["duplicate_points"]
+
     # Check if we have more accurate gap data from cache
     if (
         results_cache
@@ -919,35 +699,38 @@ def save_to_excel(
         "Bound Relative Gap": solution["relative_gap"],
         "Root Relaxation Value": root_relaxation_value,
         "Root Relaxation Gap (%)": root_relaxation_gap,
+        "Nodes": performance.get("nodes"),
+        "Primal Integral": performance.get("primal_integral"),
+        "Dual Integral": performance.get("dual_integral"),
+        "Primal-Dual Integral": performance.get("primal_dual_integral"),
+        "Integral Reference": performance.get("integral_reference"),
+        "Warm Start Objective": performance.get("warm_start_objective"),
+        "Objective Cutoff": performance.get("objective_cutoff"),
+        "Bounds": performance.get("bounds"),
+        "Symmetry": performance.get("symmetry_scheme"),
+        "Presolve Fixed Disjuncts": presolve_fixed,
+        "Presolve Duplicate Points": presolve_duplicates,
+        **phase_timing.timing_columns(performance.get("phase_timings")),
         "Relative Gap (%)": relaxation_gap if relaxation_gap is not None else None,
         "Absolute Gap": absolute_gap if absolute_gap is not None else None,
         "Center Coordinates": center_coordinates_str,
         "Distances": distances_str,
         "Solver": solver,
         "Subsolver": subsolver if subsolver else "None",
+        "Time Limit": time_limit,
         # Model parameters
         "n_dimensions": model_params["n_dimensions"],
         "n_clusters": model_params["n_clusters"],
         "n_points": model_params["n_points"],
         "coord_range_lower": model_params["coord_range_lower"],
         "coord_range_upper": model_params["coord_range_upper"],
+        "Instance Hash": model_params.get("instance_hash"),
+        "Tolerances": tolerance_key(),
+        results_store.SETTINGS_COLUMN: performance["settings"],
     }
 
-    # Convert to DataFrame
-    df_new = pd.DataFrame([new_row])
-
-    # Check if file exists
-    if os.path.exists(excel_path):
-        # File exists, read it and append
-        df_existing = pd.read_excel(excel_path)
-        df_updated = pd.concat([df_existing, df_new], ignore_index=True)
-    else:
-        # File doesn't exist, create new
-        df_updated = df_new
-
-    # Save to Excel
-    df_updated.to_excel(excel_path, index=False)
-    print(f"Results appended to {excel_path}")
+    results_store.upsert_result(new_row)
+    print(f"Results saved to {results_store.default_store_path()}")
 
 
 def calculate_gaps(
@@ -984,6 +767,201 @@ def calculate_gaps(
     return abs_gap, rel_gap
 
 
+def record_trajectory(
+    trajectory_parser: trajectory.TrajectoryParser,
+    results_dir: str,
+    time_limit: Optional[float] = None,
+    best_known: Optional[float] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Save the incumbent/bound trajectory of a run and compute its integrals.
+
+    Direct Gurobi writes its log past Python's stdout, so if nothing was collected from
+    the output log the dedicated gurobi_solver.log is parsed instead. The integrals run
+    up to the time limit, so runs that stop early keep their final gap until then, and
+    the primal and dual integrals are measured against the best of the run's final
+    incumbent and best_known. The reference is returned as integral_reference.
+
+    Parameters
+    ----------
+    trajectory_parser : trajectory.TrajectoryParser
+        Parser that was attached to the output log
+    results_dir : str
+        Directory of the run
+    time_limit : Optional[float], optional
+        Time limit of the run, by default None (integrate up to the end of the run)
+    best_known : Optional[float], optional
+        Best objective value recorded for the problem by other runs, by default None
+
+    Returns
+    -------
+    Optional[Dict[str, Any]]
+        The trajectory.integrals of the run, or None if the log had no trajectory
+    """
+    try:
+        points = trajectory_parser.trajectory()
+        gurobi_log_path = os.path.join(results_dir, "gurobi_solver.log")
+        if len(points) == 0 and os.path.exists(gurobi_log_path):
+            trajectory_parser = trajectory.TrajectoryParser("gurobi")
+            log_parser.feed_file(gurobi_log_path, [trajectory_parser])
+            points = trajectory_parser.trajectory()
+        if len(points) == 0:
+            return None
+
+        trajectory.save_trajectory(results_dir, points)
+        known = [v for v in [best_known, trajectory.final_incumbent(points)] if v is not None]
+        reference = min(known) if known else None
+        metrics = trajectory.integrals(points, reference, time_limit)
+        print(
+            f"Primal integral: {metrics['primal_integral']:.4f}, "
+            f"dual integral: {metrics['dual_integral']:.4f}, "
+            f"primal-dual integral: {metrics['primal_dual_integral']:.4f} "
+            f"(reference {reference}, up to {metrics['integral_end_time']}s)"
+        )
+        return metrics
+    except Exception as e:
+        print(f"Warning: Could not record trajectory: {str(e)}")
+        return None
+
+
+def add_solve_timings(timings: Dict[str, float], log_summary: Dict[str, Any]) -> None:
+    """
+    Add the phases inside opt.solve, as reported by Pyomo in the solver log, to timings.
+
+    Parameters
+    ----------
+    timings : Dict[str, float]
+        Phase timings of the run
+    log_summary : Dict[str, Any]
+        Values parsed from the solver logs by log_parser.parse_run_logs
+    """
+    for key, phase in phase_timing.SOLVE_PHASES.items():
+        if log_summary.get(key) is not None:
+            timings[phase] = timings.get(phase, 0.0) + log_summary[key]
+
+
+def record_result_persistence(
+    results_dir: str, is_relaxation: bool, store_match: Dict[str, Any], seconds: float
+) -> None:
+    """
+    Add the time taken by save_results to the run's JSON file and results store row.
+
+    Parameters
+    ----------
+    results_dir : str
+        Directory of the run
+    is_relaxation : bool
+        Whether the run solved the relaxed model
+    store_match : Dict[str, Any]
+        Key columns of the run's row in the results store
+    seconds : float
+        Seconds spent saving the results
+    """
+    problem_type = "relaxation" if is_relaxation else "original"
+    results_file = os.path.join(results_dir, f"solution_data_{problem_type}.json")
+    try:
+        if os.path.exists(results_file):
+            with open(results_file, "r") as f:
+                data = json.load(f)
+            phase_timings = data["performance"].get("phase_timings") or {}
+            phase_timings["result_persistence"] = seconds
+            data["performance"]["phase_timings"] = phase_timings
+            with open(results_file, "w") as f:
+                json.dump(data, f, indent=2)
+
+        results_store.update_results(
+            store_match, {phase_timing.PHASE_COLUMNS["result_persistence"]: seconds}
+        )
+    except Exception as e:
+        print(f"Warning: Could not record result persistence time: {str(e)}")
+
+
+def apply_reformulation(model: pyo.ConcreteModel, strategy: str) -> None:
+    """
+    Apply a reformulation strategy to a model in place.
+
+    Parameters
+    ----------
+    model : pyo.ConcreteModel
+        The model to transform
+    strategy : str
+        The reformulation strategy, e.g. "gdp.bigm" or "gdp.hull_eps_1e-3". The
+        "direct.*" strategies emit the big-M and hull reformulations of the assignment
+        disjunctions without the GDP transformation (see direct.py).
+    """
+    if direct.is_direct(strategy):
+        direct.apply(model, strategy)
+        return
+
+    epsilon = None
+
+    if strategy.startswith("gdp.hull_eps"):
+        epsilon = float(strategy.split("_")[-1])
+
+    if strategy.startswith("gdp.hull") and epsilon is not None:
+        pyo.TransformationFactory("gdp.hull").apply_to(model, EPS=epsilon)
+    else:
+        pyo.TransformationFactory(strategy).apply_to(model)
+
+
+def recorded_upper_bound(
+    model_name: str, mode: str, problem_type: str = "Original"
+) -> Optional[float]:
+    """
+    Best objective value recorded in the results store for a model.
+
+    Parameters
+    ----------
+    model_name : str
+        Name of the model
+    mode : str
+        Mode the model was solved in
+    problem_type : str, optional
+        "Original" or "Relaxation", by default "Original"
+
+    Returns
+    -------
+    Optional[float]
+        Smallest objective of the problem over all runs that ended with a feasible
+        solution, or None if there is none
+    """
+    try:
+        return results_store.min_value(
+            "Objective Value",
+            {
+                "Model Name": model_name,
+                "Mode": mode,
+                "Problem Type": problem_type,
+                "Status": FEASIBLE_STATUSES,
+            },
+        )
+    except Exception as e:
+        print(f"Warning: Could not read recorded objective values: {str(e)}")
+        return None
+
+
+def objective_cutoff(upper_bounds: List[Optional[float]]) -> Optional[float]:
+    """
+    Turn known upper bounds into an objective cutoff.
+
+    Parameters
+    ----------
+    upper_bounds : List[Optional[float]]
+        Objective values of known feasible solutions (None entries are ignored)
+
+    Returns
+    -------
+    Optional[float]
+        The best bound plus a relative slack of CUTOFF_TOLERANCE, or None if no bound
+        is known
+    """
+    known = [bound for bound in upper_bounds if bound is not None]
+    if not known:
+        return None
+    best = min(known)
+    return best + CUTOFF_TOLERANCE * max(abs(best), 1.0)
+
+
 def solve_with_solver(
     model: pyo.ConcreteModel,
     solver: str,
@@ -991,6 +969,11 @@ def solve_with_solver(
     time_limit: int,
     results_dir: str,
     tee: bool = True,
+    timings: Optional[Dict[str, float]] = None,
+    warm_start: bool = False,
+    cutoff: Optional[float] = None,
+    gams_replay_dir: Optional[str] = None,
+    strategy: str = "",
 ) -> Tuple[Any, float]:
     """
     Solve a model with the specified solver and configuration.
@@ -1000,7 +983,8 @@ def solve_with_solver(
     model : pyo.ConcreteModel
         The model to solve
     solver : str
-        The solver to use ('gams', 'gurobi', or 'gurobi_persistent')
+        The solver to use ('gams', 'gurobi', 'gurobi_persistent', 'scip' or 'bnb', the
+        NumPy branch and bound of branch_and_bound.py)
     subsolver : Optional[str]
         The subsolver to use if using GAMS or 'persistent' for persistent solver
     time_limit : int
@@ -1009,6 +993,26 @@ def solve_with_solver(
         Directory to store results
     tee : bool, optional
         Whether to display solver output, by default True
+    timings : Optional[Dict[str, float]], optional
+        Phase timings to add the persistent solver's model load to, by default None.
+        The phases inside opt.solve are reported by Pyomo (report_timing) and parsed
+        from the output log.
+    warm_start : bool, optional
+        Whether to pass the current variable values to the solver as an initial
+        incumbent, by default False. GAMS receives them as variable levels and SCIP as
+        the initial guess in the NL file; Gurobi gets a MIP start.
+    cutoff : Optional[float], optional
+        Objective cutoff, by default None. Parts of the search that cannot improve on
+        it are pruned, and the solve finds no solution if none is better. Passed as the
+        GAMS model cutoff (plus BARON's CutOff), Gurobi's Cutoff parameter, and as a
+        constraint on the objective for direct SCIP.
+    gams_replay_dir : Optional[str], optional
+        Replay directory of the model's GAMS file (see gams_replay.py), by default
+        None. GAMS solves then run the file in that directory, written on first use,
+        instead of writing the model for every solve.
+    strategy : str, optional
+        Reformulation strategy applied to the model, by default "". The branch and
+        bound uses it to set the disaggregated variables of hull reformulations.
 
     Returns
     -------
@@ -1030,6 +1034,10 @@ def solve_with_solver(
                 "RelConFeasTol 0",
                 f"AbsIntFeasTol {TOLS['int']}",
                 "RelIntFeasTol 0",
+            ]
+            if cutoff is not None:
+                options_gams.append(f"CutOff {cutoff}")
+            options_gams += [
                 "$offecho",
                 "GAMS_MODEL.optfile=1;",
             ]
@@ -1045,6 +1053,11 @@ def solve_with_solver(
                 f"FeasibilityTol {TOLS['feas']}",
                 f"OptimalityTol {TOLS['opt']}",
                 f"IntFeasTol {TOLS['int']}",
+            ]
+            if warm_start:
+                # Use the variable levels written by the GAMS writer as MIP start
+                options_gams.append("MIPStart 1")
+            options_gams += [
                 "$offecho",
                 "GAMS_MODEL.optfile=1;",
             ]
@@ -1091,22 +1104,32 @@ def solve_with_solver(
             print(f"Using unsupported GAMS subsolver: {subsolver}")
             raise ValueError(f"Unsupported GAMS subsolver: {subsolver}")
 
+        add_options = [
+            f"option reslim={time_limit};",
+            "option threads=1;",
+            f"option optcr={TOLS['rel_gap']};",
+            f"option optca={TOLS['abs_gap']};",
+            *options_gams,
+            *([f"GAMS_MODEL.cutoff={cutoff};"] if cutoff is not None else []),
+        ]
+
         start = time.time()
-        result = opt.solve(
-            model,
-            solver=solver_name,
-            tee=tee,
-            keepfiles=False,
-            tmpdir=results_dir,
-            symbolic_solver_labels=True,
-            add_options=[
-                f"option reslim={time_limit};",
-                "option threads=1;",
-                f"option optcr={TOLS['rel_gap']};",
-                f"option optca={TOLS['abs_gap']};",
-                *options_gams,
-            ],
-        )
+        if gams_replay_dir is not None:
+            # Run the shared GAMS file of the model with this solver's options
+            result = gams_replay.solve(
+                model, gams_replay_dir, solver_name, add_options, results_dir, tee=tee
+            )
+        else:
+            result = opt.solve(
+                model,
+                solver=solver_name,
+                tee=tee,
+                report_timing=True,
+                keepfiles=False,
+                tmpdir=results_dir,
+                symbolic_solver_labels=True,
+                add_options=add_options,
+            )
     elif solver.lower() == "gurobi" and (not subsolver or subsolver.lower() != "persistent"):
         # Direct Gurobi solver
         opt = pyo.SolverFactory("gurobi")
@@ -1120,6 +1143,8 @@ def solve_with_solver(
         opt.options["FeasibilityTol"] = TOLS["feas"]
         opt.options["OptimalityTol"] = TOLS["opt"]
         opt.options["IntFeasTol"] = TOLS["int"]
+        if cutoff is not None:
+            opt.options["Cutoff"] = cutoff
 
         # Direct Gurobi's log to a file so we can parse bounds from it.
         gurobi_log_path = os.path.join(results_dir, "gurobi_solver.log")
@@ -1129,17 +1154,19 @@ def solve_with_solver(
         result = opt.solve(
             model,
             tee=tee,
+            report_timing=True,
             symbolic_solver_labels=True,
+            warmstart=warm_start,
         )
     elif solver.lower() == "gurobi" and subsolver and subsolver.lower() == "persistent":
         # Gurobi persistent solver
         print("Using Gurobi persistent solver")
-        opt = pyo.SolverFactory("gurobi_persistent")
+        # Load the model into the process's solver session (environment and license
+        # are reused across jobs; a model that is still loaded is only updated)
+        opt = solver_session.load(model, "gurobi_persistent", timings)
 
-        # Load the model into the solver
-        opt.set_instance(model)
-
-        # Set Gurobi parameters
+        # Set Gurobi parameters (the session keeps the options of its previous solve)
+        opt.options.clear()
         opt.options["NonConvex"] = 2
         opt.options["TimeLimit"] = time_limit
         opt.options["Threads"] = 1
@@ -1148,6 +1175,8 @@ def solve_with_solver(
         opt.options["FeasibilityTol"] = TOLS["feas"]
         opt.options["OptimalityTol"] = TOLS["opt"]
         opt.options["IntFeasTol"] = TOLS["int"]
+        if cutoff is not None:
+            opt.options["Cutoff"] = cutoff
 
         # Direct Gurobi's log to a file so we can parse bounds from it.
         gurobi_log_path = os.path.join(results_dir, "gurobi_solver.log")
@@ -1156,13 +1185,11 @@ def solve_with_solver(
         start = time.time()
         result = opt.solve(
             tee=tee,
+            report_timing=True,
+            warmstart=warm_start,
             save_results=True,  # This ensures results are saved to the model
             load_solutions=True,  # This ensures the solution is loaded back into the model
         )
-
-        # Clean up the persistent solver
-        opt.client_to_solver = {}
-        opt.solver_model = None
     elif solver.lower() == "scip" or solver.lower() == "scip_convex":
         # Direct SCIP solver
         opt = pyo.SolverFactory("scip")
@@ -1177,12 +1204,26 @@ def solve_with_solver(
         opt.options["numerics/sumepsilon"] = TOLS["feas"]
         opt.options["display/verblevel"] = 4
 
+        # SCIP's objective limit is not a parameter, so impose the cutoff as a constraint
+        if cutoff is not None:
+            model.objective_cutoff = pyo.Constraint(expr=model.obj.expr <= cutoff)
+
         start = time.time()
-        result = opt.solve(
-            model,
-            tee=tee,
-            symbolic_solver_labels=True,
-        )
+        try:
+            result = opt.solve(
+                model,
+                tee=tee,
+                report_timing=True,
+                symbolic_solver_labels=True,
+            )
+        finally:
+            # Cached and template models are reused, so never leave the cutoff behind
+            if cutoff is not None:
+                model.del_component(model.objective_cutoff)
+    elif solver.lower() == branch_and_bound.SOLVER_NAME:
+        # In-repo exact branch and bound on the instance; needs no external solver
+        start = time.time()
+        result = branch_and_bound.solve_model(model, time_limit, strategy)
     else:
         raise ValueError(f"Unsupported solver: {solver} with subsolver: {subsolver}")
 
@@ -1192,6 +1233,41 @@ def solve_with_solver(
     return result, duration
 
 
+def results_directory(
+    solver: str, subsolver: Optional[str], strategy: str, mode: str, run_id: str
+) -> str:
+    """
+    Directory receiving the results of one solve_model run for a strategy.
+
+    Parameters
+    ----------
+    solver : str
+        The main solver
+    subsolver : Optional[str]
+        The subsolver, if any
+    strategy : str
+        Reformulation strategy
+    mode : str
+        Mode used for solving
+    run_id : str
+        Name of the run (see solve_model)
+
+    Returns
+    -------
+    str
+        data/<solver>_<subsolver>_<strategy>/<mode>/<run_id>, with the original and
+        relaxed solves in its subdirectories "original" and "relaxed"
+    """
+    # Special handling for persistent solver naming
+    if solver.lower() == "gurobi" and subsolver and subsolver.lower() == "persistent":
+        solver_dir = "gurobi_persistent"
+    else:
+        solver_dir = f"{solver}_{subsolver if subsolver else 'direct'}"
+    return os.path.join(
+        os.path.dirname(os.getcwd()), "data", f"{solver_dir}_{strategy}", mode, run_id
+    )
+
+
 def solve_model(
     model: Optional[pyo.ConcreteModel],
     reformulation_strategies: List[str],
@@ -1204,6 +1280,17 @@ def solve_model(
     subsolver: Optional[str] = "gurobi",
     calculate_relaxation_gap: bool = False,
     relaxation_only: bool = False,
+    transform_cache_dir: Optional[str] = None,
+    run_id: Optional[str] = None,
+    compress_logs: bool = False,
+    warm_start: bool = False,
+    upper_bound: Optional[float] = None,
+    cutoff_sources: Optional[List[str]] = None,
+    bounds: str = "box",
+    symmetry_scheme: Optional[str] = None,
+    presolve: bool = False,
+    use_template: bool = False,
+    gams_cache_dir: Optional[str] = None,
 ) -> Optional[str]:
     """
     Solve the model using the specified solver and subsolver.
@@ -1219,7 +1306,7 @@ def solve_model(
     time_limit : int, optional
         Time limit in seconds, by default 3600
     existing_model_name : Optional[str], optional
-        Name of existing model to load, by default None
+        Name of existing model to load (a .npz manifest or a legacy .pkl), by default None
     save_only : bool, optional
         If True, just save the model without solving, by default False
     custom_filename : Optional[str], optional
@@ -1233,6 +1320,50 @@ def solve_model(
         Whether to calculate relaxation gap, by default False
     relaxation_only : bool, optional
         Whether to solve only the relaxation, by default False
+    transform_cache_dir : Optional[str], optional
+        Directory of the on-disk transformed-model cache, by default None (always
+        re-transform). With a cache, each (instance, strategy) pair is transformed once
+        and later solver configurations load the stored result.
+    run_id : Optional[str], optional
+        Name of the run directory below <solver>_<strategy>/<mode>, by default None
+        (current timestamp). Parallel batch jobs pass unique ids so their results never
+        share a directory.
+    compress_logs : bool, optional
+        Whether to gzip the streamed output logs (output_log.txt.gz), by default False
+    warm_start : bool, optional
+        Whether to start the original problem from a k-means++/Lloyd clustering, by
+        default False. The clustering is computed once per model and set as the initial
+        values of every reformulation.
+    upper_bound : Optional[float], optional
+        Objective of a known feasible solution, by default None. It is passed to the
+        solver as objective cutoff (with a slack of CUTOFF_TOLERANCE).
+    cutoff_sources : Optional[List[str]], optional
+        Further upper bounds to take the cutoff from, by default None: "heuristic" (the
+        k-means++/Lloyd clustering) and/or "recorded" (the best objective in the results
+        store for this model). The best of all bounds is used.
+    bounds : str, optional
+        Variable bounds to solve with, one of k_means.BOUND_MODES, by default "box"
+        (keep the bounds the model was built with). "data" and "data_clusters" replace
+        them by the tighter bounds of k_means.data_bounds before the reformulation,
+        which tightens the big-M values and hull bounds; a passed model is modified.
+    symmetry_scheme : Optional[str], optional
+        Symmetry-breaking scheme to solve with, one of symmetry.SCHEMES, by default None
+        (keep the scheme the model was built with). A passed model is modified.
+    presolve : bool, optional
+        Whether to fix the assignments determined by bound arguments before the
+        reformulation (see presolve.presolve), by default False. The objective cutoff,
+        if any, bounds every distance; disjuncts are only excluded with bounds
+        "data_clusters" and a cutoff. A passed model is modified.
+    use_template : bool, optional
+        Whether to solve the direct.* strategies on a reformulated template of the
+        model's shape, by default False. The template is built once per process and
+        later instances only swap in their coordinates (see template.py), as does the
+        gurobi_persistent solver it stays loaded in. Other strategies and presolved
+        models are reformulated as usual.
+    gams_cache_dir : Optional[str], optional
+        Directory of the GAMS file cache, by default None (write the model for every
+        solve). With a cache, the original problem of each transformed model is written
+        once and every GAMS subsolver replays the same file (see gams_replay.py).
 
     Returns
     -------
@@ -1241,6 +1372,19 @@ def solve_model(
     """
     current_time = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
 
+    # Options that change the results; part of the key of the results rows
+    settings = results_store.settings_key(
+        {
+            "warm_start": warm_start,
+            "upper_bound": upper_bound,
+            "cutoff_sources": cutoff_sources,
+            "bounds": bounds,
+            "symmetry_scheme": symmetry_scheme,
+            "presolve": presolve,
+            "use_template": use_template,
+        }
+    )
+
     # data is parent directory in k_means\data
     results_dir_parent = os.path.join(os.path.dirname(os.getcwd()), "data")
 
@@ -1253,11 +1397,18 @@ def solve_model(
     if not os.path.exists(models_dir):
         os.makedirs(models_dir)
 
+    # Seconds spent in each phase, shared by all strategies for the model load
+    load_timings: Dict[str, float] = {}
+
     if existing_model_name is not None:
-        # Load existing model
+        # Load existing model, rebuilding it from its manifest unless it is a legacy pickle
         model_path = os.path.join(models_dir, existing_model_name)
         if os.path.exists(model_path):
-            model_for_cloning = load_model(model_path)
+            with phase_timing.timed(load_timings, "model_load"):
+                if instances.is_manifest(model_path):
+                    model_for_cloning = instances.build_instance(model_path)
+                else:
+                    model_for_cloning = load_model(model_path)
             print(f"Using existing model: {existing_model_name}")
         else:
             raise FileNotFoundError(f"Model file not found: {model_path}")
@@ -1273,9 +1424,12 @@ def solve_model(
             model_filename = custom_filename
         else:
             # Use standard naming convention
-            model_filename = f"model_{mode}_{current_time}.pkl"
+            model_filename = f"model_{mode}_{current_time}{instances.MANIFEST_EXTENSION}"
 
-        save_model(model_for_cloning, models_dir, model_filename)
+        if instances.is_manifest(model_filename):
+            instances.save_instance_from_model(model_for_cloning, models_dir, model_filename)
+        else:
+            save_model(model_for_cloning, models_dir, model_filename)
         print(f"Model saved as: {model_filename}")
 
         # Track the filename for result reporting
@@ -1290,34 +1444,84 @@ def solve_model(
     if not reformulation_strategies:
         return None
 
+    if symmetry_scheme is not None:
+        symmetry.set_scheme(model_for_cloning, symmetry_scheme)
+    print(f"Symmetry breaking: {symmetry.scheme_of(model_for_cloning)}")
+
+    if bounds not in k_means.BOUND_MODES:
+        raise ValueError(f"Unknown bounds: {bounds}. Use one of {k_means.BOUND_MODES}")
+    if bounds != "box":
+        k_means.set_data_bounds(model_for_cloning, cluster_bounds=bounds == "data_clusters")
+        print(f"Using {bounds} variable bounds")
+
+    cutoff_sources = cutoff_sources or []
+    for source in cutoff_sources:
+        if source not in ("heuristic", "recorded"):
+            raise ValueError(f"Unknown cutoff source: {source}")
+
+    # Heuristic clustering shared by all strategies as their initial incumbent
+    initial_solution = None
+    warm_start_objective = None
+    if (warm_start or "heuristic" in cutoff_sources) and not relaxation_only:
+        with phase_timing.timed(load_timings, "warm_start"):
+            initial_solution = warm_start_module.warm_start_from_model(model_for_cloning)
+        warm_start_objective = initial_solution["objective"]
+        print(f"Warm start objective (k-means++/Lloyd): {warm_start_objective}")
+
+    # Objective cutoff from the best known upper bound
+    cutoff = None
+    if not relaxation_only:
+        upper_bounds = [upper_bound]
+        if "heuristic" in cutoff_sources:
+            upper_bounds.append(warm_start_objective)
+        if "recorded" in cutoff_sources:
+            upper_bounds.append(recorded_upper_bound(existing_model_name, mode))
+        cutoff = objective_cutoff(upper_bounds)
+        if cutoff is not None:
+            print(f"Objective cutoff: {cutoff}")
+
+    # Reductions on the GDP model, shared by every reformulation strategy
+    presolve_stats = None
+    if presolve:
+        with phase_timing.timed(load_timings, "presolve"):
+            presolve_stats = presolve_module.presolve(model_for_cloning, upper_bound=cutoff)
+
     for strategy in reformulation_strategies:
         # Create results directory with solver info
-        # Special handling for persistent solver naming
-        if solver.lower() == "gurobi" and subsolver and subsolver.lower() == "persistent":
-            solver_dir = "gurobi_persistent"
-        else:
-            solver_dir = f"{solver}_{subsolver if subsolver else 'direct'}"
-
-        base_results_dir = os.path.join(
-            results_dir_parent, f"{solver_dir}_{strategy}", mode, current_time
+        base_results_dir = results_directory(
+            solver, subsolver, strategy, mode, run_id or current_time
         )
         if not os.path.exists(base_results_dir):
             os.makedirs(base_results_dir)
 
-        # Get a fresh copy of the model for this strategy
-        model = model_for_cloning.clone()
-
-        # Apply the reformulation strategy
+        # Get a fresh transformed copy of the model for this strategy
         print(f"Applying reformulation strategy: {strategy}")
-        epsilon = None
-
-        if strategy.startswith("gdp.hull_eps"):
-            epsilon = float(strategy.split("_")[-1])
-
-        if strategy.startswith("gdp.hull") and epsilon is not None:
-            pyo.TransformationFactory("gdp.hull").apply_to(model, EPS=epsilon)
+        timings = dict(load_timings)
+        if use_template and template_module.supports(model_for_cloning, strategy):
+            model = template_module.instance_model(model_for_cloning, strategy, timings)
+        elif transform_cache_dir is not None:
+            model = model_cache.get_transformed_model(
+                model_for_cloning, strategy, transform_cache_dir, apply_reformulation, timings
+            )
         else:
-            pyo.TransformationFactory(strategy).apply_to(model)
+            with phase_timing.timed(timings, "clone"):
+                model = model_for_cloning.clone()
+            with phase_timing.timed(timings, "transformation"):
+                apply_reformulation(model, strategy)
+        if warm_start and initial_solution is not None:
+            with phase_timing.timed(timings, "warm_start"):
+                warm_start_module.apply_warm_start(model, initial_solution, strategy)
+
+        # Key columns of this strategy's rows in the results store
+        job_match = {
+            "Model Name": existing_model_name,
+            "Strategy": strategy,
+            "Mode": mode,
+            "Solver": solver,
+            "Subsolver": subsolver if subsolver else "None",
+            "Time Limit": time_limit,
+            results_store.SETTINGS_COLUMN: settings,
+        }
 
         # Create a shared data structure to store all results for this strategy
         strategy_results: Dict[str, Dict[str, Any]] = {
@@ -1350,19 +1554,31 @@ def solve_model(
             if not os.path.exists(results_dir):
                 os.makedirs(results_dir)
 
-            # Path to the file where you want to save the output
-            output_file = os.path.join(results_dir, "output_log.txt")
-
-            # Create a StringIO buffer to capture the output
-            buffer = io.StringIO()
+            original_timings = dict(timings)
 
-            # Redirect stdout to the buffer
-            with redirect_stdout(buffer):
+            # Stream all output to the output log while it is printed
+            trajectory_parser = trajectory.TrajectoryParser(solver, subsolver)
+            with log_capture.capture_output(
+                results_dir, solver, subsolver, compress=compress_logs, parsers=[trajectory_parser]
+            ) as output_log:
                 print(f"Solving original (integer) problem with strategy {strategy}...")
 
                 # Use the helper function to solve the model
                 result, duration = solve_with_solver(
-                    model, solver, subsolver, time_limit, results_dir
+                    model,
+                    solver,
+                    subsolver,
+                    time_limit,
+                    results_dir,
+                    timings=original_timings,
+                    warm_start=warm_start and initial_solution is not None,
+                    cutoff=cutoff,
+                    gams_replay_dir=(
+                        gams_replay.replay_directory(model, strategy, gams_cache_dir)
+                        if gams_cache_dir is not None and solver.lower() == "gams"
+                        else None
+                    ),
+                    strategy=strategy,
                 )
 
                 print(f"Original problem solved. Time taken: {duration} seconds")
@@ -1384,24 +1600,24 @@ def solve_model(
                 except Exception as e:
                     print(f"Could not extract original objective value: {str(e)}")
 
-                # Write the captured output to the file
-                with open(output_file, "w") as f:
-                    f.write(buffer.getvalue())
-
-                # Parse the output log for root relaxation value
-                root_relaxation_value = parse_root_relaxation(output_file, solver, subsolver)
-
-                # For direct Gurobi, also try the dedicated Gurobi log file
-                if root_relaxation_value is None:
-                    gurobi_log_path = os.path.join(results_dir, "gurobi_solver.log")
-                    if os.path.exists(gurobi_log_path):
-                        root_relaxation_value = parse_root_relaxation(
-                            gurobi_log_path, "gurobi", None
-                        )
+                # The output log was parsed while it was written; add the Gurobi log
+                with phase_timing.timed(original_timings, "log_parsing"):
+                    log_summary = log_parser.parse_run_logs(
+                        results_dir, solver, subsolver, output_log.parsers[0].summary()
+                    )
+                    trajectory_metrics = record_trajectory(
+                        trajectory_parser,
+                        results_dir,
+                        time_limit,
+                        recorded_upper_bound(existing_model_name, mode),
+                    )
+                root_relaxation_value = log_summary["root_relaxation"]
+                add_solve_timings(original_timings, log_summary)
 
                 strategy_results["original"]["root_relaxation_value"] = root_relaxation_value
 
                 # Save original problem results - gaps will be calculated later
+                persistence_start = time.perf_counter()
                 save_results(
                     model,
                     result,
@@ -1415,6 +1631,22 @@ def solve_model(
                     subsolver,
                     is_relaxation=False,
                     root_relaxation_value=root_relaxation_value,
+                    time_limit=time_limit,
+                    log_summary=log_summary,
+                    trajectory_metrics=trajectory_metrics,
+                    timings=original_timings,
+                    warm_start_objective=warm_start_objective,
+                    cutoff=cutoff,
+                    bounds=bounds,
+                    symmetry_scheme=symmetry.scheme_of(model_for_cloning),
+                    presolve_stats=presolve_stats,
+                    settings=settings,
+                )
+                record_result_persistence(
+                    results_dir,
+                    False,
+                    {**job_match, "Problem Type": "Original"},
+                    time.perf_counter() - persistence_start,
                 )
 
                 # Save pretty-printed model
@@ -1427,26 +1659,33 @@ def solve_model(
             if not os.path.exists(results_dir):
                 os.makedirs(results_dir)
 
-            # Path to the file where you want to save the output
-            output_file = os.path.join(results_dir, "output_log.txt")
+            # Stream all output to the output log while it is printed
+            trajectory_parser = trajectory.TrajectoryParser(solver, subsolver)
+            with log_capture.capture_output(
+                results_dir, solver, subsolver, compress=compress_logs, parsers=[trajectory_parser]
+            ) as output_log:
+                # Relaxing adds to the clone and transformation time of the strategy
+                relaxed_timings = dict(timings)
 
-            # Create a StringIO buffer to capture the output
-            buffer = io.StringIO()
-
-            # Redirect stdout to the buffer
-            with redirect_stdout(buffer):
                 # Create a copy of the model for relaxation
-                relaxed_model = model.clone()
+                with phase_timing.timed(relaxed_timings, "clone"):
+                    relaxed_model = model.clone()
 
                 # Apply relaxation transformation
                 print(f"Applying relaxation to model with strategy {strategy}...")
-                pyo.TransformationFactory("core.relax_integer_vars").apply_to(relaxed_model)
+                with phase_timing.timed(relaxed_timings, "transformation"):
+                    pyo.TransformationFactory("core.relax_integer_vars").apply_to(relaxed_model)
 
                 print(f"Solving relaxed problem with strategy {strategy}...")
 
                 # Use the helper function to solve the relaxed model
                 relaxed_result, relaxed_duration = solve_with_solver(
-                    relaxed_model, solver, subsolver, time_limit, results_dir
+                    relaxed_model,
+                    solver,
+                    subsolver,
+                    time_limit,
+                    results_dir,
+                    timings=relaxed_timings,
                 )
 
                 print(f"Relaxed problem solved. Time taken: {relaxed_duration} seconds")
@@ -1468,22 +1707,19 @@ def solve_model(
                 except Exception as e:
                     print(f"Could not extract objective value from relaxed model: {str(e)}")
 
-                # Write the captured output to the file
-                with open(output_file, "w") as f:
-                    f.write(buffer.getvalue())
-
-                # Parse the output log for root relaxation value
-                relaxed_root_relaxation_value = parse_root_relaxation(
-                    output_file, solver, subsolver
-                )
-
-                # For direct Gurobi, also try the dedicated Gurobi log file
-                if relaxed_root_relaxation_value is None:
-                    gurobi_log_path = os.path.join(results_dir, "gurobi_solver.log")
-                    if os.path.exists(gurobi_log_path):
-                        relaxed_root_relaxation_value = parse_root_relaxation(
-                            gurobi_log_path, "gurobi", None
-                        )
+                # The output log was parsed while it was written; add the Gurobi log
+                with phase_timing.timed(relaxed_timings, "log_parsing"):
+                    relaxed_log_summary = log_parser.parse_run_logs(
+                        results_dir, solver, subsolver, output_log.parsers[0].summary()
+                    )
+                    relaxed_trajectory_metrics = record_trajectory(
+                        trajectory_parser,
+                        results_dir,
+                        time_limit,
+                        recorded_upper_bound(existing_model_name, mode, "Relaxation"),
+                    )
+                relaxed_root_relaxation_value = relaxed_log_summary["root_relaxation"]
+                add_solve_timings(relaxed_timings, relaxed_log_summary)
 
                 strategy_results["relaxation"]["root_relaxation_value"] = (
                     relaxed_root_relaxation_value
@@ -1574,6 +1810,7 @@ def solve_model(
 
                 # Save relaxed problem results without relaxation gaps
                 # (they belong only to original)
+                persistence_start = time.perf_counter()
                 save_results(
                     relaxed_model,
                     relaxed_result,
@@ -1587,57 +1824,49 @@ def solve_model(
                     subsolver,
                     is_relaxation=True,
                     root_relaxation_value=relaxed_root_relaxation_value,
+                    time_limit=time_limit,
+                    log_summary=relaxed_log_summary,
+                    trajectory_metrics=relaxed_trajectory_metrics,
+                    timings=relaxed_timings,
+                    bounds=bounds,
+                    symmetry_scheme=symmetry.scheme_of(model_for_cloning),
+                    presolve_stats=presolve_stats,
+                    settings=settings,
+                )
+                record_result_persistence(
+                    results_dir,
+                    True,
+                    {**job_match, "Problem Type": "Relaxation"},
+                    time.perf_counter() - persistence_start,
                 )
 
-                # Update the Excel file to ensure original model has relaxation gaps
+                # Update the results store to ensure original model has relaxation gaps
                 # and relaxed model doesn't have these gaps (to avoid redundancy)
-                excel_dir = os.path.join(os.path.dirname(os.getcwd()), "data")
-                excel_path = os.path.join(excel_dir, "results.xlsx")
-                if (
-                    os.path.exists(excel_path)
-                    and strategy_results["gaps"]["relaxation_gap_percent"] is not None
-                ):
+                if strategy_results["gaps"]["relaxation_gap_percent"] is not None:
                     try:
-                        # Read Excel
-                        df = pd.read_excel(excel_path)
-
-                        # Find original model rows for this strategy/model
-                        original_mask = (
-                            (df["Model Name"] == existing_model_name)
-                            & (df["Strategy"] == strategy)
-                            & (df["Mode"] == mode)
-                            & (df["Problem Type"] == "Original")
-                        )
-
-                        # Find relaxation rows for this strategy/model
-                        relaxation_mask = (
-                            (df["Model Name"] == existing_model_name)
-                            & (df["Strategy"] == strategy)
-                            & (df["Mode"] == mode)
-                            & (df["Problem Type"] == "Relaxation")
-                        )
-
                         # Update gaps ONLY in original rows
-                        if any(original_mask):
-                            df.loc[original_mask, "Relative Gap (%)"] = strategy_results["gaps"][
-                                "relaxation_gap_percent"
-                            ]
-                            df.loc[original_mask, "Absolute Gap"] = strategy_results["gaps"][
-                                "absolute_gap"
-                            ]
+                        n_updated = results_store.update_results(
+                            {**job_match, "Problem Type": "Original"},
+                            {
+                                "Relative Gap (%)": strategy_results["gaps"][
+                                    "relaxation_gap_percent"
+                                ],
+                                "Absolute Gap": strategy_results["gaps"]["absolute_gap"],
+                            },
+                        )
 
+                        if n_updated:
                             # Clear gaps from relaxation rows (they don't belong there)
-                            if any(relaxation_mask):
-                                df.loc[relaxation_mask, "Relative Gap (%)"] = None
-                                df.loc[relaxation_mask, "Absolute Gap"] = None
-
-                            df.to_excel(excel_path, index=False)
+                            results_store.update_results(
+                                {**job_match, "Problem Type": "Relaxation"},
+                                {"Relative Gap (%)": None, "Absolute Gap": None},
+                            )
                             print(
-                                "Updated Excel file: gaps added to original model data, "
+                                "Updated results store: gaps added to original model data, "
                                 "removed from relaxation"
                             )
                     except Exception as e:
-                        print(f"Error updating Excel file: {str(e)}")
+                        print(f"Error updating results store: {str(e)}")
 
                 # Save pretty-printed relaxed model
                 # save_model_pprint(relaxed_model, results_dir, is_relaxation=True)
@@ -0,0 +1,110 @@
+import atexit
+from typing import Any, Dict, Optional
+
+import phase_timing
+import pyomo.environ as pyo
+import template as template_module
+
+# Persistent solvers of this process by name, each holding at most one loaded model
+_sessions: Dict[str, Dict[str, Any]] = {}
+
+
+def get_session(solver_name: str = "gurobi_persistent") -> Dict[str, Any]:
+    """
+    Return the session of a persistent solver, starting it on first use.
+
+    One solver object is kept per process and name. Gurobi solvers own their
+    environment (manage_env), so the license is checked out once per worker process
+    instead of once per job, and released when the process exits (see close_all).
+
+    Parameters
+    ----------
+    solver_name : str, optional
+        Name of a Pyomo persistent solver, by default "gurobi_persistent"
+
+    Returns
+    -------
+    Dict[str, Any]
+        Session with the solver (opt), the loaded model, the template generation it
+        was loaded at, and the numbers of full loads and incremental updates
+    """
+    session = _sessions.get(solver_name)
+    if session is None:
+        options = {"manage_env": True} if solver_name.startswith("gurobi") else {}
+        session = {
+            "opt": pyo.SolverFactory(solver_name, **options),
+            "model": None,
+            "generation": None,
+            "loads": 0,
+            "updates": 0,
+        }
+        _sessions[solver_name] = session
+    return session
+
+
+def load(
+    model: pyo.ConcreteModel,
+    solver_name: str = "gurobi_persistent",
+    timings: Optional[Dict[str, float]] = None,
+) -> Any:
+    """
+    Load a model into the persistent solver of this process.
+
+    A model that is already loaded is updated in place: the bounds and fixings of its
+    variables are refreshed and, for a model template with new coordinates (see
+    template.py), the constraints that depend on them are replaced. Any other model
+    replaces the loaded one in the same solver and environment.
+
+    Parameters
+    ----------
+    model : pyo.ConcreteModel
+        The (transformed) model to solve
+    solver_name : str, optional
+        Name of a Pyomo persistent solver, by default "gurobi_persistent"
+    timings : Optional[Dict[str, float]], optional
+        Phase timings receiving the load or update as "problem_write", by default None
+
+    Returns
+    -------
+    Any
+        The persistent solver, ready to solve the model
+    """
+    session = get_session(solver_name)
+    opt = session["opt"]
+    generation = template_module.generation(model)
+
+    with phase_timing.timed(timings, "problem_write"):
+        if session["model"] is model:
+            if generation != session["generation"]:
+                for constraint in template_module.coordinate_constraints(model):
+                    opt.remove_constraint(constraint)
+                    opt.add_constraint(constraint)
+            for var in model.component_data_objects(pyo.Var, descend_into=True):
+                opt.update_var(var)
+            session["updates"] += 1
+        else:
+            opt.set_instance(model)
+            session["model"] = model
+            session["loads"] += 1
+    session["generation"] = generation
+
+    print(
+        f"Persistent solver session ({solver_name}): {session['loads']} models loaded, "
+        f"{session['updates']} updated in place"
+    )
+    return opt
+
+
+def close_all() -> None:
+    """Free the models and environments of all persistent solver sessions."""
+    for session in _sessions.values():
+        close = getattr(session["opt"], "close", None)
+        if close is not None:
+            try:
+                close()
+            except Exception as e:
+                print(f"Warning: Could not close persistent solver: {str(e)}")
+    _sessions.clear()
+
+
+atexit.register(close_all)
@@ -0,0 +1,475 @@
+import multiprocessing
+import os
+import queue
+import resource
+import signal
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import instances
+import jobs
+import ledger
+import log_parser
+import results_store
+
+# Outcome statuses of supervised jobs that were stopped or died, besides "done" and
+# "failed" (see jobs.run_job)
+TIMEOUT = "timeout"
+OUT_OF_MEMORY = "out_of_memory"
+CRASHED = "crashed"
+
+# Seconds a job may run beyond the time limits of its solves before the watchdog
+# stops it (model loading, reformulation and writing results are not time-limited)
+WATCHDOG_GRACE = 300.0
+
+# Seconds a stopped job gets to close its logs before it is killed
+TERMINATE_GRACE = 10.0
+
+# Seconds between checks for overrunning or dead workers
+POLL_INTERVAL = 5.0
+
+
+def key_columns(job: Dict[str, Any], strategy: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Key columns of the results row of a job's original problem.
+
+    Parameters
+    ----------
+    job : Dict[str, Any]
+        A job created by jobs.expand_jobs
+    strategy : Optional[str], optional
+        Strategy to put in the key, by default the job's strategy
+
+    Returns
+    -------
+    Dict[str, Any]
+        Values of results_store.KEY_COLUMNS as solve.save_to_results_store writes them
+    """
+    return {
+        "Model Name": job["model_name"],
+        "Strategy": job["strategy"] if strategy is None else strategy,
+        "Mode": job["mode"],
+        "Solver": job["solver"],
+        "Subsolver": job["subsolver"] if job["subsolver"] else "None",
+        "Problem Type": "Original",
+        "Time Limit": job["time_limit"],
+        results_store.SETTINGS_COLUMN: results_store.settings_key(job["solve_options"]),
+    }
+
+
+def instance_columns(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Instance columns of a job's results rows, read from its manifest.
+
+    Parameters
+    ----------
+    job : Dict[str, Any]
+        A job created by jobs.expand_jobs
+
+    Returns
+    -------
+    Dict[str, Any]
+        Instance sizes, coordinate range and "Instance Hash" as solve.save_to_results_store
+        writes them; empty for legacy pickled models and unreadable manifests
+    """
+    if not instances.is_manifest(job["model_name"]):
+        return {}
+    models_dir = os.path.join(os.path.dirname(os.getcwd()), "data", "models")
+    try:
+        instance = instances.load_instance(os.path.join(models_dir, job["model_name"]))
+    except Exception as e:
+        print(f"Warning: Could not read instance {job['model_name']}: {str(e)}")
+        return {}
+    return {
+        "n_dimensions": instance["n_dimensions"],
+        "n_clusters": instance["n_clusters"],
+        "n_points": instance["n_points"],
+        "coord_range_lower": instance["coord_range"][0],
+        "coord_range_upper": instance["coord_range"][1],
+        "Instance Hash": instances.data_hash(instance),
+    }
+
+
+def stored_result(job: Dict[str, Any], since: str) -> Optional[Dict[str, Any]]:
+    """
+    Results row a job has written for its original problem since a given time.
+
+    Parameters
+    ----------
+    job : Dict[str, Any]
+        A job created by jobs.expand_jobs
+    since : str
+        Start of the job, formatted like the "Run Time" column
+
+    Returns
+    -------
+    Optional[Dict[str, Any]]
+        The row, or None if there is none or it is older than since
+    """
+    try:
+        row = results_store.get_result(key_columns(job))
+    except Exception as e:
+        print(f"Warning: Could not read the result of {jobs.job_id(job)}: {str(e)}")
+        return None
+    if row is None or (row.get("Run Time") or "") < since:
+        return None
+    return row
+
+
+def job_deadline(job: Dict[str, Any], grace: float = WATCHDOG_GRACE) -> float:
+    """
+    Seconds after which the watchdog stops a job.
+
+    Parameters
+    ----------
+    job : Dict[str, Any]
+        A job created by jobs.expand_jobs
+    grace : float, optional
+        Seconds allowed beyond the time limits of the solves, by default WATCHDOG_GRACE
+
+    Returns
+    -------
+    float
+        The time limit for each solve of the job (original and/or relaxed) plus grace
+    """
+    n_solves = 0 if job["relaxation_only"] else 1
+    if job["relaxation_only"] or job["calculate_relaxation_gap"]:
+        n_solves += 1
+    return n_solves * job["time_limit"] + grace
+
+
+def _exit_on_signal(signum: int, frame: Any) -> None:
+    """Turn a termination signal into SystemExit, so logs and work dirs are closed."""
+    sys.exit(128 + signum)
+
+
+def worker(
+    job: Dict[str, Any],
+    ledger_path: Optional[str],
+    outcomes: Any,
+    memory_limit: Optional[float] = None,
+) -> None:
+    """
+    Run one job in a supervised process and report its outcome.
+
+    The worker leads its own process group, so stopping it also stops the solver
+    processes it started (e.g. GAMS and its subsolver). A memory limit is set as
+    RLIMIT_AS, which the solver processes inherit.
+
+    Parameters
+    ----------
+    job : Dict[str, Any]
+        A job created by jobs.expand_jobs
+    ledger_path : Optional[str]
+        Job ledger in which the start of the job is recorded
+    outcomes : Any
+        Queue receiving the jobs.run_job outcome
+    memory_limit : Optional[float], optional
+        Address space limit in GB, by default None (no limit)
+    """
+    os.setsid()
+    signal.signal(signal.SIGTERM, _exit_on_signal)
+    if memory_limit is not None:
+        limit = int(memory_limit * 1024**3)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    outcomes.put(jobs.run_job(job, ledger_path))
+
+
+def terminate(processes: List[Any], grace_period: float = TERMINATE_GRACE) -> None:
+    """
+    Stop workers and their solvers, killing those that outlive the grace period.
+
+    Parameters
+    ----------
+    processes : List[Any]
+        Worker processes started with worker as target
+    grace_period : float, optional
+        Seconds between SIGTERM and SIGKILL, by default TERMINATE_GRACE
+    """
+    for process in processes:
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+        except (ProcessLookupError, PermissionError):
+            pass
+    deadline = time.time() + grace_period
+    for process in processes:
+        process.join(max(0.0, deadline - time.time()))
+        try:
+            # Solvers the worker started may outlive it
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+        process.join()
+
+
+def record_partial(job: Dict[str, Any], wall_time: float, since: str, status: str) -> None:
+    """
+    Record the partial result of a stopped job, parsed from its output log.
+
+    Nothing is recorded if the job wrote its own row since it started, i.e. it finished
+    while it was being stopped. The row replaces any earlier row of the job as a whole,
+    so columns the stopped run did not produce are empty.
+
+    Parameters
+    ----------
+    job : Dict[str, Any]
+        A job created by jobs.expand_jobs
+    wall_time : float
+        Seconds the job ran until it was stopped
+    since : str
+        Start of the job, formatted like the "Run Time" column
+    status : str
+        Status to record, e.g. TIMEOUT or ledger.CANCELLED
+    """
+    if stored_result(job, since) is not None:
+        return
+
+    # Imported here so that only the batch driver loads the solver stack
+    from solve import results_directory, tolerance_key
+
+    results_dir = os.path.join(
+        results_directory(
+            job["solver"], job["subsolver"], job["strategy"], job["mode"], job["run_id"]
+        ),
+        "original",
+    )
+    try:
+        summary = log_parser.parse_run_logs(results_dir, job["solver"], job["subsolver"])
+    except Exception as e:
+        # E.g. a compressed log cut short by the kill
+        print(f"Warning: Could not parse the log of stopped job {jobs.job_id(job)}: {str(e)}")
+        summary = log_parser.LogParser(job["solver"], job["subsolver"]).summary()
+
+    lower_bound, upper_bound = summary["lower_bound"], summary["upper_bound"]
+    absolute_gap = relative_gap = None
+    if lower_bound is not None and upper_bound is not None:
+        absolute_gap = upper_bound - lower_bound
+        relative_gap = absolute_gap / abs(lower_bound) if lower_bound != 0 else None
+    try:
+        results_store.upsert_result(
+            {
+                **key_columns(job),
+                **instance_columns(job),
+                "Tolerances": tolerance_key(),
+                "Run Time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "Duration (sec)": wall_time,
+                "Status": status,
+                "Objective Value": upper_bound,
+                "Lower Bound": lower_bound,
+                "Upper Bound": upper_bound,
+                "Bound Absolute Gap": absolute_gap,
+                "Bound Relative Gap": relative_gap,
+                "Root Relaxation Value": summary["root_relaxation"],
+                "Nodes": summary["nodes"],
+            },
+            replace=True,
+        )
+    except Exception as e:
+        print(f"Warning: Could not record the result of {jobs.job_id(job)}: {str(e)}")
+
+
+def memory_failure(job: Dict[str, Any]) -> Optional[str]:
+    """
+    Find a failed allocation reported in the logs of a job's original solve.
+
+    Solvers that run out of memory under the memory limit usually report it in their
+    log (e.g. Gurobi "Out of memory", SCIP "insufficient memory") and exit with an
+    error rather than a MemoryError. The output log, the log of direct Gurobi solves and
+    the GAMS listing of replayed solves (see gams_replay.py) are searched.
+
+    Parameters
+    ----------
+    job : Dict[str, Any]
+        A job created by jobs.expand_jobs
+
+    Returns
+    -------
+    Optional[str]
+        The log line reporting the failure, or None if there is none
+    """
+    # Imported here so that only the batch driver loads the solver stack
+    from solve import results_directory
+
+    results_dir = os.path.join(
+        results_directory(
+            job["solver"], job["subsolver"], job["strategy"], job["mode"], job["run_id"]
+        ),
+        "original",
+    )
+    parser = log_parser.MemoryFailureParser()
+    log_paths = [
+        log_parser.find_log(results_dir),
+        os.path.join(results_dir, "gurobi_solver.log"),
+        log_parser.find_log(results_dir, "output.lst"),
+    ]
+    for log_path in log_paths:
+        if log_path is None or not os.path.exists(log_path):
+            continue
+        try:
+            log_parser.feed_file(log_path, [parser])
+        except Exception as e:
+            # E.g. a compressed log cut short by the kill
+            print(f"Warning: Could not read the log {log_path}: {str(e)}")
+        if parser.line is not None:
+            return parser.line
+    return None
+
+
+def classify(outcome: Dict[str, Any], job: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Classify a job failure caused by the memory limit.
+
+    Parameters
+    ----------
+    outcome : Dict[str, Any]
+        Outcome returned by jobs.run_job, or of a worker that died without reporting
+    job : Optional[Dict[str, Any]], optional
+        The job, whose logs are searched for a failed allocation (see memory_failure),
+        by default None (only a MemoryError counts)
+
+    Returns
+    -------
+    Dict[str, Any]
+        The outcome, with status OUT_OF_MEMORY if the job failed or crashed with a
+        MemoryError or a failed allocation in its logs
+    """
+    if outcome["status"] not in ("failed", CRASHED):
+        return outcome
+    if (outcome["error"] or "").startswith("MemoryError"):
+        return {**outcome, "status": OUT_OF_MEMORY}
+    message = memory_failure(job) if job is not None else None
+    if message is not None:
+        return {**outcome, "status": OUT_OF_MEMORY, "error": f"{outcome['error']} ({message})"}
+    return outcome
+
+
+def _stopped_outcome(
+    job: Dict[str, Any], status: str, error: str, wall_time: float
+) -> Dict[str, Any]:
+    """Outcome of a job that was stopped or died without reporting."""
+    return {"job_id": jobs.job_id(job), "status": status, "error": error, "wall_time": wall_time}
+
+
+def run_supervised(
+    batch_jobs: List[Dict[str, Any]],
+    n_cores: int = 1,
+    ledger_path: Optional[str] = None,
+    memory_limit: Optional[float] = None,
+    watchdog_grace: float = WATCHDOG_GRACE,
+) -> List[Dict[str, Any]]:
+    """
+    Run every job in its own supervised process, within the core budget.
+
+    A watchdog stops jobs that run longer than job_deadline (e.g. a solver that hangs
+    or ignores its time limit), and the freed slot goes to the next job right away.
+    Stopped and dead jobs are classified as TIMEOUT, OUT_OF_MEMORY (a MemoryError or a
+    failed allocation in the solver log, see classify) or CRASHED (including workers
+    killed by a signal, e.g. by the OS out-of-memory killer, which cannot be told apart),
+    recorded as failed in the ledger and, with the bounds parsed from their output
+    logs, in the results store. Unlike the pool of jobs.run_jobs, workers do not outlive
+    their job, so model templates and persistent solver sessions are not shared between
+    jobs.
+
+    Parameters
+    ----------
+    batch_jobs : List[Dict[str, Any]]
+        Jobs created by jobs.expand_jobs
+    n_cores : int, optional
+        Number of cores the batch may use, by default 1
+    ledger_path : Optional[str], optional
+        Job ledger recording when each job starts and how it ends, by default None
+    memory_limit : Optional[float], optional
+        Address space limit per job in GB, by default None (no limit)
+    watchdog_grace : float, optional
+        Seconds a job may run beyond the time limits of its solves, by default
+        WATCHDOG_GRACE
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        The outcome of every job, in completion order
+    """
+    max_workers = max(1, n_cores // jobs.THREADS_PER_JOB)
+    pending = list(batch_jobs)
+    print(f"Running {len(pending)} supervised jobs on {max_workers} workers")
+    # Spawned workers start without inherited solver state (e.g. license environments)
+    context = multiprocessing.get_context("spawn")
+    outcomes = context.Queue()
+    running: Dict[str, Dict[str, Any]] = {}
+    results: List[Dict[str, Any]] = []
+
+    def finish(current_id: str, outcome: Dict[str, Any]) -> None:
+        entry = running.pop(current_id)
+        entry["process"].join()
+        outcome = classify(outcome, entry["job"])
+        if outcome["status"] not in ("done", "failed"):
+            if ledger_path is not None:
+                ledger.record_job(
+                    ledger_path,
+                    current_id,
+                    ledger.FAILED,
+                    f"{outcome['status']}: {outcome['error']}",
+                )
+            record_partial(
+                entry["job"], time.time() - entry["start"], entry["since"], outcome["status"]
+            )
+        else:
+            jobs.record_outcome(outcome, ledger_path)
+        results.append(outcome)
+        print(f"Finished job {len(results)}/{len(batch_jobs)}: {current_id} ({outcome['status']})")
+
+    def dispatch(outcome: Dict[str, Any]) -> None:
+        # Outcomes of jobs stopped by the watchdog that finished just in time are dropped
+        if outcome["job_id"] in running:
+            finish(outcome["job_id"], outcome)
+
+    while pending or running:
+        while pending and len(running) < max_workers:
+            job = pending.pop(0)
+            process = context.Process(
+                target=worker, args=(job, ledger_path, outcomes, memory_limit)
+            )
+            process.start()
+            running[jobs.job_id(job)] = {
+                "job": job,
+                "process": process,
+                "start": time.time(),
+                "since": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "deadline": time.time() + job_deadline(job, watchdog_grace),
+            }
+
+        timeout = min(
+            [POLL_INTERVAL, *(entry["deadline"] - time.time() for entry in running.values())]
+        )
+        try:
+            dispatch(outcomes.get(timeout=max(0.0, timeout)))
+            continue
+        except queue.Empty:
+            pass
+        # Outcomes of workers that exited since are in the queue by now
+        while True:
+            try:
+                dispatch(outcomes.get_nowait())
+            except queue.Empty:
+                break
+
+        now = time.time()
+        for current_id, entry in list(running.items()):
+            job, process = entry["job"], entry["process"]
+            wall_time = now - entry["start"]
+            if process.exitcode is not None:
+                # Died without reporting. A SIGKILL may come from the OS out-of-memory
+                # killer, but also from elsewhere, so it is not taken as out of memory
+                error = f"Worker exited with code {process.exitcode}"
+                if process.exitcode == -signal.SIGKILL:
+                    error += " (killed by SIGKILL, e.g. by the OS out-of-memory killer)"
+                finish(current_id, _stopped_outcome(job, CRASHED, error, wall_time))
+            elif now >= entry["deadline"]:
+                print(f"Watchdog: stopping job {current_id} after {wall_time:.0f} seconds")
+                terminate([process])
+                error = f"Stopped by the watchdog after {wall_time:.0f} seconds"
+                finish(current_id, _stopped_outcome(job, TIMEOUT, error, wall_time))
+
+    return results
@@ -0,0 +1,205 @@
+from typing import Callable, Dict
+
+import pyomo.environ as pyo
+import pyomo.gdp as gdp
+
+# Scheme used when a model does not record one (build_model's original constraints)
+DEFAULT_SCHEME = "first_coordinate"
+
+# Components added by the schemes, removed again when a model switches schemes
+SCHEME_COMPONENTS = ["symmetry_breaking", "lexicographic_order", "point_order"]
+
+# Schemes under which the first center coordinates are non-decreasing in k
+FIRST_COORDINATE_ORDERED = ["first_coordinate", "lexicographic"]
+
+# Least difference of the first differing center coordinate in the lexicographic scheme
+LEXICOGRAPHIC_EPS = 1e-6
+
+
+def first_coordinate(model: pyo.ConcreteModel) -> None:
+    """
+    Order the clusters by the first center coordinate: c_{k-1,1} <= c_{k,1}.
+
+    Parameters
+    ----------
+    model : pyo.ConcreteModel
+        A model created by k_means.build_model
+    """
+
+    def symmetry_breaking_rule(model, k):
+        if k == 1:
+            return pyo.Constraint.Skip
+        return model.center_coordinates[k - 1, 1] <= model.center_coordinates[k, 1]
+
+    model.symmetry_breaking = pyo.Constraint(model.clusters, rule=symmetry_breaking_rule)
+
+
+def lexicographic(model: pyo.ConcreteModel) -> None:
+    """
+    Order the clusters lexicographically by their centers: c_{k-1} <=_lex c_k.
+
+    The ordering of each pair of consecutive clusters is a disjunction over the
+    dimensions j: the centers are equal in the dimensions before j and
+    c_{k-1,j} + LEXICOGRAPHIC_EPS <= c_{k,j}, or c_{k-1,j} <= c_{k,j} in the last
+    dimension. The strict comparisons make the disjuncts exclusive, so unlike the
+    first-coordinate ordering clusters whose first coordinates tie are ordered by the
+    next coordinates. Centers whose first differing coordinates are closer than
+    LEXICOGRAPHIC_EPS are cut off. The disjunctions are reformulated by the same
+    strategy as the assignment disjunctions.
+
+    Parameters
+    ----------
+    model : pyo.ConcreteModel
+        A model created by k_means.build_model
+    """
+    dimensions = list(model.dimensions)
+
+    def lexicographic_rule(model, k):
+        if k == 1:
+            return gdp.Disjunction.Skip
+        c = model.center_coordinates
+        last = len(dimensions) - 1
+        return [
+            [c[k - 1, j_prev] == c[k, j_prev] for j_prev in dimensions[:position]]
+            + [c[k - 1, j] + (0 if position == last else LEXICOGRAPHIC_EPS) <= c[k, j]]
+            for position, j in enumerate(dimensions)
+        ]
+
+    model.lexicographic_order = gdp.Disjunction(model.clusters, rule=lexicographic_rule)
+
+
+def _fix_assignment(disjunct: gdp.Disjunct, value: bool) -> None:
+    """Fix the indicator variables of an assignment disjunct."""
+    disjunct.indicator_var.fix(value)
+    disjunct.binary_indicator_var.fix(1 if value else 0)
+
+
+def assignment(model: pyo.ConcreteModel) -> None:
+    """
+    Label the clusters by their first point: point 1 is in cluster 1, point 2 in
+    cluster 1 or 2 and in general point i in one of the clusters 1..i.
+
+    The scheme only fixes indicator variables, so the transformations drop the fixed
+    disjuncts instead of reformulating them.
+
+    Parameters
+    ----------
+    model : pyo.ConcreteModel
+        A model created by k_means.build_model
+    """
+    for position, i in enumerate(model.points, start=1):
+        for k in model.clusters:
+            if k > position:
+                _fix_assignment(model.disjunct_blocks[k, i], False)
+        if position == 1:
+            _fix_assignment(model.disjunct_blocks[1, i], True)
+
+
+def point_order(model: pyo.ConcreteModel) -> None:
+    """
+    Order the clusters by their first point (orbitopal fixing of the assignment).
+
+    On top of the assignment fixing, point i may only open cluster k if cluster k-1
+    already contains one of the points before i: y_{k,i} <= sum_{i' < i} y_{k-1,i'}.
+    The prefix sums are kept in auxiliary variables, so the scheme adds
+    O(n_points * n_clusters) nonzeros.
+
+    Parameters
+    ----------
+    model : pyo.ConcreteModel
+        A model created by k_means.build_model
+    """
+    assignment(model)
+    points = list(model.points)
+    previous_point = dict(zip(points[1:], points[:-1]))
+    y = {key: model.disjunct_blocks[key].binary_indicator_var for key in model.disjunct_blocks}
+
+    model.point_order = pyo.Block()
+    block = model.point_order
+    # members[k, i] = number of points up to i in cluster k
+    block.members = pyo.Var(model.clusters, model.points, within=pyo.NonNegativeReals)
+
+    def members_rule(block, k, i):
+        previous = block.members[k, previous_point[i]] if i in previous_point else 0
+        return block.members[k, i] == previous + y[k, i]
+
+    block.count = pyo.Constraint(model.clusters, model.points, rule=members_rule)
+
+    def order_rule(block, k, i):
+        if k == 1 or i not in previous_point:
+            return pyo.Constraint.Skip
+        return y[k, i] <= block.members[k - 1, previous_point[i]]
+
+    block.order = pyo.Constraint(model.clusters, model.points, rule=order_rule)
+
+
+def no_symmetry_breaking(model: pyo.ConcreteModel) -> None:
+    """Leave the k! symmetric labelings of every clustering in the model."""
+
+
+# Symmetry-breaking schemes selectable in k_means.build_model
+SCHEMES: Dict[str, Callable[[pyo.ConcreteModel], None]] = {
+    "none": no_symmetry_breaking,
+    "first_coordinate": first_coordinate,
+    "lexicographic": lexicographic,
+    "assignment": assignment,
+    "point_order": point_order,
+}
+
+
+def apply_scheme(model: pyo.ConcreteModel, scheme: str) -> None:
+    """
+    Add a symmetry-breaking scheme to a model and record it in model.symmetry_scheme.
+
+    Parameters
+    ----------
+    model : pyo.ConcreteModel
+        A model created by k_means.build_model, before its GDP transformation
+    scheme : str
+        One of SCHEMES
+    """
+    if scheme not in SCHEMES:
+        raise ValueError(f"Unknown symmetry-breaking scheme: {scheme}. Use one of {list(SCHEMES)}")
+    SCHEMES[scheme](model)
+    model.symmetry_scheme = pyo.Param(initialize=scheme, within=pyo.Any)
+
+
+def scheme_of(model: pyo.ConcreteModel) -> str:
+    """
+    Symmetry-breaking scheme of a model.
+
+    Parameters
+    ----------
+    model : pyo.ConcreteModel
+        A model created by k_means.build_model
+
+    Returns
+    -------
+    str
+        The recorded scheme, DEFAULT_SCHEME for models built before schemes existed
+    """
+    if model.component("symmetry_scheme") is None:
+        return DEFAULT_SCHEME
+    return pyo.value(model.symmetry_scheme)
+
+
+def set_scheme(model: pyo.ConcreteModel, scheme: str) -> None:
+    """
+    Replace the symmetry-breaking scheme of an untransformed model.
+
+    Parameters
+    ----------
+    model : pyo.ConcreteModel
+        A model created by k_means.build_model, before its GDP transformation
+    scheme : str
+        One of SCHEMES
+    """
+    if scheme_of(model) == scheme:
+        return
+    for name in SCHEME_COMPONENTS + ["symmetry_scheme"]:
+        if model.component(name) is not None:
+            model.del_component(name)
+    for disjunct in model.disjunct_blocks.values():
+        disjunct.indicator_var.unfix()
+        disjunct.binary_indicator_var.unfix()
+    apply_scheme(model, scheme)
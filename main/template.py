@@ -0,0 +1,245 @@
+import hashlib
+from typing import Any, Dict, List, Optional
+
+import direct
+import instances
+import k_means
+import numpy as np
+import phase_timing
+import pyomo.environ as pyo
+import symmetry
+
+# Reformulated models with mutable coordinates, one per model shape, kept per process
+# in least recently used order
+_templates: Dict[str, Dict[str, Any]] = {}
+
+# Templates kept per process. Data bounds and fixed assignments are part of the key, so
+# under them most instances get their own template, which must not pile up in memory
+MAX_TEMPLATES = 2
+
+
+def supports(model: pyo.ConcreteModel, strategy: str) -> bool:
+    """
+    Whether instances of a model can be solved through a reformulated template.
+
+    The GDP plugins bake the big-M values and the perspective constants into the
+    transformed constraints as numbers, so only the direct strategies (see direct.py)
+    can take new coordinates without being rebuilt. Presolve links duplicate points
+    with constraints that depend on the data, so presolved models are not supported.
+
+    Parameters
+    ----------
+    model : pyo.ConcreteModel
+        A model created by k_means.build_model, before its GDP transformation
+    strategy : str
+        Reformulation strategy
+
+    Returns
+    -------
+    bool
+        True if instance_model can serve the model
+    """
+    return direct.is_direct(strategy) and model.component("presolve") is None
+
+
+def template_key(model: pyo.ConcreteModel, strategy: str) -> str:
+    """
+    Compute the key of the template that can serve a model.
+
+    Parameters
+    ----------
+    model : pyo.ConcreteModel
+        A model created by k_means.build_model
+    strategy : str
+        A direct reformulation strategy
+
+    Returns
+    -------
+    str
+        Hex digest over the numbers of points, dimensions and clusters, the coordinate
+        range, the variable bounds, the fixed assignment indicators, the
+        symmetry-breaking scheme and the strategy. Everything except the coordinates.
+    """
+    instance = instances.instance_from_model(model)
+    digest = hashlib.sha256()
+    digest.update(repr(instance["points"].shape).encode())
+    digest.update(repr(instance["n_clusters"]).encode())
+    digest.update(repr(instance["coord_range"]).encode())
+    variable_bounds = [
+        var.bounds for var in (*model.center_coordinates.values(), *model.distance.values())
+    ]
+    digest.update(np.array(variable_bounds, dtype=float).tobytes())
+    fixed_indicators = [
+        -1 if not var.fixed else var.value
+        for var in (d.binary_indicator_var for d in model.disjunct_blocks.values())
+    ]
+    digest.update(np.array(fixed_indicators, dtype=float).tobytes())
+    digest.update(symmetry.scheme_of(model).encode())
+    digest.update(strategy.encode())
+    return digest.hexdigest()
+
+
+def build_template(model: pyo.ConcreteModel, strategy: str) -> pyo.ConcreteModel:
+    """
+    Build and reformulate a model with mutable coordinates in the shape of a given model.
+
+    Parameters
+    ----------
+    model : pyo.ConcreteModel
+        A model created by k_means.build_model, before its GDP transformation
+    strategy : str
+        A direct reformulation strategy
+
+    Returns
+    -------
+    pyo.ConcreteModel
+        The reformulated template, holding the coordinates of the given model
+    """
+    instance = instances.instance_from_model(model)
+    n_points, n_dimensions = instance["points"].shape
+    template = k_means.build_model(
+        n_dimensions=n_dimensions,
+        n_clusters=instance["n_clusters"],
+        n_points=n_points,
+        coord_range=instance["coord_range"],
+        points=instance["points"],
+        symmetry_scheme=symmetry.scheme_of(model),
+        mutable=True,
+    )
+    # Bounds and fixed assignments as in the given model (e.g. data bounds)
+    for component in ("center_coordinates", "distance"):
+        for index, var in model.component(component).items():
+            template.component(component)[index].setlb(var.lb)
+            template.component(component)[index].setub(var.ub)
+    for index, disjunct in model.disjunct_blocks.items():
+        for name in ("indicator_var", "binary_indicator_var"):
+            var = disjunct.component(name)
+            if var.fixed:
+                template.disjunct_blocks[index].component(name).fix(var.value)
+    direct.apply(template, strategy)
+    return template
+
+
+def set_coordinates(template: pyo.ConcreteModel, np_points: np.ndarray) -> None:
+    """
+    Swap new coordinates into a template and reset the values of its free variables.
+
+    Parameters
+    ----------
+    template : pyo.ConcreteModel
+        A template from build_template
+    np_points : np.ndarray
+        Point coordinates of shape (n_points, n_dimensions)
+    """
+    template.points_coordinates.store_values(k_means.coordinates_to_dict(np_points))
+    direct.update_parameters(template)
+    # The previous solution is no starting point for the new instance
+    for var in template.component_data_objects(pyo.Var, descend_into=True):
+        if not var.fixed:
+            var.set_value(None)
+
+
+def instance_model(
+    model: pyo.ConcreteModel, strategy: str, timings: Optional[Dict[str, float]] = None
+) -> pyo.ConcreteModel:
+    """
+    Return the reformulated template for a model, holding the model's coordinates.
+
+    The first model of a shape builds and reformulates the template; later models of
+    the same shape only update its coordinate and big-M/norm Params. The returned
+    model is shared by all instances of the shape, so it is only valid until the next
+    call for that shape. Templates are kept per process, so parallel batch jobs reuse
+    them within each worker; only the MAX_TEMPLATES most recently used are kept.
+
+    Parameters
+    ----------
+    model : pyo.ConcreteModel
+        A model created by k_means.build_model, before its GDP transformation (left
+        unchanged)
+    strategy : str
+        A direct reformulation strategy, see supports
+    timings : Optional[Dict[str, float]], optional
+        Phase timings receiving "transformation" when the template is built and
+        "template_update" when it is reused, by default None
+
+    Returns
+    -------
+    pyo.ConcreteModel
+        The reformulated template
+    """
+    if not supports(model, strategy):
+        raise ValueError(f"Strategy {strategy} cannot be served by a template for this model")
+    key = template_key(model, strategy)
+    record = _templates.get(key)
+    if record is None:
+        with phase_timing.timed(timings, "transformation"):
+            template = build_template(model, strategy)
+        _templates[key] = {"model": template, "generation": 0}
+        while len(_templates) > MAX_TEMPLATES:
+            del _templates[next(iter(_templates))]
+        print(f"Built model template ({strategy})")
+        return template
+
+    # Move the template to the most recently used end
+    _templates[key] = _templates.pop(key)
+    with phase_timing.timed(timings, "template_update"):
+        set_coordinates(record["model"], instances.instance_from_model(model)["points"])
+        record["generation"] += 1
+    print(f"Updated model template ({strategy}) with new coordinates")
+    return record["model"]
+
+
+def _record_of(model: pyo.ConcreteModel) -> Optional[Dict[str, Any]]:
+    """Template record holding a model, if the model is a template."""
+    for record in _templates.values():
+        if record["model"] is model:
+            return record
+    return None
+
+
+def generation(model: pyo.ConcreteModel) -> Optional[int]:
+    """
+    Number of coordinate updates of a template.
+
+    Parameters
+    ----------
+    model : pyo.ConcreteModel
+        Any model
+
+    Returns
+    -------
+    Optional[int]
+        0 for a new template, incremented by every instance_model update; None if the
+        model is not a template of this process
+    """
+    record = _record_of(model)
+    return None if record is None else record["generation"]
+
+
+def coordinate_constraints(model: pyo.ConcreteModel) -> List[Any]:
+    """
+    Constraints of a template whose coefficients depend on the coordinates.
+
+    These are the distance_cut rows of direct.bigm and the perspective rows of
+    direct.hull; a persistent solver holding the template replaces them after an
+    update (see solver_session.load).
+
+    Parameters
+    ----------
+    model : pyo.ConcreteModel
+        A template
+
+    Returns
+    -------
+    List[Any]
+        The constraint data objects
+    """
+    constraints: List[Any] = []
+    for block_name, constraint_name in (
+        ("direct_bigm", "distance_cut"),
+        ("direct_hull", "perspective"),
+    ):
+        block = model.component(block_name)
+        if block is not None:
+            constraints.extend(block.component(constraint_name).values())
+    return constraints
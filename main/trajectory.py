@@ -0,0 +1,418 @@
+import math
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+import log_parser
+import numpy as np
+
+# File holding the trajectory of a run, next to its output log
+TRAJECTORY_FILE = "trajectory.npz"
+
+# Columns of a trajectory array
+COLUMNS = ("time", "incumbent", "bound", "nodes")
+
+# Solvers print "infinite" bounds as huge numbers (SCIP 1e20, BARON 1e51)
+INFINITY = 1e20
+
+_GUROBI_ROW = re.compile(
+    r"^\s*[H*]?\s*(\d+)\+?\s+\d+\+?\s.*?(\S+)\s+(\S+)\s+(\S+)\s+(\S+)\s+(\d+)s\s*$"
+)
+_GUROBI_HEURISTIC = re.compile(r"Found heuristic solution: objective\s+(\S+)")
+_GUROBI_ROOT = re.compile(r"Root relaxation: objective\s+(\S+?),.*?([\d.]+) seconds")
+_GUROBI_EXPLORED = re.compile(r"Explored (\d+) nodes? .*? in ([\d.]+) seconds")
+_GUROBI_FINAL = re.compile(r"[Bb]est objective\s+([^,]+),\s*best bound\s+([^,]+),")
+
+_SCIP_TIME = re.compile(r"([\d.]+)([smh])")
+_SCIP_FINAL = {
+    "time": re.compile(r"Solving Time \(sec\)\s*:\s*(\S+)"),
+    "nodes": re.compile(r"Solving Nodes\s*:\s*(\d+)"),
+    "incumbent": re.compile(r"Primal Bound\s*:\s*(\S+)"),
+    "bound": re.compile(r"Dual Bound\s*:\s*(\S+)"),
+}
+
+_BARON_ROW = re.compile(r"^\s*\*?\s*(\d+)\+?\s+([\d.]+)\s+\S+B\s+(\S+)\s+(\S+)\s+[-\d.]+%\s*$")
+_BARON_FINAL = {
+    "time": re.compile(r"Wall clock time:\s*(\S+)"),
+    "nodes": re.compile(r"Total no\. of BaR iterations:\s*(\d+)"),
+    "incumbent": re.compile(r"Best solution\s*=\s*(\S+)"),
+    "bound": re.compile(r"Best possible\s*=\s*(\S+)"),
+}
+
+_BNB_SUBPROBLEM = re.compile(r"Subproblem \d+/\d+: objective (\S+), nodes (\d+), time ([\d.]+)s")
+_BNB_EXPLORED = re.compile(r"Explored (\d+) nodes? in ([\d.]+) seconds")
+_BNB_FINAL = re.compile(r"Best objective\s+(\S+), best bound\s+(\S+)")
+
+_SCIP_UNITS = {"s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def _to_float(token: str) -> float:
+    """Convert a log token to a float, nan for missing ("-", "--") or infinite values."""
+    try:
+        value = float(token.rstrip("%"))
+    except ValueError:
+        return math.nan
+    return value if abs(value) < INFINITY else math.nan
+
+
+class TrajectoryParser:
+    """
+    Collect the (time, incumbent, bound, nodes) trajectory from a Gurobi, SCIP, BARON or
+    branch-and-bound (branch_and_bound.py) log.
+
+    A point is recorded whenever the incumbent or the bound changes, which keeps the
+    trajectory compact even for logs with millions of node lines. Attach the parser to
+    a log_capture.LogStream, or feed it a finished log with log_parser.feed_file.
+    """
+
+    def __init__(self, solver: str, subsolver: Optional[str] = None):
+        self.family = log_parser.solver_family(solver, subsolver)
+        self.points: List[List[float]] = []
+        self._state = [0.0, math.nan, math.nan, math.nan]
+        self._scip_columns: Optional[Dict[str, int]] = None
+        self._baron_table = False
+
+    def _update(
+        self,
+        time: Optional[float] = None,
+        incumbent: Optional[float] = None,
+        bound: Optional[float] = None,
+        nodes: Optional[float] = None,
+    ) -> None:
+        """Update the solver state and record a point if incumbent or bound changed."""
+        state = self._state
+        if time is not None and not math.isnan(time):
+            state[0] = max(state[0], time)
+        if nodes is not None and not math.isnan(nodes):
+            state[3] = nodes
+
+        changed = False
+        for index, value in ((1, incumbent), (2, bound)):
+            if value is not None and not math.isnan(value) and value != state[index]:
+                state[index] = value
+                changed = True
+        if changed:
+            self.points.append(list(state))
+
+    def feed_block(self, block: str) -> None:
+        """
+        Parse a block of lines of the log.
+
+        Parameters
+        ----------
+        block : str
+            One or more lines
+        """
+        for line in block.splitlines():
+            self.feed(line)
+
+    def feed(self, line: str) -> None:
+        """
+        Parse one line of the log.
+
+        Parameters
+        ----------
+        line : str
+            The line
+        """
+        if self.family == "gurobi":
+            self._feed_gurobi(line)
+        elif self.family == "scip":
+            self._feed_scip(line)
+        elif self.family == "baron":
+            self._feed_baron(line)
+        elif self.family == "bnb":
+            self._feed_bnb(line)
+
+    def _feed_gurobi(self, line: str) -> None:
+        """Parse a line of a Gurobi log (direct or through GAMS)."""
+        row = _GUROBI_ROW.match(line)
+        if row:
+            nodes, incumbent, bound, _, _, time = row.groups()
+            self._update(float(time), _to_float(incumbent), _to_float(bound), float(nodes))
+            return
+
+        if "heuristic solution" in line:
+            match = _GUROBI_HEURISTIC.search(line)
+            if match:
+                self._update(incumbent=_to_float(match.group(1)))
+        elif "Root relaxation: objective" in line:
+            match = _GUROBI_ROOT.search(line)
+            if match:
+                self._update(time=float(match.group(2)), bound=_to_float(match.group(1)))
+        elif "Explored" in line:
+            match = _GUROBI_EXPLORED.search(line)
+            if match:
+                self._update(time=float(match.group(2)), nodes=float(match.group(1)))
+        elif "est objective" in line:
+            match = _GUROBI_FINAL.search(line)
+            if match:
+                self._update(incumbent=_to_float(match.group(1)), bound=_to_float(match.group(2)))
+
+    def _feed_scip(self, line: str) -> None:
+        """Parse a line of a SCIP log (direct or through GAMS)."""
+        if "|" in line:
+            cells = [cell.strip() for cell in line.split("|")]
+            if "dualbound" in cells and "primalbound" in cells:
+                self._scip_columns = {name: index for index, name in enumerate(cells)}
+                return
+            columns = self._scip_columns
+            if columns is None or len(cells) != len(columns):
+                return
+            time = _SCIP_TIME.search(cells[columns["time"]])
+            if time is None:
+                return
+            self._update(
+                float(time.group(1)) * _SCIP_UNITS[time.group(2)],
+                _to_float(cells[columns["primalbound"]]),
+                _to_float(cells[columns["dualbound"]]),
+                _to_float(cells[columns["node"]]) if "node" in columns else None,
+            )
+            return
+
+        for key, pattern in _SCIP_FINAL.items():
+            match = pattern.search(line)
+            if match:
+                self._update(**{key: _to_float(match.group(1))})
+                return
+
+    def _feed_baron(self, line: str) -> None:
+        """Parse a line of a BARON log (through GAMS)."""
+        if "Lower bound" in line and "Upper bound" in line:
+            self._baron_table = True
+            return
+        if self._baron_table:
+            row = _BARON_ROW.match(line)
+            if row:
+                nodes, time, lower, upper = row.groups()
+                self._update(float(time), _to_float(upper), _to_float(lower), float(nodes))
+                return
+
+        for key, pattern in _BARON_FINAL.items():
+            match = pattern.search(line)
+            if match:
+                self._update(**{key: _to_float(match.group(1))})
+                return
+
+    def _feed_bnb(self, line: str) -> None:
+        """Parse a line of the log of branch_and_bound.solve_instance."""
+        if line.startswith("Subproblem"):
+            # The optimum of a subproblem bounds the whole problem
+            match = _BNB_SUBPROBLEM.search(line)
+            if match:
+                bound, nodes, time = match.groups()
+                self._update(float(time), bound=_to_float(bound), nodes=float(nodes))
+        elif "heuristic solution" in line:
+            match = _GUROBI_HEURISTIC.search(line)
+            if match:
+                self._update(incumbent=_to_float(match.group(1)))
+        elif line.startswith("Explored"):
+            match = _BNB_EXPLORED.search(line)
+            if match:
+                self._update(time=float(match.group(2)), nodes=float(match.group(1)))
+        elif line.startswith("Best objective"):
+            match = _BNB_FINAL.search(line)
+            if match:
+                self._update(incumbent=_to_float(match.group(1)), bound=_to_float(match.group(2)))
+
+    def trajectory(self) -> np.ndarray:
+        """
+        Return the trajectory recorded so far.
+
+        The last row carries the final solver state (e.g. the total solve time from the
+        summary lines), so the trajectory spans the whole run.
+
+        Returns
+        -------
+        np.ndarray
+            Array of shape (n, 4) with columns COLUMNS; nan where a value is unknown
+        """
+        points = list(self.points)
+        if points and points[-1] != self._state:
+            points.append(list(self._state))
+        return np.array(points, dtype=float).reshape(-1, len(COLUMNS))
+
+
+def save_trajectory(results_dir: str, points: np.ndarray) -> str:
+    """
+    Save a trajectory to the run directory.
+
+    Parameters
+    ----------
+    results_dir : str
+        Run directory
+    points : np.ndarray
+        Trajectory from TrajectoryParser.trajectory
+
+    Returns
+    -------
+    str
+        Path to the saved file
+    """
+    file_path = os.path.join(results_dir, TRAJECTORY_FILE)
+    with open(file_path, "wb") as f:
+        np.savez_compressed(f, points=points, columns=np.array(COLUMNS))
+    return file_path
+
+
+def load_trajectory(results_dir: str) -> Optional[np.ndarray]:
+    """
+    Load the trajectory of a run.
+
+    Parameters
+    ----------
+    results_dir : str
+        Run directory
+
+    Returns
+    -------
+    Optional[np.ndarray]
+        The trajectory, or None if the run has none
+    """
+    file_path = os.path.join(results_dir, TRAJECTORY_FILE)
+    if not os.path.exists(file_path):
+        return None
+    with np.load(file_path) as data:
+        return data["points"]
+
+
+def relative_gap(value: np.ndarray, reference: np.ndarray) -> np.ndarray:
+    """
+    Gap function of Berthold (2013) used by the primal and dual integrals.
+
+    Parameters
+    ----------
+    value : np.ndarray
+        Incumbents or bounds (nan where none is known)
+    reference : np.ndarray
+        Values to compare against (nan where none is known)
+
+    Returns
+    -------
+    np.ndarray
+        0 if both are equal, 1 if either is unknown or their signs differ, otherwise
+        |value - reference| / max(|value|, |reference|)
+    """
+    value = np.asarray(value, dtype=float)
+    reference = np.broadcast_to(np.asarray(reference, dtype=float), value.shape)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gap = np.abs(value - reference) / np.maximum(np.abs(value), np.abs(reference))
+    gap = np.where(value == reference, 0.0, gap)
+    gap = np.where(np.isnan(value) | np.isnan(reference) | (value * reference < 0), 1.0, gap)
+    return gap
+
+
+def _integrate(times: np.ndarray, gaps: np.ndarray, end_time: float) -> float:
+    """Integrate a step function that is 1 before times[0] and gaps[i] from times[i] on."""
+    if len(times) == 0:
+        return end_time
+    times = np.minimum(times, end_time)
+    widths = np.diff(np.append(times, end_time))
+    return float(times[0] + np.sum(gaps * widths))
+
+
+def final_incumbent(points: np.ndarray) -> Optional[float]:
+    """
+    Last incumbent of a trajectory.
+
+    Parameters
+    ----------
+    points : np.ndarray
+        Trajectory with columns COLUMNS
+
+    Returns
+    -------
+    Optional[float]
+        The final incumbent, or None if the run found none
+    """
+    incumbents = np.asarray(points, dtype=float).reshape(-1, len(COLUMNS))[:, 1]
+    known = incumbents[~np.isnan(incumbents)]
+    return float(known[-1]) if len(known) else None
+
+
+def integrals(
+    points: np.ndarray,
+    reference: Optional[float] = None,
+    end_time: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Compute the primal, dual and primal-dual integrals of a trajectory.
+
+    The primal (dual) integral integrates the gap between the incumbent (bound) and a
+    reference objective value over time; the primal-dual integral integrates the gap
+    between incumbent and bound and needs no reference. All three are in seconds: a run
+    that finds and proves the optimum immediately scores 0, a run without any
+    incumbent/bound scores end_time.
+
+    Parameters
+    ----------
+    points : np.ndarray
+        Trajectory with columns COLUMNS
+    reference : Optional[float], optional
+        Optimal or best known objective value, by default None (the final incumbent
+        of the run). Use the same reference for all runs being compared.
+    end_time : Optional[float], optional
+        Time up to which to integrate, by default None (the end of the trajectory).
+        Use the time limit to compare runs that stopped at different times.
+
+    Returns
+    -------
+    Dict[str, Any]
+        Dictionary with primal_integral, dual_integral, primal_dual_integral, the
+        reference used and end_time
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, len(COLUMNS))
+    times, incumbents, bounds = points[:, 0], points[:, 1], points[:, 2]
+
+    if reference is None:
+        reference = final_incumbent(points)
+    if end_time is None:
+        end_time = float(times[-1]) if len(times) else 0.0
+
+    ref = math.nan if reference is None else reference
+    return {
+        "primal_integral": _integrate(times, relative_gap(incumbents, ref), end_time),
+        "dual_integral": _integrate(times, relative_gap(bounds, ref), end_time),
+        "primal_dual_integral": _integrate(times, relative_gap(incumbents, bounds), end_time),
+        "integral_reference": reference,
+        "integral_end_time": end_time,
+    }
+
+
+def compare_runs(
+    results_dirs: List[str], end_time: Optional[float] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Compute the integrals of several runs on the same instance with a shared reference.
+
+    The reference is the best (lowest) final incumbent over all runs, so e.g. runs with
+    gdp.hull_exact, gdp.hull and gdp.bigm are measured against the same value.
+
+    Parameters
+    ----------
+    results_dirs : List[str]
+        Run directories containing trajectories
+    end_time : Optional[float], optional
+        Common integration horizon, by default None (the longest run)
+
+    Returns
+    -------
+    Dict[str, Dict[str, Any]]
+        The integrals per run directory (runs without trajectory are left out)
+    """
+    trajectories = {}
+    for results_dir in results_dirs:
+        points = load_trajectory(results_dir)
+        if points is not None and len(points):
+            trajectories[results_dir] = points
+
+    known = [final_incumbent(p) for p in trajectories.values()]
+    known = [value for value in known if value is not None]
+    reference = min(known) if known else None
+    if end_time is None and trajectories:
+        end_time = max(float(p[-1, 0]) for p in trajectories.values())
+
+    return {
+        results_dir: integrals(points, reference, end_time)
+        for results_dir, points in trajectories.items()
+    }
@@ -0,0 +1,364 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import direct
+import instances
+import numpy as np
+import pyomo.environ as pyo
+import pyomo.gdp as gdp
+import symmetry
+from pyomo.common.collections import ComponentSet
+from pyomo.core.expr.visitor import identify_variables
+from pyomo.util.calc_var_value import calculate_variable_from_constraint
+
+
+def kmeans_plus_plus(points: np.ndarray, n_clusters: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Choose initial centers with the k-means++ seeding.
+
+    Parameters
+    ----------
+    points : np.ndarray
+        Point coordinates of shape (n_points, n_dimensions)
+    n_clusters : int
+        Number of clusters
+    rng : np.random.Generator
+        Random generator used for the sampling
+
+    Returns
+    -------
+    np.ndarray
+        Centers of shape (n_clusters, n_dimensions)
+    """
+    n_points = len(points)
+    centers = np.empty((n_clusters, points.shape[1]))
+    centers[0] = points[rng.integers(n_points)]
+    closest = ((points - centers[0]) ** 2).sum(axis=1)
+    for k in range(1, n_clusters):
+        total = closest.sum()
+        if total > 0:
+            index = rng.choice(n_points, p=closest / total)
+        else:
+            # Fewer distinct points than clusters
+            index = rng.integers(n_points)
+        centers[k] = points[index]
+        closest = np.minimum(closest, ((points - centers[k]) ** 2).sum(axis=1))
+    return centers
+
+
+def lloyd(
+    points: np.ndarray, centers: np.ndarray, max_iter: int = 100
+) -> Tuple[np.ndarray, np.ndarray, float]:
+    """
+    Improve centers with Lloyd's algorithm until the assignment no longer changes.
+
+    An empty cluster is moved to the point farthest from its current center.
+
+    Parameters
+    ----------
+    points : np.ndarray
+        Point coordinates of shape (n_points, n_dimensions)
+    centers : np.ndarray
+        Initial centers of shape (n_clusters, n_dimensions)
+    max_iter : int, optional
+        Maximum number of iterations, by default 100
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray, float]
+        Centers, cluster of every point (0-based) and the sum of squared distances
+    """
+    centers = centers.copy()
+    n_clusters = len(centers)
+    assignment = None
+    for _ in range(max_iter):
+        distances = ((points[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+        new_assignment = distances.argmin(axis=1)
+        if assignment is not None and np.array_equal(new_assignment, assignment):
+            break
+        assignment = new_assignment
+        closest = distances[np.arange(len(points)), assignment]
+        for k in range(n_clusters):
+            members = assignment == k
+            if members.any():
+                centers[k] = points[members].mean(axis=0)
+            else:
+                farthest = closest.argmax()
+                centers[k] = points[farthest]
+                closest[farthest] = 0.0
+
+    distances = ((points[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+    assignment = distances.argmin(axis=1)
+    sse = float(distances[np.arange(len(points)), assignment].sum())
+    return centers, assignment, sse
+
+
+def compute_warm_start(
+    points: np.ndarray,
+    n_clusters: int,
+    n_init: int = 10,
+    seed: Optional[int] = 0,
+    symmetry_scheme: str = symmetry.DEFAULT_SCHEME,
+) -> Dict[str, Any]:
+    """
+    Cluster the points with k-means++ and Lloyd's algorithm, keeping the best restart.
+
+    The clusters are labeled so the start satisfies the symmetry-breaking scheme of the
+    model: lexicographically by center for the center orderings, by their first point
+    for the assignment-based schemes.
+
+    Parameters
+    ----------
+    points : np.ndarray
+        Point coordinates of shape (n_points, n_dimensions)
+    n_clusters : int
+        Number of clusters
+    n_init : int, optional
+        Number of k-means++ restarts, by default 10
+    seed : Optional[int], optional
+        Seed of the random generator, by default 0
+    symmetry_scheme : str, optional
+        Symmetry-breaking scheme of the model, by default symmetry.DEFAULT_SCHEME
+
+    Returns
+    -------
+    Dict[str, Any]
+        Dictionary with centers, assignment (0-based cluster per point), distances
+        (squared distance of every point to its center) and objective
+    """
+    points = np.asarray(points, dtype=float)
+    rng = np.random.default_rng(seed)
+    best = None
+    for _ in range(n_init):
+        candidate = lloyd(points, kmeans_plus_plus(points, n_clusters, rng))
+        if best is None or candidate[2] < best[2]:
+            best = candidate
+    centers, assignment, _ = best
+    return label_clusters(points, centers, assignment, symmetry_scheme)
+
+
+def label_clusters(
+    points: np.ndarray,
+    centers: np.ndarray,
+    assignment: np.ndarray,
+    symmetry_scheme: str = symmetry.DEFAULT_SCHEME,
+) -> Dict[str, Any]:
+    """
+    Label the clusters of a clustering so it satisfies a symmetry-breaking scheme.
+
+    Lexicographically by center for the center orderings, by their first point for the
+    assignment-based schemes.
+
+    Parameters
+    ----------
+    points : np.ndarray
+        Point coordinates of shape (n_points, n_dimensions)
+    centers : np.ndarray
+        Centers of shape (n_clusters, n_dimensions)
+    assignment : np.ndarray
+        Cluster of every point (0-based)
+    symmetry_scheme : str, optional
+        Symmetry-breaking scheme of the model, by default symmetry.DEFAULT_SCHEME
+
+    Returns
+    -------
+    Dict[str, Any]
+        Dictionary with centers, assignment, distances and objective, see
+        compute_warm_start
+    """
+    n_clusters = len(centers)
+    if symmetry_scheme in ("assignment", "point_order"):
+        # Clusters in order of their first point; empty clusters last
+        first_point = [
+            np.flatnonzero(assignment == k)[0] if (assignment == k).any() else len(points)
+            for k in range(n_clusters)
+        ]
+        order = np.argsort(first_point, kind="stable")
+    else:
+        # Lexicographic order, which is also ordered by the first coordinate
+        order = np.lexsort(centers.T[::-1])
+    centers = centers[order]
+    assignment = np.argsort(order)[assignment]
+    distances = ((points - centers[assignment]) ** 2).sum(axis=1)
+
+    return {
+        "centers": centers,
+        "assignment": assignment,
+        "distances": distances,
+        "objective": float(distances.sum()),
+    }
+
+
+def warm_start_from_model(
+    model: pyo.ConcreteModel, n_init: int = 10, seed: Optional[int] = 0
+) -> Dict[str, Any]:
+    """
+    Compute the warm start for the instance behind a k-means model.
+
+    Parameters
+    ----------
+    model : pyo.ConcreteModel
+        A model created by k_means.build_model
+    n_init : int, optional
+        Number of k-means++ restarts, by default 10
+    seed : Optional[int], optional
+        Seed of the random generator, by default 0
+
+    Returns
+    -------
+    Dict[str, Any]
+        The warm start, see compute_warm_start
+    """
+    instance = instances.instance_from_model(model)
+    return compute_warm_start(
+        instance["points"], instance["n_clusters"], n_init, seed, symmetry.scheme_of(model)
+    )
+
+
+def _set_value(var: Any, value: float) -> None:
+    """Set a variable value, clipped to its bounds."""
+    if var.lb is not None:
+        value = max(value, var.lb)
+    if var.ub is not None:
+        value = min(value, var.ub)
+    var.set_value(value, skip_validation=True)
+
+
+def apply_warm_start(model: pyo.ConcreteModel, start: Dict[str, Any], strategy: str) -> None:
+    """
+    Set the warm start as the initial values of a (transformed) k-means model.
+
+    Centers, distances and the assignment indicator variables are set, and any other
+    disjunction takes its first disjunct that holds at these values. For hull
+    reformulations (gdp.hull* and direct.hull*) the disaggregated copies of the centers
+    and distances are set as well where the transformation exposes them, and auxiliary
+    variables defined by an equality are computed from it. Anything still unset is left
+    for the solver to complete from the assignment.
+
+    Parameters
+    ----------
+    model : pyo.ConcreteModel
+        A model created by k_means.build_model, before or after its GDP transformation
+    start : Dict[str, Any]
+        Warm start from compute_warm_start
+    strategy : str
+        Reformulation strategy applied to the model
+    """
+    centers, assignment, distances = start["centers"], start["assignment"], start["distances"]
+
+    for k in model.clusters:
+        for j in model.dimensions:
+            _set_value(model.center_coordinates[k, j], float(centers[k - 1, j - 1]))
+    for i in model.points:
+        _set_value(model.distance[i], float(distances[i - 1]))
+
+    for k in model.clusters:
+        for i in model.points:
+            active = int(assignment[i - 1]) == k - 1
+            disjunct = model.disjunct_blocks[k, i]
+            disjunct.indicator_var.set_value(active)
+            disjunct.binary_indicator_var.set_value(1 if active else 0)
+
+    # Further disjunctions (e.g. symmetry.lexicographic) take their first satisfied disjunct
+    _select_satisfied_disjuncts(model)
+
+    if strategy.startswith(("gdp.hull", "direct.hull")):
+        _set_disaggregated_vars(model, strategy)
+    _complete_from_equalities(model)
+
+
+def _disjunct_constraints(disjunct: gdp.Disjunct) -> List[Any]:
+    """Original constraints of a disjunct (deactivated once it is transformed)."""
+    return list(disjunct.component_data_objects(pyo.Constraint, active=None))
+
+
+def _select_satisfied_disjuncts(model: pyo.ConcreteModel) -> None:
+    """Select the first disjunct whose constraints hold in disjunctions without values."""
+    for disjunction in model.component_data_objects(gdp.Disjunction, active=None):
+        if any(d.binary_indicator_var.value is not None for d in disjunction.disjuncts):
+            continue
+        selected = None
+        for disjunct in disjunction.disjuncts:
+            satisfied = True
+            for constraint in _disjunct_constraints(disjunct):
+                body = pyo.value(constraint.body, exception=False)
+                lower, upper = constraint.lower, constraint.upper
+                if (
+                    body is None
+                    or (lower is not None and body < pyo.value(lower) - 1e-9)
+                    or (upper is not None and body > pyo.value(upper) + 1e-9)
+                ):
+                    satisfied = False
+                    break
+            if satisfied:
+                selected = disjunct
+                break
+        if selected is None:
+            continue
+        for disjunct in disjunction.disjuncts:
+            disjunct.indicator_var.set_value(disjunct is selected)
+            disjunct.binary_indicator_var.set_value(1 if disjunct is selected else 0)
+
+
+def _set_disaggregated_vars(model: pyo.ConcreteModel, strategy: str) -> None:
+    """Set the per-disjunct copies of the variables of a hull reformulation."""
+    getters = []
+    if strategy.startswith("direct.hull"):
+        # The assignment is emitted directly, other disjunctions are transformed by gdp.hull
+        getters.append(direct.get_disaggregated_var)
+        transformation_name = "gdp.hull"
+    elif strategy.startswith("gdp.hull_eps"):
+        transformation_name = "gdp.hull"
+    else:
+        transformation_name = strategy
+    try:
+        getters.append(pyo.TransformationFactory(transformation_name).get_disaggregated_var)
+    except Exception:
+        pass
+
+    for disjunct in model.component_data_objects(gdp.Disjunct, active=None):
+        active = disjunct.binary_indicator_var.value
+        if active is None:
+            continue
+        variables = ComponentSet(
+            var
+            for constraint in _disjunct_constraints(disjunct)
+            for var in identify_variables(constraint.body)
+        )
+        for var in variables:
+            if var.value is None:
+                continue
+            for get_disaggregated_var in getters:
+                try:
+                    disaggregated = get_disaggregated_var(var, disjunct)
+                except Exception:
+                    continue
+                _set_value(disaggregated, var.value if active > 0.5 else 0.0)
+                break
+
+
+def _complete_from_equalities(model: pyo.ConcreteModel, max_passes: int = 3) -> None:
+    """
+    Set auxiliary variables that are determined by an equality with all others known.
+
+    This covers the disaggregation constraints of the hull reformulations and the
+    auxiliary variables that the hull_exact plugins define by equalities.
+    """
+    for _ in range(max_passes):
+        progress = False
+        for constraint in model.component_data_objects(pyo.Constraint, active=True):
+            if not constraint.equality:
+                continue
+            unset = [
+                var
+                for var in identify_variables(constraint.body)
+                if var.value is None and not var.fixed
+            ]
+            if len(unset) != 1:
+                continue
+            try:
+                calculate_variable_from_constraint(unset[0], constraint)
+            except Exception:
+                continue
+            progress = True
+        if not progress:
+            return
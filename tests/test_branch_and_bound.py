@@ -0,0 +1,78 @@
+import itertools
+from pathlib import Path
+
+import branch_and_bound
+import instances
+import k_means
+import numpy as np
+import pytest
+import results_store
+
+
+def brute_force(points: np.ndarray, n_clusters: int) -> float:
+    """Optimal objective over all assignments that use every cluster."""
+    assignments = np.array(list(itertools.product(range(n_clusters), repeat=len(points))))
+    # Within-cluster sum of squares: sum of |x|^2 minus |cluster sum|^2 / cluster size
+    total = np.full(len(assignments), float((points**2).sum()))
+    used = np.ones(len(assignments), dtype=bool)
+    for k in range(n_clusters):
+        members = assignments == k
+        counts = members.sum(axis=1)
+        sums = members.astype(float) @ points
+        used &= counts > 0
+        total -= np.divide(
+            (sums**2).sum(axis=1), counts, out=np.zeros(len(counts)), where=counts > 0
+        )
+    return float(total[used].min())
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_solve_instance_matches_enumeration(seed: int) -> None:
+    """Test that the branch and bound finds the optimum of a small instance."""
+    points = k_means.generate_points(2, 12, (-1.0, 1.0), seed)
+    result = branch_and_bound.solve_instance(points, 3, time_limit=60)
+    optimum = brute_force(points, 3)
+    assert result["status"] == "optimal"
+    assert result["objective"] == pytest.approx(optimum, rel=1e-9)
+    assert result["lower_bound"] == pytest.approx(optimum, rel=1e-9)
+
+
+def test_solve_instance_beyond_recursion_limit() -> None:
+    """Test that the search is not limited by the recursion depth."""
+    points = k_means.generate_points(2, 2000, (-1.0, 1.0), 0)
+    result = branch_and_bound.solve_instance(points, 2, time_limit=2)
+    assert result["status"] in ["optimal", "time_limit"]
+    assert result["lower_bound"] <= result["objective"] * (1 + 1e-9)
+
+
+def test_solve_model_with_bnb(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that solve_model stores an optimal branch-and-bound result."""
+    solve = pytest.importorskip("solve")
+    (tmp_path / "main").mkdir()
+    monkeypatch.chdir(tmp_path / "main")
+    model_name = f"bnb_test{instances.MANIFEST_EXTENSION}"
+    instances.generate_instance(
+        str(tmp_path / "data" / "models"),
+        {
+            "filename": model_name,
+            "n_dimensions": 2,
+            "n_clusters": 2,
+            "n_points": 6,
+            "coord_range": (-1.0, 1.0),
+            "seed": 0,
+        },
+    )
+
+    solve.solve_model(
+        None,
+        ["gdp.bigm"],
+        time_limit=60,
+        existing_model_name=model_name,
+        solver=branch_and_bound.SOLVER_NAME,
+        subsolver=None,
+    )
+
+    results = results_store.read_results()
+    row = results[results["Model Name"] == model_name].iloc[0]
+    assert row["Status"] == "optimal"
+    assert row["Objective Value"] == pytest.approx(row["Lower Bound"], rel=1e-9)
@@ -0,0 +1,23 @@
+import direct
+import k_means
+import pytest
+import symmetry
+
+
+@pytest.mark.parametrize("scheme", list(symmetry.SCHEMES))
+@pytest.mark.parametrize("strategy", ["direct.bigm", "direct.hull", "direct.hull_eps_1e-3"])
+def test_direct_matches_plugin(strategy: str, scheme: str) -> None:
+    """Test that a direct reformulation is equivalent to its GDP plugin."""
+    model = k_means.build_model(
+        n_dimensions=2,
+        n_clusters=3,
+        n_points=6,
+        coord_range=(-1.0, 1.0),
+        seed=0,
+        symmetry_scheme=scheme,
+    )
+    summary = direct.validate(model, strategy, n_samples=5)
+    assert summary["direct_constraints"] == summary["plugin_constraints"]
+    assert summary["direct_variables"] == summary["plugin_variables"]
+    assert summary["max_bound_difference"] <= 1e-9
+    assert summary["max_violation_difference"] <= 1e-6
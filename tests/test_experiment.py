@@ -0,0 +1,138 @@
+from pathlib import Path
+from typing import Any, Dict, List
+
+import experiment
+import instances
+import jobs
+import pytest
+import results_store
+
+SPEC = """
+name = "small"
+mode = "no_mode"
+time_limit = 60
+strategies = ["gdp.bigm", "gdp.hull"]
+
+[instances]
+dimensions = [2, 2]
+clusters = [2]
+points = [6, 5]
+replicates = 2
+seed = 3
+"""
+
+
+def load(tmp_path: Path, text: str = SPEC) -> Dict[str, Any]:
+    """Write a spec and load it."""
+    spec_path = tmp_path / "spec.toml"
+    spec_path.write_text(text)
+    return experiment.load_spec(str(spec_path))
+
+
+def batch_names(batch_path: str) -> List[str]:
+    """Model names listed in a batch file."""
+    with open(batch_path) as f:
+        return f.read().split()
+
+
+def test_load_spec_defaults(tmp_path: Path) -> None:
+    """Test that a spec gets the default solver, range and options."""
+    spec = load(tmp_path)
+    assert spec["solvers"] == [{"solver": "gams", "subsolver": "gurobi"}]
+    assert spec["instances"]["coord_range"] == [0.0, 10.0]
+    assert spec["options"] == {}
+
+
+def test_load_spec_rejects_fixed_options(tmp_path: Path) -> None:
+    """Test that options set by the spec itself are not accepted as run_batch options."""
+    with pytest.raises(ValueError, match="Invalid options"):
+        load(tmp_path, SPEC + "\n[options]\ntime_limit = 10\n")
+
+
+def test_expand_instances_names_and_reuse(tmp_path: Path) -> None:
+    """Test that instances are named by their grid point and reused on a rerun."""
+    spec = load(tmp_path)
+    data_dir = tmp_path / "data"
+    batch_path = experiment.expand_instances(spec, str(data_dir))
+    names = batch_names(batch_path)
+
+    # Repeated grid values give each instance once, easiest first
+    assert len(names) == len(set(names)) == 4
+    assert names[0].startswith("exp_small_")
+    assert "_dim2_clusters2_points5_1" in names[0]
+    assert names[-1].endswith(f"_dim2_clusters2_points6_2{instances.MANIFEST_EXTENSION}")
+
+    models_dir = data_dir / "models"
+    first = instances.load_instance(str(models_dir / names[0]))
+    modified = (models_dir / names[0]).stat().st_mtime_ns
+    assert experiment.expand_instances(spec, str(data_dir)) == batch_path
+    assert batch_names(batch_path) == names
+    assert (models_dir / names[0]).stat().st_mtime_ns == modified
+    assert instances.data_hash(instances.load_instance(str(models_dir / names[0]))) == (
+        instances.data_hash(first)
+    )
+
+
+def test_expand_instances_new_seed_new_instances(tmp_path: Path) -> None:
+    """Test that another seed names (and draws) other instances."""
+    data_dir = tmp_path / "data"
+    names = batch_names(experiment.expand_instances(load(tmp_path), str(data_dir)))
+    reseeded = batch_names(
+        experiment.expand_instances(
+            load(tmp_path, SPEC.replace("seed = 3", "seed = 4")), str(data_dir)
+        )
+    )
+    assert not set(names) & set(reseeded)
+    assert instances.data_hash(
+        instances.load_instance(str(data_dir / "models" / names[0]))
+    ) != instances.data_hash(instances.load_instance(str(data_dir / "models" / reseeded[0])))
+
+
+def test_expand_jobs_drops_duplicates() -> None:
+    """Test that a repeated model, strategy or solver gives its job once."""
+    batch_jobs = jobs.expand_jobs(
+        model_names=["a.npz", "b.npz", "a.npz"],
+        reformulation_strategies=["gdp.bigm", "gdp.bigm"],
+        solver_configs=[{"solver": "gams", "subsolver": "gurobi"}] * 2,
+        mode="no_mode",
+        time_limit=60,
+    )
+    assert [job["model_name"] for job in batch_jobs] == ["a.npz", "b.npz"]
+    assert len({jobs.job_id(job) for job in batch_jobs}) == 2
+
+
+def test_drop_satisfied_matches_instance_data(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that a job is dropped when a copy of its instance was already solved."""
+    solve = pytest.importorskip("solve")
+    (tmp_path / "main").mkdir()
+    monkeypatch.chdir(tmp_path / "main")
+    data_dir = tmp_path / "data"
+    names = batch_names(experiment.expand_instances(load(tmp_path), str(data_dir)))
+    instance = instances.load_instance(str(data_dir / "models" / names[0]))
+    results_store.upsert_result(
+        {
+            "Model Name": "copy.npz",
+            "Strategy": "gdp.bigm",
+            "Mode": "no_mode",
+            "Solver": "gams",
+            "Subsolver": "gurobi",
+            "Problem Type": "Original",
+            "Time Limit": 60,
+            results_store.SETTINGS_COLUMN: results_store.settings_key({}),
+            "Instance Hash": instances.data_hash(instance),
+            "Tolerances": solve.tolerance_key(),
+            "Status": "optimal",
+        }
+    )
+
+    batch_jobs = jobs.expand_jobs(
+        model_names=names[:2],
+        reformulation_strategies=["gdp.bigm"],
+        solver_configs=[{"solver": "gams", "subsolver": "gurobi"}],
+        mode="no_mode",
+        time_limit=60,
+    )
+    remaining = jobs.drop_satisfied(batch_jobs, str(data_dir / "models"))
+    assert [job["model_name"] for job in remaining] == names[1:2]
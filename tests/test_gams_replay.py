@@ -0,0 +1,86 @@
+import os
+from pathlib import Path
+
+import direct
+import gams_replay
+import k_means
+import pyomo.environ as pyo
+import pytest
+import warm_start
+from pyomo.opt import SolverStatus, TerminationCondition
+
+
+def make_model(seed: int = 0) -> pyo.ConcreteModel:
+    """Transformed model of a batch instance, at its warm start."""
+    model = k_means.build_model(
+        n_dimensions=2, n_clusters=3, n_points=8, coord_range=(-1.0, 1.0), seed=seed
+    )
+    start = warm_start.warm_start_from_model(model)
+    direct.apply(model, "direct.bigm")
+    warm_start.apply_warm_start(model, start, "direct.bigm")
+    return model
+
+
+def test_replay_directory_follows_model_and_levels(tmp_path: Path) -> None:
+    """Test that the directory is shared by equal models and changes with the levels."""
+    cache_dir = str(tmp_path)
+    directory = gams_replay.replay_directory(make_model(), "direct.bigm", cache_dir)
+    assert gams_replay.replay_directory(make_model(), "direct.bigm", cache_dir) == directory
+    assert gams_replay.replay_directory(make_model(1), "direct.bigm", cache_dir) != directory
+
+    model = make_model()
+    model.center_coordinates[1, 1].set_value(0.5)
+    assert gams_replay.replay_directory(model, "direct.bigm", cache_dir) != directory
+
+
+def test_write_model_once(tmp_path: Path) -> None:
+    """Test that the GAMS file is written once and selects no solver of its own."""
+    model = make_model()
+    directory = gams_replay.replay_directory(model, "direct.bigm", str(tmp_path))
+    meta, write_time = gams_replay.write_model(model, directory)
+    assert write_time > 0
+
+    with open(os.path.join(directory, gams_replay.MODEL_FILE)) as f:
+        text = f.read()
+    assert f"$include {gams_replay.RUN_OPTIONS_FILE}" in text
+    assert f"USING {meta['model_type']}" in text
+    assert "option mip=" not in text.lower()
+    variable_names = {var.name for var in model.component_data_objects(pyo.Var, descend_into=True)}
+    assert set(meta["symbols"].values()) <= variable_names
+    assert model.center_coordinates[1, 1].name in meta["symbols"].values()
+
+    assert gams_replay.write_model(make_model(), directory) == (meta, 0.0)
+    # No temporary directory is left behind
+    assert os.listdir(os.path.dirname(directory)) == [os.path.basename(directory)]
+
+
+@pytest.mark.parametrize(
+    ("solve_status", "model_status", "status", "condition"),
+    [
+        (1, 1, SolverStatus.ok, TerminationCondition.optimal),
+        (3, 8, SolverStatus.ok, TerminationCondition.optimal),
+        (3, 14, SolverStatus.ok, TerminationCondition.maxTimeLimit),
+        (1, 19, SolverStatus.ok, TerminationCondition.infeasible),
+        (13, 13, SolverStatus.error, TerminationCondition.error),
+    ],
+)
+def test_solver_results(
+    solve_status: int,
+    model_status: int,
+    status: SolverStatus,
+    condition: TerminationCondition,
+) -> None:
+    """Test that the GAMS statuses and bounds are mapped as by Pyomo's GAMS interface."""
+    stat_vars = {
+        "SOLVESTAT": solve_status,
+        "MODELSTAT": model_status,
+        "OBJEST": 1.0,
+        "OBJVAL": 2.0,
+        "ETSOLVE": 3.5,
+    }
+    results = gams_replay.solver_results(make_model(), stat_vars)
+    assert results.solver.status == status
+    assert results.solver.termination_condition == condition
+    assert results.problem.lower_bound == 1.0
+    assert results.problem.upper_bound == 2.0
+    assert results.solver.user_time == 3.5
@@ -0,0 +1,56 @@
+import branch_and_bound
+import k_means
+import numpy as np
+import pyomo.environ as pyo
+import pytest
+import symmetry
+
+
+@pytest.mark.parametrize("scheme", symmetry.FIRST_COORDINATE_ORDERED)
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_data_bounds_keep_optimum(scheme: str, seed: int) -> None:
+    """Test that an optimal clustering satisfies the data bounds, per cluster too."""
+    points = k_means.generate_points(2, 10, (-1.0, 1.0), seed)
+    optimum = branch_and_bound.solve_instance(points, 3, symmetry_scheme=scheme)
+    bounds = k_means.data_bounds(points, 3, cluster_bounds=True)
+
+    assert optimum["status"] == "optimal"
+    assert np.all(optimum["centers"] >= bounds["center_lower"] - 1e-9)
+    assert np.all(optimum["centers"] <= bounds["center_upper"] + 1e-9)
+    assert np.all(optimum["distances"] <= bounds["distance_upper"] + 1e-9)
+
+
+def test_build_model_with_data_bounds() -> None:
+    """Test that the data bounds replace the coordinate-box bounds of the model."""
+    model = k_means.build_model(
+        n_dimensions=2, n_clusters=3, n_points=10, coord_range=(-1.0, 1.0), seed=0, bounds="data"
+    )
+    points = np.array(
+        [
+            [pyo.value(model.points_coordinates[i, j]) for j in model.dimensions]
+            for i in model.points
+        ]
+    )
+    bounds = k_means.data_bounds(points, 3)
+    for k in model.clusters:
+        for j in model.dimensions:
+            assert model.center_coordinates[k, j].bounds == (
+                bounds["center_lower"][k - 1, j - 1],
+                bounds["center_upper"][k - 1, j - 1],
+            )
+    for i in model.points:
+        assert model.distance[i].bounds == (0, bounds["distance_upper"][i - 1])
+
+
+def test_cluster_bounds_require_ordered_scheme() -> None:
+    """Test that per-cluster bounds are refused without a first-coordinate ordering."""
+    with pytest.raises(ValueError, match="data_clusters require"):
+        k_means.build_model(
+            n_dimensions=2,
+            n_clusters=3,
+            n_points=10,
+            coord_range=(-1.0, 1.0),
+            seed=0,
+            bounds="data_clusters",
+            symmetry_scheme="assignment",
+        )
@@ -0,0 +1,65 @@
+from pathlib import Path
+from typing import Any, Dict, List
+
+import jobs
+import ledger
+
+
+def make_jobs() -> List[Dict[str, Any]]:
+    """Jobs of a batch of four models."""
+    return jobs.expand_jobs(
+        model_names=["a.npz", "b.npz", "c.npz", "d.npz"],
+        reformulation_strategies=["gdp.bigm"],
+        solver_configs=[{"solver": "gams", "subsolver": "gurobi"}],
+        mode="no_mode",
+        time_limit=60,
+    )
+
+
+def test_load_ledger_replays_states(tmp_path: Path) -> None:
+    """Test that the ledger keeps the latest state and counts the starts of a job."""
+    ledger_path = str(tmp_path / "ledgers" / "batch.jsonl")
+    ledger.record_job(ledger_path, "a", ledger.PENDING)
+    ledger.record_job(ledger_path, "a", ledger.RUNNING)
+    ledger.record_job(ledger_path, "a", ledger.FAILED, "ValueError: bad")
+    ledger.record_job(ledger_path, "a", ledger.RUNNING)
+    ledger.record_job(ledger_path, "a", ledger.DONE)
+    with open(ledger_path, "a") as f:
+        # A line cut short by a crash
+        f.write('{"job_id": "b", "sta')
+
+    state = ledger.load_ledger(ledger_path)
+    assert state == {"a": {"state": ledger.DONE, "attempts": 2, "error": None}}
+    assert ledger.load_ledger(str(tmp_path / "missing.jsonl")) == {}
+
+
+def test_select_jobs_resume(tmp_path: Path) -> None:
+    """Test that a resumed batch runs the unfinished and interrupted jobs only."""
+    ledger_path = str(tmp_path / "batch.jsonl")
+    batch_jobs = make_jobs()
+    done, cancelled, interrupted, pending = (jobs.job_id(job) for job in batch_jobs)
+    for job_id in [done, cancelled, interrupted, pending]:
+        ledger.record_job(ledger_path, job_id, ledger.PENDING)
+    for job_id in [done, cancelled, interrupted]:
+        ledger.record_job(ledger_path, job_id, ledger.RUNNING)
+    ledger.record_job(ledger_path, done, ledger.DONE)
+    ledger.record_job(ledger_path, cancelled, ledger.CANCELLED)
+
+    selected = ledger.select_jobs(batch_jobs, ledger.load_ledger(ledger_path))
+    assert [jobs.job_id(job) for job in selected] == [interrupted, pending]
+
+
+def test_select_jobs_retries_failed_up_to_max_attempts(tmp_path: Path) -> None:
+    """Test that failed jobs are retried until they were started max_attempts times."""
+    ledger_path = str(tmp_path / "batch.jsonl")
+    batch_jobs = make_jobs()[:2]
+    once, twice = (jobs.job_id(job) for job in batch_jobs)
+    for job_id, attempts in [(once, 1), (twice, 2)]:
+        for _ in range(attempts):
+            ledger.record_job(ledger_path, job_id, ledger.RUNNING)
+            ledger.record_job(ledger_path, job_id, ledger.FAILED, "crashed")
+    state = ledger.load_ledger(ledger_path)
+
+    assert ledger.select_jobs(batch_jobs, state, max_attempts=3) == batch_jobs
+    assert ledger.select_jobs(batch_jobs, state, max_attempts=2) == batch_jobs[:1]
+    assert ledger.select_jobs(batch_jobs, state, retry_failed=False) == []
@@ -0,0 +1,77 @@
+import gzip
+from pathlib import Path
+from typing import Any, Dict
+
+import benchmark_log_parser
+import log_parser
+import pytest
+
+# Values of the synthetic logs of benchmark_log_parser
+EXPECTED: Dict[str, Dict[str, Any]] = {
+    "gurobi": {
+        "root_relaxation": 0.123456,
+        "lower_bound": 0.98,
+        "upper_bound": 3.2,
+        "nodes": 5678,
+        "status": "Time limit reached",
+    },
+    "scip": {
+        "root_relaxation": 0.15,
+        "lower_bound": 1.2,
+        "upper_bound": 3.0,
+        "nodes": 4321,
+        "status": "solving was interrupted [time limit reached]",
+    },
+    "baron": {
+        "root_relaxation": 1.0,
+        "lower_bound": 1.1,
+        "upper_bound": 2.5,
+        "nodes": 42,
+        "status": "Max. allowable time exceeded",
+    },
+}
+
+
+@pytest.mark.parametrize("solver", list(benchmark_log_parser.LOG_TEMPLATES))
+def test_parse_synthetic_log(tmp_path: Path, solver: str) -> None:
+    """Test that the values of a synthetic log are found past its progress table."""
+    log_path = str(tmp_path / "output_log.txt")
+    benchmark_log_parser.write_log(log_path, solver, 0.2)
+    summary = log_parser.parse_log(log_path, solver)
+    assert summary is not None
+    assert {key: summary[key] for key in EXPECTED[solver]} == EXPECTED[solver]
+
+
+@pytest.mark.parametrize("solver", list(benchmark_log_parser.LOG_TEMPLATES))
+def test_blocks_match_lines(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, solver: str) -> None:
+    """Test that parsing in blocks, cut mid-line, gives the line-by-line result."""
+    log_path = str(tmp_path / "output_log.txt")
+    benchmark_log_parser.write_log(log_path, solver, 0.05)
+    with open(log_path) as f:
+        by_line = log_parser.LogParser(solver).feed_lines(f).summary()
+
+    monkeypatch.setattr(log_parser, "BLOCK_SIZE", 997)
+    assert log_parser.parse_log(log_path, solver) == by_line
+
+
+def test_parse_compressed_log(tmp_path: Path) -> None:
+    """Test that a gzipped output log is found and parsed."""
+    plain_path = str(tmp_path / "plain.txt")
+    benchmark_log_parser.write_log(plain_path, "gurobi", 0.05)
+    with open(plain_path, "rb") as f, gzip.open(tmp_path / "output_log.txt.gz", "wb") as g:
+        g.write(f.read())
+
+    log_path = log_parser.find_log(str(tmp_path))
+    assert log_path == str(tmp_path / "output_log.txt.gz")
+    summary = log_parser.parse_run_logs(str(tmp_path), "gams", "gurobi")
+    assert summary["upper_bound"] == EXPECTED["gurobi"]["upper_bound"]
+
+
+def test_solver_family() -> None:
+    """Test that the log format follows the solver that wrote the log."""
+    assert log_parser.solver_family("gams", "gurobi") == "gurobi"
+    assert log_parser.solver_family("gams", "scip") == "scip"
+    assert log_parser.solver_family("gams", "baron") == "baron"
+    assert log_parser.solver_family("scip") == "scip"
+    assert log_parser.solver_family("bnb") == "bnb"
+    assert log_parser.solver_family("gurobi_persistent") == "gurobi"
@@ -0,0 +1,57 @@
+import branch_and_bound
+import direct
+import k_means
+import numpy as np
+import presolve
+import pyomo.environ as pyo
+import pytest
+import symmetry
+import warm_start
+from test_warm_start import max_violation
+
+
+def test_duplicate_groups() -> None:
+    """Test that every point is mapped to the first point with its coordinates."""
+    points = np.array([[0.0, 1.0], [1.0, 0.0], [0.0, 1.0], [0.0, 1.0 + 1e-12], [1.0, 0.0]])
+    np.testing.assert_array_equal(presolve.duplicate_groups(points), [0, 1, 0, 3, 1])
+
+
+def test_min_squared_distances() -> None:
+    """Test that points inside a center box are at distance zero from it."""
+    points = np.array([[0.5, 0.5], [2.0, 3.0]])
+    center_lower = np.array([[0.0, 0.0], [1.0, 1.0]])
+    center_upper = np.array([[1.0, 1.0], [np.inf, 2.0]])
+    np.testing.assert_allclose(
+        presolve.min_squared_distances(points, center_lower, center_upper),
+        [[0.0, 0.5], [5.0, 1.0]],
+    )
+
+
+@pytest.mark.parametrize("scheme", symmetry.FIRST_COORDINATE_ORDERED)
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_presolve_keeps_optimum(scheme: str, seed: int) -> None:
+    """Test that an optimal clustering stays feasible on a presolved model with duplicates."""
+    base = k_means.generate_points(2, 9, (-1.0, 1.0), seed)
+    points = np.vstack([base, base[[0, 3, 3]]])
+    optimum = branch_and_bound.solve_instance(points, 3, symmetry_scheme=scheme)
+    model = k_means.build_model(
+        n_dimensions=2,
+        n_clusters=3,
+        n_points=12,
+        coord_range=(-1.0, 1.0),
+        points=points,
+        bounds=presolve.EFFECTIVE_BOUNDS,
+        symmetry_scheme=scheme,
+    )
+    stats = presolve.presolve(model, optimum["objective"])
+
+    assert stats["duplicate_points"] == 3
+    for position, i in enumerate(model.points):
+        for k in model.clusters:
+            indicator = model.disjunct_blocks[k, i].indicator_var
+            if indicator.fixed:
+                assert indicator.value == (optimum["assignment"][position] == k - 1)
+    direct.apply_plugin(model, "gdp.bigm")
+    warm_start.apply_warm_start(model, optimum, "gdp.bigm")
+    assert max_violation(model) <= 1e-9
+    assert pyo.value(model.obj) == pytest.approx(optimum["objective"])
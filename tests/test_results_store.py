@@ -0,0 +1,161 @@
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict
+
+import pandas as pd
+import pytest
+import results_store
+
+
+def make_row(**values: Any) -> Dict[str, Any]:
+    """A results row of one job with the given columns changed."""
+    row = {
+        "Model Name": "model_dim2_clusters3_points10_1.npz",
+        "Strategy": "gdp.bigm",
+        "Mode": "no_mode",
+        "Solver": "gams",
+        "Subsolver": "gurobi",
+        "Problem Type": "Original",
+        "Time Limit": 60,
+        results_store.SETTINGS_COLUMN: results_store.settings_key({}),
+        "Status": "optimal",
+        "Objective Value": 2.0,
+    }
+    row.update(values)
+    return row
+
+
+def test_upsert_replaces_row_with_same_key(tmp_path: Path) -> None:
+    """Test that a re-run of a job replaces its row and keeps the other columns."""
+    db_path = str(tmp_path / "results.sqlite")
+    results_store.upsert_result(make_row(Nodes=10), db_path)
+    results_store.upsert_result(make_row(**{"Objective Value": 1.5}), db_path)
+
+    df = results_store.read_results(db_path)
+    assert len(df) == 1
+    assert df.iloc[0]["Objective Value"] == 1.5
+    assert df.iloc[0]["Nodes"] == 10
+
+
+def test_upsert_replace_clears_stale_columns(tmp_path: Path) -> None:
+    """Test that replace=True leaves no values of the earlier run in the row."""
+    db_path = str(tmp_path / "results.sqlite")
+    results_store.upsert_result(make_row(Nodes=10), db_path)
+    partial = make_row(Status="timeout")
+    del partial["Objective Value"]
+    results_store.upsert_result(partial, db_path, replace=True)
+
+    stored = results_store.get_result(make_row(), db_path)
+    assert stored is not None
+    assert stored["Status"] == "timeout"
+    assert stored["Nodes"] is None
+    assert stored["Objective Value"] is None
+
+
+def test_settings_are_part_of_the_key(tmp_path: Path) -> None:
+    """Test that runs under different solve options keep rows of their own."""
+    db_path = str(tmp_path / "results.sqlite")
+    warm = results_store.settings_key({"warm_start": True})
+    results_store.upsert_results(
+        [make_row(), make_row(**{results_store.SETTINGS_COLUMN: warm, "Objective Value": 1.0})],
+        db_path,
+    )
+
+    assert len(results_store.read_results(db_path)) == 2
+    assert results_store.min_value("Objective Value", {"Strategy": "gdp.bigm"}, db_path) == 1.0
+    assert (
+        results_store.min_value(
+            "Objective Value",
+            {results_store.SETTINGS_COLUMN: results_store.settings_key({})},
+            db_path,
+        )
+        == 2.0
+    )
+
+
+def test_settings_key_fills_defaults() -> None:
+    """Test that options left at their defaults give the same settings."""
+    assert results_store.settings_key({}) == results_store.settings_key(
+        {"warm_start": False, "symmetry_scheme": None, "bounds": "box"}
+    )
+    assert results_store.settings_key(
+        {"cutoff_sources": ["store", "warm_start"]}
+    ) == results_store.settings_key({"cutoff_sources": ["warm_start", "store"]})
+
+
+def test_update_results(tmp_path: Path) -> None:
+    """Test that update_results changes the matching rows only."""
+    db_path = str(tmp_path / "results.sqlite")
+    results_store.upsert_results([make_row(), make_row(Strategy="gdp.hull")], db_path)
+    updated = results_store.update_results(
+        {"Strategy": "gdp.hull"}, {"Status": "cancelled"}, db_path
+    )
+
+    df = results_store.read_results(db_path).set_index("Strategy")
+    assert updated == 1
+    assert df.loc["gdp.hull", "Status"] == "cancelled"
+    assert df.loc["gdp.bigm", "Status"] == "optimal"
+
+
+def test_store_in_working_directory(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a store path without a directory is opened in the working directory."""
+    monkeypatch.chdir(tmp_path)
+    results_store.upsert_result(make_row(), "results.sqlite")
+    assert (tmp_path / "results.sqlite").exists()
+
+
+def test_import_legacy_workbook(tmp_path: Path) -> None:
+    """Test that rows of a workbook without settings get the settings of their columns."""
+    db_path = str(tmp_path / "results.sqlite")
+    excel_path = str(tmp_path / "results.xlsx")
+    rows = [make_row(), make_row(**{"Warm Start Objective": 2.5, "Objective Value": 1.0})]
+    pd.DataFrame(rows).drop(columns=[results_store.SETTINGS_COLUMN]).to_excel(
+        excel_path, index=False
+    )
+
+    assert results_store.import_from_excel(excel_path, db_path) == 2
+    df = results_store.read_results(db_path)
+    assert set(df[results_store.SETTINGS_COLUMN]) == {
+        results_store.settings_key({}),
+        results_store.settings_key({"warm_start": True}),
+    }
+
+
+def test_migrate_legacy_store(tmp_path: Path) -> None:
+    """Test that rows of a store without settings are keyed by the settings of their columns."""
+    db_path = str(tmp_path / "results.sqlite")
+    legacy_rows = [
+        make_row(Strategy="gdp.bigm", Symmetry="lexicographic"),
+        make_row(Strategy="gdp.hull", **{"Warm Start Objective": 2.5, "Bounds": "data"}),
+    ]
+    columns = [column for column in legacy_rows[0] if column != results_store.SETTINGS_COLUMN]
+    columns += ["Warm Start Objective", "Bounds"]
+    quoted = ", ".join(f'"{column}"' for column in [results_store.KEY_COLUMN] + columns)
+    connection = sqlite3.connect(db_path)
+    connection.execute(f"CREATE TABLE results ({quoted})")
+    for row in legacy_rows:
+        # Legacy keys were built without the settings
+        key = "|".join(
+            str(row.get(column))
+            for column in results_store.KEY_COLUMNS
+            if column != results_store.SETTINGS_COLUMN
+        )
+        connection.execute(
+            f"INSERT INTO results VALUES ({', '.join('?' * (len(columns) + 1))})",
+            [key] + [row.get(column) for column in columns],
+        )
+    connection.commit()
+    connection.close()
+
+    df = results_store.read_results(db_path).set_index("Strategy")
+    assert df.loc["gdp.bigm", results_store.SETTINGS_COLUMN] == results_store.settings_key(
+        {"symmetry_scheme": "lexicographic"}
+    )
+    assert df.loc["gdp.hull", results_store.SETTINGS_COLUMN] == results_store.settings_key(
+        {"warm_start": True, "bounds": "data"}
+    )
+    for row in legacy_rows:
+        row[results_store.SETTINGS_COLUMN] = results_store._legacy_settings(row)
+        stored = results_store.get_result(row, db_path)
+        assert stored is not None
+        assert stored["Strategy"] == row["Strategy"]
@@ -0,0 +1,123 @@
+import itertools
+from pathlib import Path
+from typing import Any, Dict, List
+
+import instances
+import jobs
+import k_means
+import pandas as pd
+import pytest
+import runtime_predictor
+
+TIME_LIMIT = 60
+
+
+def runtime(n_points: int, strategy: str) -> float:
+    """Runtime of the synthetic results: quadratic in the points, hull three times slower."""
+    return 0.01 * n_points**2 * (3 if strategy == "gdp.hull" else 1)
+
+
+def make_results() -> pd.DataFrame:
+    """Results of runs stopped at TIME_LIMIT, with a few rows a predictor must ignore."""
+    rows = [
+        {
+            "Problem Type": "Original",
+            "Strategy": strategy,
+            "Solver": "gams",
+            "Subsolver": "gurobi",
+            "n_dimensions": n_dimensions,
+            "n_clusters": n_clusters,
+            "n_points": n_points,
+            "Status": "maxTimeLimit" if runtime(n_points, strategy) > TIME_LIMIT else "optimal",
+            "Duration (sec)": min(runtime(n_points, strategy), TIME_LIMIT),
+        }
+        for n_dimensions, n_clusters, n_points, strategy in itertools.product(
+            [2, 3], [2, 3, 4], [10, 20, 40, 80, 160], ["gdp.bigm", "gdp.hull"]
+        )
+    ]
+    ignored = {**rows[0], "Duration (sec)": 0.001}
+    rows += [
+        {**ignored, "Status": "failed"},
+        {**ignored, "Strategy": "portfolio"},
+        {**ignored, "Problem Type": "Relaxation"},
+    ]
+    return pd.DataFrame(rows)
+
+
+def make_jobs(tmp_path: Path) -> List[Dict[str, Any]]:
+    """Jobs of instances of 10, 40 and 160 points and of a legacy pickled model."""
+    model_names = []
+    for n_points in [10, 160, 40]:
+        filename = f"model_dim2_clusters3_points{n_points}_1.npz"
+        points = k_means.generate_points(2, n_points, (-1.0, 1.0), 1)
+        instances.save_instance(str(tmp_path), filename, points, 3, (-1.0, 1.0), 1)
+        model_names.append(filename)
+    return jobs.expand_jobs(
+        model_names=model_names + ["legacy.pkl"],
+        reformulation_strategies=["gdp.bigm"],
+        solver_configs=[{"solver": "gams", "subsolver": "gurobi"}],
+        mode="no_mode",
+        time_limit=TIME_LIMIT,
+    )
+
+
+def test_training_rows() -> None:
+    """Test that failed runs, portfolio summaries and relaxations are left out."""
+    rows = runtime_predictor.training_rows(make_results())
+    assert len(rows) == 60
+    assert rows["Censored"].sum() == 24
+
+
+def test_fit_accounts_for_censored_runs() -> None:
+    """Test that runs stopped at the time limit count as lower bounds on the runtime."""
+    predictor = runtime_predictor.fit(make_results())
+    assert predictor is not None
+    for n_points in [10, 40, 160]:
+        prediction = runtime_predictor.predict(
+            predictor, 2, 3, n_points, "gdp.bigm", "gams", "gurobi", TIME_LIMIT
+        )
+        assert prediction["runtime"] == pytest.approx(runtime(n_points, "gdp.bigm"), rel=0.05)
+        assert prediction["timeout_probability"] == pytest.approx(float(n_points == 160))
+
+    # Taken as finished, the stopped runs pull the prediction below the time limit
+    uncensored = runtime_predictor.fit(make_results().assign(Status="optimal"))
+    prediction = runtime_predictor.predict(
+        uncensored, 2, 3, 160, "gdp.bigm", "gams", "gurobi", TIME_LIMIT
+    )
+    assert prediction["runtime"] < 0.5 * runtime(160, "gdp.bigm")
+
+
+def test_fit_needs_enough_rows() -> None:
+    """Test that no predictor is fitted to too few results."""
+    results = make_results().iloc[: runtime_predictor.MIN_TRAINING_ROWS - 1]
+    assert runtime_predictor.fit(results) is None
+
+
+@pytest.mark.parametrize(
+    ("predicted_timeouts", "order", "time_limits"),
+    [
+        ("run", [160, 40, 10], [TIME_LIMIT] * 3),
+        ("skip", [40, 10], [TIME_LIMIT] * 2),
+        ("shorten", [40, 160, 10], [TIME_LIMIT, 15, TIME_LIMIT]),
+    ],
+)
+def test_plan_jobs(
+    tmp_path: Path, predicted_timeouts: str, order: List[int], time_limits: List[int]
+) -> None:
+    """Test that jobs run longest-first, predicted timeouts as asked, unknown ones last."""
+    predictor = runtime_predictor.fit(make_results())
+    planned = runtime_predictor.plan_jobs(
+        make_jobs(tmp_path), predictor, str(tmp_path), predicted_timeouts=predicted_timeouts
+    )
+
+    assert [job["model_name"] for job in planned] == [
+        f"model_dim2_clusters3_points{n_points}_1.npz" for n_points in order
+    ] + ["legacy.pkl"]
+    assert [job["time_limit"] for job in planned] == time_limits + [TIME_LIMIT]
+
+
+def test_plan_jobs_rejects_unknown_treatment(tmp_path: Path) -> None:
+    """Test that an unknown treatment of predicted timeouts is refused."""
+    predictor = runtime_predictor.fit(make_results())
+    with pytest.raises(ValueError, match="Unknown treatment"):
+        runtime_predictor.plan_jobs(make_jobs(tmp_path), predictor, str(tmp_path), "drop")
@@ -0,0 +1,93 @@
+import os
+from pathlib import Path
+from typing import Any, Dict
+
+import jobs
+import log_parser
+import pytest
+import supervisor
+
+
+def make_job(**values: Any) -> Dict[str, Any]:
+    """A single job of a batch with the given entries changed."""
+    (job,) = jobs.expand_jobs(
+        model_names=["model.npz"],
+        reformulation_strategies=["gdp.bigm"],
+        solver_configs=[{"solver": "gams", "subsolver": "gurobi"}],
+        mode="no_mode",
+        time_limit=60,
+        run_prefix="run",
+    )
+    job.update(values)
+    return job
+
+
+def outcome(status: str, error: Any = None) -> Dict[str, Any]:
+    """An outcome of the job with the given status and error."""
+    return {"job_id": jobs.job_id(make_job()), "status": status, "error": error, "wall_time": 1.0}
+
+
+def test_classify_memory_error() -> None:
+    """Test that a MemoryError under the memory limit is classified as out of memory."""
+    classified = supervisor.classify(outcome("failed", "MemoryError: Unable to allocate"))
+    assert classified["status"] == supervisor.OUT_OF_MEMORY
+    assert supervisor.classify(outcome("failed", "ValueError: bad"))["status"] == "failed"
+    assert supervisor.classify(outcome("done"))["status"] == "done"
+    crashed = outcome(supervisor.CRASHED, "Worker exited with code -9")
+    assert supervisor.classify(crashed)["status"] == supervisor.CRASHED
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "Error 10001: Out of memory",
+        "[memory.c:101] ERROR: Insufficient memory for allocation",
+        "terminate called after throwing an instance of 'std::bad_alloc'",
+        "*** Error: Memory allocation failure",
+        "MemoryError: Unable to allocate 8.00 GiB",
+    ],
+)
+def test_memory_failure_parser(tmp_path: Path, line: str) -> None:
+    """Test that the allocation failures of the solvers are found in a log."""
+    log_path = tmp_path / "output_log.txt"
+    log_path.write_text(f"Optimize a model with 10 rows\nMemory usage: 12MB\n{line}\nDone\n")
+    parser = log_parser.MemoryFailureParser()
+    log_parser.feed_file(str(log_path), [parser])
+    assert parser.line == line
+
+
+def test_memory_failure_parser_ignores_memory_statistics() -> None:
+    """Test that lines merely mentioning memory are not taken as failures."""
+    parser = log_parser.MemoryFailureParser()
+    parser.feed_block("Memory limit: 8GB\nPeak memory usage: 120MB\nmemory allocation: ok\n")
+    assert parser.line is None
+
+
+def test_job_deadline() -> None:
+    """Test that a job may run the time limit of each of its solves plus the grace."""
+    assert supervisor.job_deadline(make_job(), grace=5) == 65
+    assert supervisor.job_deadline(make_job(calculate_relaxation_gap=True), grace=5) == 125
+    assert supervisor.job_deadline(make_job(relaxation_only=True), grace=5) == 65
+
+
+def test_classify_crash_with_memory_failure_in_log(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that a crashed job whose solver log reports a failed allocation is out of memory."""
+    solve = pytest.importorskip("solve")
+    (tmp_path / "main").mkdir()
+    monkeypatch.chdir(tmp_path / "main")
+    job = make_job()
+    results_dir = os.path.join(
+        solve.results_directory(
+            job["solver"], job["subsolver"], job["strategy"], job["mode"], job["run_id"]
+        ),
+        "original",
+    )
+    os.makedirs(results_dir)
+    with open(os.path.join(results_dir, log_parser.OUTPUT_LOG), "w") as f:
+        f.write("Explored 10 nodes\nError 10001: Out of memory\n")
+
+    classified = supervisor.classify(outcome(supervisor.CRASHED, "Worker exited with code 1"), job)
+    assert classified["status"] == supervisor.OUT_OF_MEMORY
+    assert "Out of memory" in classified["error"]
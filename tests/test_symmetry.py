@@ -0,0 +1,108 @@
+from typing import Dict, List
+
+import branch_and_bound
+import direct
+import k_means
+import numpy as np
+import pyomo.environ as pyo
+import pytest
+import symmetry
+import warm_start
+from test_warm_start import max_violation
+
+# Two pairs of points whose optimal centers tie in the first coordinate
+TIED_POINTS = np.array([[0.0, 1.0], [0.0, 1.2], [0.0, -1.0], [0.0, -1.2]])
+
+
+def build_tied_model(scheme: str) -> pyo.ConcreteModel:
+    """Untransformed model of TIED_POINTS in two clusters."""
+    return k_means.build_model(
+        n_dimensions=2,
+        n_clusters=2,
+        n_points=4,
+        coord_range=(-2.0, 2.0),
+        points=TIED_POINTS,
+        symmetry_scheme=scheme,
+    )
+
+
+def satisfied_orderings(model: pyo.ConcreteModel, centers: List[List[float]]) -> Dict[str, bool]:
+    """Whether the centers satisfy the ordering constraints of each scheme component."""
+    for k in model.clusters:
+        for j in model.dimensions:
+            model.center_coordinates[k, j].set_value(centers[k - 1][j - 1])
+    satisfied = {}
+    if model.component("symmetry_breaking") is not None:
+        satisfied["symmetry_breaking"] = all(
+            pyo.value(constraint.body) <= pyo.value(constraint.upper) + 1e-9
+            for constraint in model.symmetry_breaking.values()
+        )
+    if model.component("lexicographic_order") is not None:
+        satisfied["lexicographic_order"] = any(
+            all(
+                pyo.value(constraint.body) <= pyo.value(constraint.upper) + 1e-9
+                and (
+                    constraint.lower is None
+                    or pyo.value(constraint.body) >= pyo.value(constraint.lower) - 1e-9
+                )
+                for constraint in disjunct.component_data_objects(pyo.Constraint)
+            )
+            for disjunct in model.lexicographic_order[2].disjuncts
+        )
+    return satisfied
+
+
+@pytest.mark.parametrize("scheme", list(symmetry.SCHEMES))
+@pytest.mark.parametrize("seed", [0, 1])
+def test_scheme_keeps_an_optimum(scheme: str, seed: int) -> None:
+    """Test that every scheme leaves a labeling of an optimal clustering feasible."""
+    model = k_means.build_model(
+        n_dimensions=2,
+        n_clusters=3,
+        n_points=8,
+        coord_range=(-1.0, 1.0),
+        seed=seed,
+        symmetry_scheme=scheme,
+    )
+    points = np.array(
+        [
+            [pyo.value(model.points_coordinates[i, j]) for j in model.dimensions]
+            for i in model.points
+        ]
+    )
+    optimum = branch_and_bound.solve_instance(points, 3, symmetry_scheme=scheme)
+    direct.apply_plugin(model, "gdp.bigm")
+    warm_start.apply_warm_start(model, optimum, "gdp.bigm")
+
+    assert max_violation(model) <= 1e-9
+    assert pyo.value(model.obj) == pytest.approx(optimum["objective"])
+
+
+def test_lexicographic_orders_tied_clusters() -> None:
+    """Test that only one labeling of clusters tied in the first coordinate is lexicographic."""
+    low_first = [[0.0, -1.1], [0.0, 1.1]]
+    high_first = [[0.0, 1.1], [0.0, -1.1]]
+
+    first_coordinate = build_tied_model("first_coordinate")
+    assert satisfied_orderings(first_coordinate, low_first) == {"symmetry_breaking": True}
+    assert satisfied_orderings(first_coordinate, high_first) == {"symmetry_breaking": True}
+
+    lexicographic = build_tied_model("lexicographic")
+    assert satisfied_orderings(lexicographic, low_first) == {"lexicographic_order": True}
+    assert satisfied_orderings(lexicographic, high_first) == {"lexicographic_order": False}
+
+
+def test_set_scheme_replaces_components() -> None:
+    """Test that switching schemes removes the components and fixings of the old scheme."""
+    model = build_tied_model("point_order")
+    assert model.disjunct_blocks[1, 1].indicator_var.fixed
+
+    symmetry.set_scheme(model, "lexicographic")
+    assert symmetry.scheme_of(model) == "lexicographic"
+    assert model.component("point_order") is None
+    assert model.component("symmetry_breaking") is None
+    assert model.component("lexicographic_order") is not None
+    assert not any(disjunct.indicator_var.fixed for disjunct in model.disjunct_blocks.values())
+
+    with pytest.raises(ValueError, match="Unknown symmetry-breaking scheme"):
+        symmetry.set_scheme(model, "orbital")
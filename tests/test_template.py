@@ -0,0 +1,76 @@
+from typing import Dict, Tuple
+
+import direct
+import k_means
+import pyomo.environ as pyo
+import pytest
+import template
+import warm_start
+
+
+@pytest.fixture(autouse=True)
+def empty_templates(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Start every test without templates of earlier tests."""
+    monkeypatch.setattr(template, "_templates", {})
+
+
+def make_model(seed: int, n_points: int = 8) -> pyo.ConcreteModel:
+    """Untransformed model of a batch instance."""
+    return k_means.build_model(
+        n_dimensions=2, n_clusters=3, n_points=n_points, coord_range=(-1.0, 1.0), seed=seed
+    )
+
+
+def constraint_values(model: pyo.ConcreteModel) -> Dict[str, Tuple[float, float, float]]:
+    """Lower bound, body and upper bound of every active constraint at the model values."""
+    return {
+        constraint.name: (
+            pyo.value(constraint.lower) if constraint.lower is not None else None,
+            pyo.value(constraint.body),
+            pyo.value(constraint.upper) if constraint.upper is not None else None,
+        )
+        for constraint in model.component_data_objects(pyo.Constraint, active=True)
+    }
+
+
+@pytest.mark.parametrize("strategy", ["direct.bigm", "direct.hull", "direct.hull_eps_1e-3"])
+def test_updated_template_matches_new_reformulation(strategy: str) -> None:
+    """Test that a template with swapped coordinates equals a fresh reformulation."""
+    template.instance_model(make_model(0), strategy)
+    model = make_model(1)
+    start = warm_start.warm_start_from_model(model)
+    updated = template.instance_model(model, strategy)
+    assert template.generation(updated) == 1
+
+    fresh = make_model(1)
+    direct.apply(fresh, strategy)
+    for reformulated in (updated, fresh):
+        warm_start.apply_warm_start(reformulated, start, strategy)
+    updated_values = constraint_values(updated)
+    fresh_values = constraint_values(fresh)
+    assert updated_values.keys() == fresh_values.keys()
+    for name, values in fresh_values.items():
+        assert updated_values[name] == pytest.approx(values), name
+    assert pyo.value(updated.obj) == pytest.approx(pyo.value(fresh.obj))
+
+
+def test_templates_are_kept_least_recently_used(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that only the most recently used templates are kept."""
+    monkeypatch.setattr(template, "MAX_TEMPLATES", 2)
+    first = template.instance_model(make_model(0, n_points=6), "direct.bigm")
+    template.instance_model(make_model(0, n_points=7), "direct.bigm")
+    assert template.instance_model(make_model(1, n_points=6), "direct.bigm") is first
+    template.instance_model(make_model(0, n_points=8), "direct.bigm")
+
+    assert template.generation(first) == 1
+    assert template.instance_model(make_model(2, n_points=6), "direct.bigm") is first
+    assert template.instance_model(make_model(1, n_points=7), "direct.bigm") is not first
+    assert len(template._templates) == 2
+
+
+def test_plugin_strategies_are_not_supported() -> None:
+    """Test that GDP plugin strategies are refused a template."""
+    model = make_model(0)
+    assert not template.supports(model, "gdp.bigm")
+    with pytest.raises(ValueError, match="cannot be served by a template"):
+        template.instance_model(model, "gdp.bigm")
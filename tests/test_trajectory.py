@@ -0,0 +1,51 @@
+import math
+
+import numpy as np
+import pytest
+import trajectory
+
+# Incumbent 20 found at 1s, improved to 10 at 4s; bound 5 at 2s, proven 10 at 6s
+POINTS = np.array(
+    [
+        [1.0, 20.0, math.nan, 0.0],
+        [2.0, 20.0, 5.0, 1.0],
+        [4.0, 10.0, 5.0, 3.0],
+        [6.0, 10.0, 10.0, 7.0],
+    ]
+)
+
+
+def test_integrals_of_hand_made_trajectory() -> None:
+    """Test the integrals against the areas under the gap step functions."""
+    metrics = trajectory.integrals(POINTS, reference=10.0, end_time=10.0)
+    # Primal: 1 until 1s, then |20 - 10| / 20 = 0.5 until 4s
+    assert metrics["primal_integral"] == pytest.approx(1.0 + 0.5 * 3)
+    # Dual: 1 until 2s, then |5 - 10| / 10 = 0.5 until 6s
+    assert metrics["dual_integral"] == pytest.approx(2.0 + 0.5 * 4)
+    # Primal-dual: 1 until 2s, 15 / 20 until 4s, 5 / 10 until 6s
+    assert metrics["primal_dual_integral"] == pytest.approx(2.0 + 0.75 * 2 + 0.5 * 2)
+    assert metrics["integral_reference"] == 10.0
+    assert metrics["integral_end_time"] == 10.0
+
+
+def test_integrals_keep_final_gap_until_end_time() -> None:
+    """Test that a run stopping with a gap keeps accruing it up to the end time."""
+    stopped = POINTS[:3]
+    short = trajectory.integrals(stopped, reference=10.0)
+    long = trajectory.integrals(stopped, reference=10.0, end_time=10.0)
+    assert long["dual_integral"] == pytest.approx(short["dual_integral"] + 0.5 * 6)
+
+
+def test_integrals_default_reference_is_final_incumbent() -> None:
+    """Test that the reference defaults to the run's own final incumbent."""
+    assert trajectory.final_incumbent(POINTS) == 10.0
+    assert trajectory.integrals(POINTS)["integral_reference"] == 10.0
+    assert trajectory.final_incumbent(np.array([[1.0, math.nan, 5.0, 0.0]])) is None
+
+
+def test_relative_gap() -> None:
+    """Test the gap function at its special cases."""
+    gaps = trajectory.relative_gap(
+        np.array([10.0, 20.0, math.nan, -1.0]), np.array([10.0, 10.0, 10.0, 1.0])
+    )
+    assert gaps.tolist() == [0.0, 0.5, 1.0, 1.0]
@@ -0,0 +1,64 @@
+import direct
+import k_means
+import numpy as np
+import pyomo.environ as pyo
+import pytest
+import symmetry
+import warm_start
+
+
+def max_violation(model: pyo.ConcreteModel) -> float:
+    """Largest violation of an active constraint or variable bound at the model values."""
+    worst = 0.0
+    for constraint in model.component_data_objects(pyo.Constraint, active=True):
+        body = pyo.value(constraint.body)
+        if constraint.lower is not None:
+            worst = max(worst, pyo.value(constraint.lower) - body)
+        if constraint.upper is not None:
+            worst = max(worst, body - pyo.value(constraint.upper))
+    for var in model.component_data_objects(pyo.Var):
+        if var.lb is not None:
+            worst = max(worst, var.lb - var.value)
+        if var.ub is not None:
+            worst = max(worst, var.value - var.ub)
+    return worst
+
+
+def test_compute_warm_start_is_a_clustering() -> None:
+    """Test that the start puts every center at the mean of its points."""
+    points = k_means.generate_points(2, 20, (-1.0, 1.0), 0)
+    start = warm_start.compute_warm_start(points, 4)
+    assert sorted(set(start["assignment"].tolist())) == [0, 1, 2, 3]
+    for k in range(4):
+        members = points[start["assignment"] == k]
+        np.testing.assert_allclose(start["centers"][k], members.mean(axis=0))
+    np.testing.assert_allclose(
+        start["distances"], ((points - start["centers"][start["assignment"]]) ** 2).sum(axis=1)
+    )
+    assert start["objective"] == pytest.approx(start["distances"].sum())
+
+
+@pytest.mark.parametrize("scheme", list(symmetry.SCHEMES))
+@pytest.mark.parametrize(
+    "strategy", ["gdp.bigm", "gdp.hull", "direct.bigm", "direct.hull", "direct.hull_eps_1e-3"]
+)
+def test_warm_start_is_feasible(strategy: str, scheme: str) -> None:
+    """Test that the start sets every variable of a reformulation to a feasible value."""
+    model = k_means.build_model(
+        n_dimensions=2,
+        n_clusters=3,
+        n_points=8,
+        coord_range=(-1.0, 1.0),
+        seed=1,
+        symmetry_scheme=scheme,
+    )
+    start = warm_start.warm_start_from_model(model)
+    if direct.is_direct(strategy):
+        direct.apply(model, strategy)
+    else:
+        direct.apply_plugin(model, strategy)
+    warm_start.apply_warm_start(model, start, strategy)
+
+    assert all(var.value is not None for var in model.component_data_objects(pyo.Var))
+    assert max_violation(model) <= 1e-9
+    assert pyo.value(model.obj) == pytest.approx(start["objective"])